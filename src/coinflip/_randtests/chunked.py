@@ -0,0 +1,254 @@
+from math import floor
+from math import sqrt
+from time import perf_counter
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from warnings import catch_warnings
+from warnings import simplefilter
+from warnings import warn
+
+import numpy as np
+
+from coinflip import _randtests
+from coinflip._randtests.common.accumulator import Accumulator
+from coinflip._randtests.common.cache import uncached
+from coinflip._randtests.common.checkpoint import Checkpoint
+from coinflip._randtests.common.core import CliContext
+from coinflip._randtests.common.core import advance_task
+from coinflip._randtests.common.core import set_task_total
+from coinflip._randtests.common.exceptions import TestError
+from coinflip._randtests.common.result import BaseTestResult
+from coinflip._randtests.common.typing import Integer
+from coinflip._randtests.complexity import LinearComplexityAccumulator
+from coinflip._randtests.complexity import default_blocksize as complexity_blocksize
+from coinflip._randtests.cusum import CusumAccumulator
+from coinflip._randtests.entropy import ApproximateEntropyAccumulator
+from coinflip._randtests.excursions import RandomExcursionsAccumulator
+from coinflip._randtests.excursions import RandomExcursionsVariantAccumulator
+from coinflip._randtests.frequency import FrequencyWithinBlockAccumulator
+from coinflip._randtests.frequency import MonobitAccumulator
+from coinflip._randtests.frequency import default_blocksize as frequency_blocksize
+from coinflip._randtests.matrix import BinaryMatrixRankAccumulator
+from coinflip._randtests.matrix import default_matrix_dimen
+from coinflip._randtests.runs import LongestRunsAccumulator
+from coinflip._randtests.runs import RunsAccumulator
+from coinflip._randtests.serial import SerialAccumulator
+from coinflip._randtests.template import NonOverlappingTemplateMatchingAccumulator
+from coinflip._randtests.template import OverlappingTemplateMatchingAccumulator
+from coinflip._randtests.template import nonoverlapping_blocksize
+from coinflip._randtests.universal import MaurersUniversalAccumulator
+from coinflip._randtests.universal import default_params as universal_params
+
+__all__ = ["run_chunked", "default_accumulators", "chunk_bytes_within"]
+
+
+# Bytes of working memory used per bit of a chunk, dominated by the largest
+# temporaries of the accumulators (e.g. the int64 codes of windows)
+MEMORY_PER_BIT = 32
+
+# Bytes of working memory used per bit by the spectral test's Fourier transform
+SPECTRAL_MEMORY_PER_BIT = 64
+
+# Seconds between snapshots of the accumulators' state
+SNAPSHOT_INTERVAL = 60
+
+# Name the accumulators' state is put as in checkpoints
+CHUNKS_STATE = "chunks"
+
+
+def default_accumulators(n: Integer) -> Dict[str, Accumulator]:
+    """Accumulators of every test which can be ran over chunks of a sequence
+
+    Tests which derive their parameters from the length of the sequence are
+    passed the parameters their batch test would use for length ``n``. The
+    serial and approximate entropy tests are limited to their accumulators'
+    largest blocksizes, as the batch tests would otherwise count more
+    patterns than could fit in memory.
+
+    Parameters
+    ----------
+    n : ``Integer``
+        Length of the whole sequence
+
+    Returns
+    -------
+    accumulators : ``Dict[str, Accumulator]``
+        Map of test names to their accumulators, which is every test but
+        ``spectral``
+    """
+    blocksize = max(floor(sqrt(n)), 1)
+
+    return {
+        "monobit": MonobitAccumulator(),
+        "frequency_within_block": FrequencyWithinBlockAccumulator(
+            frequency_blocksize(n)
+        ),
+        "runs": RunsAccumulator(),
+        "longest_runs": LongestRunsAccumulator(),
+        "binary_matrix_rank": BinaryMatrixRankAccumulator(default_matrix_dimen(n)),
+        "non_overlapping_template_matching": NonOverlappingTemplateMatchingAccumulator(
+            nonoverlapping_blocksize(n)
+        ),
+        "overlapping_template_matching": OverlappingTemplateMatchingAccumulator(
+            blocksize
+        ),
+        # Sequences too short for the universal test still need parameters
+        "maurers_universal": MaurersUniversalAccumulator(
+            *universal_params(max(n, MaurersUniversalAccumulator.min_n))
+        ),
+        "linear_complexity": LinearComplexityAccumulator(complexity_blocksize(n)),
+        "serial": SerialAccumulator(),
+        "approximate_entropy": ApproximateEntropyAccumulator(),
+        "cusum": CusumAccumulator(),
+        "random_excursions": RandomExcursionsAccumulator(),
+        "random_excursions_variant": RandomExcursionsVariantAccumulator(),
+    }
+
+
+def chunk_bytes_within(max_memory: Integer) -> Integer:
+    """Finds the size of chunks whose testing fits in ``max_memory`` bytes"""
+    return max(max_memory // (8 * MEMORY_PER_BIT), 1)
+
+
+def run_chunked(
+    buffer,
+    chunk_bytes: Integer,
+    max_spectral_n: Optional[Integer] = None,
+    ctx: Optional[CliContext] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    snapshot_interval: float = SNAPSHOT_INTERVAL,
+) -> Iterator[Tuple[str, Optional[BaseTestResult], Optional[TestError]]]:
+    """Runs every test on a packed sequence, reading it a chunk at a time
+
+    Only one chunk is unpacked at a time, which is fed to an accumulator of
+    every test, so ``buffer`` can be a memory-mapped file much larger than
+    memory. The spectral test needs the whole sequence at once for its
+    Fourier transform, so it is only ran on the first ``max_spectral_n`` bits.
+
+    If a checkpoint is passed, the accumulators are snapshotted to it every
+    ``snapshot_interval`` seconds and the outcome of each test is put in it
+    once found. Running again with the same checkpoint then restores the
+    accumulators from their last snapshot, continuing from the chunk after it,
+    and skips the tests which already have an outcome.
+
+    Parameters
+    ----------
+    buffer : bytes-like
+        Bits of the sequence, 8 per byte with the most significant bit first,
+        where ``1`` bits represent heads
+    chunk_bytes : ``Integer``
+        Number of bytes to read at a time
+    max_spectral_n : ``Integer``, optional
+        Length of the longest sequence the spectral test is ran on, defaulting
+        to the whole sequence
+    checkpoint : ``Checkpoint``, optional
+        Checkpoint to resume from and write progress to
+    snapshot_interval : ``float``, default ``60``
+        Seconds between snapshots of the accumulators
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``TestResult`` or ``MultiTestResult``
+        Data containers of the test's result(s), or ``None`` if the test
+        could not be ran
+    exception : ``TestError``
+        The exception raised when finding the test's result, otherwise
+        ``None``
+
+    Warns
+    -----
+    UserWarning
+        When the spectral test is ran on a truncated sequence
+    """
+    packed = np.frombuffer(buffer, dtype=np.uint8)
+    n = 8 * len(packed)
+
+    accumulators = default_accumulators(n)
+    resume_start = 0
+    state = checkpoint.get_state(CHUNKS_STATE) if checkpoint else None
+    if state:
+        resume_start, snapshots = state
+        accumulators = {
+            name: Accumulator.restore(snapshot) for name, snapshot in snapshots.items()
+        }
+
+    nchunks = -(-len(packed) // chunk_bytes)
+    set_task_total(ctx, nchunks)
+    for _ in range(resume_start // chunk_bytes):
+        advance_task(ctx)
+
+    last_snapshot = perf_counter()
+    for start in range(resume_start, len(packed), chunk_bytes):
+        bits = np.unpackbits(packed[start : start + chunk_bytes])
+        for accumulator in accumulators.values():
+            accumulator.update_bits(bits)
+
+        advance_task(ctx)
+
+        end = min(start + chunk_bytes, len(packed))
+        if checkpoint and (
+            end == len(packed) or perf_counter() - last_snapshot >= snapshot_interval
+        ):
+            snapshots = {
+                name: accumulator.snapshot()
+                for name, accumulator in accumulators.items()
+            }
+            checkpoint.put_state(CHUNKS_STATE, (end, snapshots))
+            last_snapshot = perf_counter()
+
+    for name in _randtests.__all__:
+        outcome = checkpoint.get(name) if checkpoint else None
+        if outcome:
+            yield (name, *outcome)
+            continue
+
+        try:
+            with catch_warnings():
+                # Progress bars are updated instead of warning on failures
+                if ctx:
+                    simplefilter("ignore")
+
+                if name == "spectral":
+                    result = spectral_prefix(packed, max_spectral_n, ctx)
+                else:
+                    result = accumulators[name].result()
+
+        except TestError as e:
+            if checkpoint:
+                checkpoint.put(name, None, e)
+
+            yield name, None, e
+
+        else:
+            if checkpoint:
+                checkpoint.put(name, result)
+
+            yield name, result, None
+
+
+def spectral_prefix(
+    packed: np.ndarray, max_n: Optional[Integer], ctx: Optional[CliContext]
+) -> BaseTestResult:
+    """Runs the spectral test on the leading bits of a packed sequence"""
+    n = 8 * len(packed)
+    if max_n is not None and max_n < n:
+        if not ctx:
+            warn(spectral_truncation_msg(n, max_n), UserWarning)
+        n = max_n
+
+    bits = np.unpackbits(packed[: -(-n // 8)])[:n]
+
+    # Chunked runs are checkpointed rather than cached, like the accumulated tests
+    with uncached():
+        return _randtests.spectral(bits)
+
+
+def spectral_truncation_msg(n: Integer, max_n: Integer) -> str:
+    return (
+        f"Spectral test only ran on the first {max_n} bits of {n}, as its "
+        "Fourier transform holds the whole sequence in memory"
+    )
@@ -0,0 +1,204 @@
+import pickle
+
+import numpy as np
+
+from coinflip._randtests.common.core import MinimumInputError
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.result import BaseTestResult
+from coinflip._randtests.common.testutils import cyclic_pattern_counts
+from coinflip._randtests.common.testutils import marginalise_counts
+from coinflip._randtests.common.testutils import window_codes
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Integer
+
+__all__ = ["Accumulator", "PatternAccumulator"]
+
+
+class Accumulator:
+    """Base class for randomness tests ran incrementally over chunks of a sequence
+
+    Subclasses carry whatever state their test needs across chunk boundaries in
+    ``_update()``, and produce the same result as their batch test in
+    ``result()``.
+
+    Parameters
+    ----------
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+
+    Attributes
+    ----------
+    n : ``int``
+        Length of the sequence accumulated so far
+    nheads : ``int``
+        Occurrences of ``heads`` in the sequence accumulated so far
+    """
+
+    min_n = 2
+
+    def __init__(self, heads: Face = 1, tails: Face = 0):
+        self.heads = heads
+        self.tails = tails
+        self.n = 0
+        self.nheads = 0
+
+    def update(self, chunk):
+        """Accumulates the next chunk of the sequence
+
+        Parameters
+        ----------
+        chunk : array-like
+            Next values of the sequence, which are all either ``heads`` or
+            ``tails``
+
+        Raises
+        ------
+        NonBinarySequenceError
+            If ``chunk`` contains values other than ``heads`` and ``tails``
+        """
+        array = np.asarray(chunk)
+        matches = array == self.heads
+        nheads = int(np.count_nonzero(matches))
+        if nheads + np.count_nonzero(array == self.tails) != array.size:
+            raise NonBinarySequenceError()
+
+        if array.size > 0:
+            self._update(matches.astype(np.uint8).ravel())
+            self.n += array.size
+            self.nheads += nheads
+
+    def update_packed(self, buffer):
+        """Accumulates the next chunk of the sequence as packed bits
+
+        Parameters
+        ----------
+        buffer : bytes-like
+            Next bits of the sequence, 8 per byte with the most significant bit
+            first, where ``1`` bits represent ``heads``
+        """
+        self.update_bits(np.unpackbits(np.frombuffer(buffer, dtype=np.uint8)))
+
+    def update_bits(self, bits: np.ndarray):
+        """Accumulates the next chunk of the sequence as unpacked bits
+
+        Unlike ``update()``, the chunk is not checked, so one unpacked chunk can
+        be shared by many accumulators.
+
+        Parameters
+        ----------
+        bits : ``ndarray``
+            1D ``uint8`` array of the next ``0`` and ``1`` bits of the
+            sequence, where ``1`` bits represent ``heads``
+        """
+        if bits.size > 0:
+            self._update(bits)
+            self.n += bits.size
+            self.nheads += int(np.count_nonzero(bits))
+
+    def _update(self, bits: np.ndarray):
+        """Carries the test's state over a non-empty chunk of ``0`` and ``1`` bits"""
+
+    def result(self) -> BaseTestResult:
+        """Result of the test on the sequence accumulated so far"""
+        raise NotImplementedError()
+
+    def snapshot(self) -> bytes:
+        """Serialises the state accumulated so far
+
+        Snapshots can be taken periodically while accumulating a long sequence,
+        so after an interruption the accumulator can be restored by
+        ``restore()`` and continue from the chunk after its last snapshot.
+        """
+        return pickle.dumps(self)
+
+    @staticmethod
+    def restore(snapshot: bytes) -> "Accumulator":
+        """Restores an accumulator from a snapshot taken by ``snapshot()``"""
+        return pickle.loads(snapshot)
+
+    def _check_input(self):
+        """Checks the accumulated sequence can be tested, as the batch test does
+
+        Raises
+        ------
+        NonBinarySequenceError
+            If the sequence does not contain both ``heads`` and ``tails``
+        MinimumInputError
+            If the sequence is shorter than the test's ``min_n``
+        """
+        if self.nheads == 0 or self.nheads == self.n:
+            raise NonBinarySequenceError()
+        if self.n < self.min_n:
+            raise MinimumInputError(self.n, self.min_n)
+
+
+class PatternAccumulator(Accumulator):
+    """Base class for tests of the cyclic counts of overlapping patterns
+
+    Overlapping windows of ``max_blocksize`` bits are counted as chunks are
+    accumulated, carrying the trailing ``max_blocksize - 1`` bits between
+    chunks. The windows which wrap around to the start of the sequence are
+    only counted in ``cyclic_counts()``, from the kept leading bits, so the
+    sequence can keep growing after a result is found.
+
+    Parameters
+    ----------
+    max_blocksize : ``Integer``
+        Size of the largest patterns which can be counted
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+
+    Attributes
+    ----------
+    counts : ``ndarray``
+        Dense counts of the windows of ``max_blocksize`` bits accumulated so
+        far, without wrapping around
+    """
+
+    def __init__(self, max_blocksize: Integer, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.max_blocksize = max_blocksize
+        self.counts = np.zeros(2 ** max_blocksize, dtype=np.int64)
+        self._head = np.zeros(0, dtype=np.uint8)
+        self._tail = np.zeros(0, dtype=np.uint8)
+
+    def _update(self, bits):
+        nkept = self.max_blocksize - 1
+        if len(self._head) < nkept:
+            self._head = np.concatenate([self._head, bits[: nkept - len(self._head)]])
+
+        bits = np.concatenate([self._tail, bits])
+        codes = window_codes(bits, self.max_blocksize)
+        self.counts += np.bincount(codes, minlength=len(self.counts))
+
+        self._tail = bits[max(len(bits) - nkept, 0) :]
+
+    def cyclic_counts(self, blocksize: Integer) -> np.ndarray:
+        """Counts patterns in the sequence accumulated so far wrapped around on itself
+
+        Parameters
+        ----------
+        blocksize : ``Integer``
+            Size of the patterns, which is at most ``max_blocksize``
+
+        Returns
+        -------
+        counts : ``ndarray``
+            Dense cyclic counts of patterns, as returned by
+            ``cyclic_pattern_counts``
+        """
+        if self.n < self.max_blocksize:
+            # The kept trailing bits are the whole sequence
+            return cyclic_pattern_counts(self._tail, blocksize)
+
+        counts = marginalise_counts(self.counts, self.max_blocksize - blocksize)
+
+        # Windows starting in the trailing bits are completed from the start
+        wrapped_bits = np.concatenate([self._tail, self._head[: blocksize - 1]])
+        wrapped_codes = window_codes(wrapped_bits, blocksize)
+
+        return counts + np.bincount(wrapped_codes, minlength=len(counts))
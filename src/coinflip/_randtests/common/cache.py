@@ -0,0 +1,259 @@
+import os
+import pickle
+import shutil
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from uuid import uuid4
+
+import numpy as np
+
+from coinflip import __version__
+from coinflip._randtests.common.typing import Face
+
+__all__ = ["ResultCache", "result_key", "get_cache", "set_cache", "uncached"]
+
+
+DEFAULT_MAX_SIZE = 2 ** 29  # 512 MiB
+
+# Directory of the cache directory checkpoints of runs are kept in
+CHECKPOINTS_DIR = "checkpoints"
+
+
+def default_cache_dir() -> Path:
+    """Finds the directory results are cached in by default
+
+    The ``COINFLIP_CACHE_DIR`` environment variable is used if set, otherwise
+    a ``coinflip`` directory in the user's cache directory.
+    """
+    try:
+        return Path(os.environ["COINFLIP_CACHE_DIR"])
+    except KeyError:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+        return Path(cache_home) / "coinflip"
+
+
+def result_key(
+    bits: np.ndarray, heads: Face, tails: Face, randtest_name: str, kwargs: Dict
+) -> str:
+    """Content-addresses the result of a test on a sequence
+
+    Parameters
+    ----------
+    bits : ``ndarray``
+        ``0`` and ``1`` bits of the sequence, where ``1`` represents ``heads``
+    heads : ``Face``
+        Face the ``1`` bits represent
+    tails : ``Face``
+        Face the ``0`` bits represent
+    randtest_name : ``str``
+        Name of statistical test
+    kwargs : ``Dict``
+        Parameters passed to the test, where ``None`` values are treated as not
+        being passed
+
+    Returns
+    -------
+    key : ``str``
+        BLAKE2 hash of the packed sequence, its faces, the test's name and
+        parameters, and the version of ``coinflip``
+    """
+    params = sorted((k, v) for k, v in kwargs.items() if v is not None)
+
+    hasher = blake2b(digest_size=20)
+    hasher.update(np.packbits(bits))
+    hasher.update(repr((len(bits), heads, tails)).encode())
+    hasher.update(repr((randtest_name, params, __version__)).encode())
+
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of test results, evicting the least recently used
+
+    Each result is pickled to its own file, named by its key. Reading a result
+    marks it as recently used, and once the files exceed ``max_size`` bytes the
+    least recently used are removed. Checkpoints of runs kept in the cache's
+    ``checkpoints`` directory count towards ``max_size`` too, and are evicted
+    a run at a time. The size of the files is only scanned for on the first
+    write and when evicting, and is otherwise kept as a running count of the
+    bytes written.
+
+    Parameters
+    ----------
+    path : path-like, optional
+        Directory to cache results in, defaulting to the ``COINFLIP_CACHE_DIR``
+        environment variable or else ``~/.cache/coinflip``
+    max_size : ``int``, default ``2 ** 29``
+        Bytes the cached results can take up
+    """
+
+    def __init__(self, path: Optional[Any] = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = Path(path) if path is not None else default_cache_dir()
+        self.max_size = max_size
+        self.nhits = 0
+        self._size: Optional[int] = None
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Loads a cached result, or returns ``None`` if it is not cached"""
+        file = self._file(key)
+        try:
+            with open(file, "rb") as f:
+                result = pickle.load(f)
+            os.utime(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+        self.nhits += 1
+
+        return result
+
+    def put(self, key: str, result: Any):
+        """Caches a result, evicting the least recently used if needed
+
+        Results which cannot be pickled, or a cache directory which cannot be
+        written to, are silently skipped.
+        """
+        file = self._file(key)
+        try:
+            dump_atomically(result, file)
+            nbytes = file.stat().st_size
+        except (OSError, pickle.PicklingError, AttributeError, TypeError):
+            return
+
+        if self._size is None:
+            self._size = self.size
+        else:
+            self._size += nbytes
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Finds the last use, size and path of every result and checkpoint"""
+        if not self.path.exists():
+            return []
+
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pickle"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        checkpoints_path = self.path / CHECKPOINTS_DIR
+        if checkpoints_path.is_dir():
+            for run_entry in os.scandir(checkpoints_path):
+                if not run_entry.is_dir():
+                    continue
+                mtime = run_entry.stat().st_mtime
+                size = 0
+                for entry in os.scandir(run_entry.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:  # i.e. a temporary file which was replaced
+                        continue
+                    mtime = max(mtime, stat.st_mtime)
+                    size += stat.st_size
+                entries.append((mtime, size, run_entry.path))
+
+        return entries
+
+    def evict(self):
+        """Removes the least used results and checkpoints until within ``max_size``"""
+        entries = self._entries()
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+
+        self._size = size
+
+    @property
+    def size(self) -> int:
+        """Bytes the cached results and checkpoints take up"""
+        return sum(entry_size for _, entry_size, _ in self._entries())
+
+    def clear(self):
+        """Removes every cached result"""
+        if not self.path.exists():
+            return
+
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".pickle"):
+                os.remove(entry.path)
+        self._size = None
+
+
+def dump_atomically(obj: Any, file: Path):
+    """Pickles an object to a file, so readers never see a partially written file
+
+    The object is written to a temporary file first, which then replaces
+    ``file``. Any parent directories of ``file`` are created.
+
+    Raises
+    ------
+    OSError
+        If the file could not be written
+    PicklingError
+        If the object could not be pickled
+    """
+    tmp_file = file.parent / f".{uuid4().hex}.tmp"
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(obj, f)
+        os.replace(tmp_file, file)
+    except BaseException:
+        if tmp_file.exists():
+            os.remove(tmp_file)
+        raise
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_cache() -> Optional[ResultCache]:
+    """Cache results are currently read from and written to, if any"""
+    return _cache
+
+
+def set_cache(cache: Optional[ResultCache]):
+    """Sets the cache results are read from and written to
+
+    Parameters
+    ----------
+    cache : ``ResultCache``, optional
+        Cache to use, or ``None`` to stop caching results
+    """
+    global _cache
+    _cache = cache
+
+
+@contextmanager
+def uncached():
+    """Stops results being read from or written to the cache within the block"""
+    global _cache
+    cache = _cache
+    _cache = None
+    try:
+        yield
+    finally:
+        _cache = cache
@@ -0,0 +1,108 @@
+import pickle
+import shutil
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from coinflip import __version__
+from coinflip._randtests.common.cache import CHECKPOINTS_DIR
+from coinflip._randtests.common.cache import default_cache_dir
+from coinflip._randtests.common.cache import dump_atomically
+
+__all__ = ["Checkpoint", "run_key", "default_checkpoint_dir"]
+
+
+def default_checkpoint_dir() -> Path:
+    """Finds the directory checkpoints are kept in by default"""
+    return default_cache_dir() / CHECKPOINTS_DIR
+
+
+def run_key(input_hash: str, params: Dict[str, Any]) -> str:
+    """Identifies a run of tests on a sequence
+
+    Parameters
+    ----------
+    input_hash : ``str``
+        Hash of the sequence being tested
+    params : ``Dict[str, Any]``
+        Parameters of the run, where ``None`` values are treated as not being
+        passed
+
+    Returns
+    -------
+    key : ``str``
+        BLAKE2 hash of the sequence's hash, the run's parameters and the version
+        of ``coinflip``
+    """
+    params = sorted((k, v) for k, v in params.items() if v is not None)
+
+    hasher = blake2b(digest_size=20)
+    hasher.update(repr((input_hash, params, __version__)).encode())
+
+    return hasher.hexdigest()
+
+
+class Checkpoint:
+    """Outcomes and state of a run of tests, written as the run progresses
+
+    The outcome of each test is pickled to its own file as soon as the test
+    completes, so a run which is interrupted can be resumed by only running the
+    tests without an outcome. Tests which run over many chunks can also put
+    snapshots of their state, so they can restart from their last snapshot.
+
+    Parameters
+    ----------
+    key : ``str``
+        Key of the run, e.g. from ``run_key()``
+    path : path-like, optional
+        Directory to keep checkpoints in, defaulting to a ``checkpoints``
+        directory in the cache directory
+    """
+
+    def __init__(self, key: str, path: Optional[Any] = None):
+        self.key = key
+        root = Path(path) if path is not None else default_checkpoint_dir()
+        self.path = root / key
+
+    def _file(self, name: str, kind: str) -> Path:
+        return self.path / f"{name}.{kind}.pickle"
+
+    def _load(self, file: Path) -> Optional[Any]:
+        try:
+            with open(file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+
+    def get(self, randtest_name: str) -> Optional[Tuple[Any, Optional[Exception]]]:
+        """Loads the outcome of a completed test
+
+        Returns
+        -------
+        outcome : ``Tuple[BaseTestResult, TestError]``
+            Result of the test, or ``None`` if it could not be ran along with
+            the exception raised, or ``None`` if the test has not completed
+        """
+        return self._load(self._file(randtest_name, "outcome"))
+
+    def put(self, randtest_name: str, result: Any, e: Optional[Exception] = None):
+        """Writes the outcome of a completed test"""
+        dump_atomically((result, e), self._file(randtest_name, "outcome"))
+
+    def get_state(self, name: str) -> Optional[Any]:
+        """Loads the last snapshot of state put as ``name``, if any"""
+        return self._load(self._file(name, "state"))
+
+    def put_state(self, name: str, state: Any):
+        """Writes a snapshot of state, replacing any previous snapshot"""
+        dump_atomically(state, self._file(name, "state"))
+
+    def __contains__(self, randtest_name: str) -> bool:
+        return self._file(randtest_name, "outcome").exists()
+
+    def clear(self):
+        """Removes every outcome and snapshot of the run"""
+        shutil.rmtree(self.path, ignore_errors=True)
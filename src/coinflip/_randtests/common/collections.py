@@ -1,22 +1,22 @@
 from bisect import bisect_left
+from bisect import bisect_right
 from collections import Counter
-from collections import defaultdict
 from collections.abc import Mapping
 from collections.abc import MutableMapping
 from collections.abc import MutableSequence
-from functools import lru_cache
-from itertools import chain
 from numbers import Real
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Iterable
+from typing import List
 from typing import Optional
 from typing import Sequence
 from typing import Tuple
 from typing import Type
 from typing import Union
 
+import numpy as np
 from sortedcontainers import SortedDict
 
 __all__ = ["Bins", "defaultlist", "FloorDict"]
@@ -51,8 +51,11 @@ class Bins(MutableMapping):
     >>> bins[0.5] += 1                  # n = 0
     >>> bins
     {-6: 1, -3: 0, 0: 1, 3: 1, 6: 3}
+    >>> bins.add_many([-2, 1, 2, 42])   # n = -3, 0, 3, 6
+    >>> bins
+    {-6: 1, -3: 1, 0: 2, 3: 2, 6: 4}
     >>> del bins[6]
-    {-6: 1, -3: 0, 0: 1, 3: 4}
+    {-6: 1, -3: 1, 0: 2, 3: 6}
     """
 
     def __init__(self, intervals: Iterable[Real]):
@@ -60,34 +63,92 @@ class Bins(MutableMapping):
         if any(count > 1 for count in counts.values()):
             raise ValueError("Duplicate intervals for binning were passed")
 
-        empty_bins = {interval: 0 for interval in intervals}
-        self._sdict = SortedDict(empty_bins)
+        self._set_intervals(sorted(counts.keys()))
+        self._counts = [0 for _ in self._intervals]
+
+    def _set_intervals(self, intervals: Iterable[Real]):
+        self._intervals = tuple(intervals)
+        self._edges = np.asarray(self._intervals)
+
+    def __setstate__(self, state: Dict[str, Any]):
+        # Bins pickled by older versions kept their counts in a sorted dict
+        if "_sdict" in state:
+            sdict = state["_sdict"]
+            self._set_intervals(sdict.keys())
+            self._counts = list(sdict.values())
+        else:
+            self.__dict__.update(state)
 
     @property
     def intervals(self) -> Tuple[Real]:
-        return tuple(self._sdict.keys())
+        return self._intervals
 
     def __getitem__(self, key: Real):
-        interval = self._roundkey(key)
-        return self._sdict[interval]
+        i = self._roundindex(key)
+        return self._counts[i]
 
     def __setitem__(self, key: Real, value: Real):
-        interval = self._roundkey(key)
-        self._sdict[interval] = value
+        i = self._roundindex(key)
+        self._counts[i] = value
 
     def __delitem__(self, key: Real):
-        value = self._sdict[key]
-        del self._sdict[key]
+        try:
+            i = self._intervals.index(key)
+        except ValueError as e:
+            raise KeyError(key) from e
+
+        value = self._counts.pop(i)
+        self._set_intervals(self._intervals[:i] + self._intervals[i + 1 :])
+
         self[key] += value
 
-    def _roundkey(self, key: Real):
-        return Bins.find_closest_interval(self.intervals, key)
+    def _roundindex(self, key: Real) -> int:
+        return Bins.find_closest_index(self._intervals, key)
+
+    def add_many(self, values: Iterable[Real]):
+        """Increments the bins of every value
+
+        Values are rounded to their closest intervals all at once, so this is
+        much faster than incrementing each value individually.
+
+        Parameters
+        ----------
+        values : ``Iterable[Real]``
+            Values to increment the bins of
+        """
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+
+        nintervals = len(self._intervals)
+        if nintervals == 1:
+            self._counts[0] += values.size
+            return
+
+        edges = self._edges
+
+        i = np.clip(np.searchsorted(edges, values), 1, nintervals - 1)
+        leftedges = edges[i - 1]
+        rightedges = edges[i]
+        with np.errstate(invalid="ignore"):  # i.e. from infinite intervals
+            nearer_left = np.abs(leftedges - values) < np.abs(rightedges - values)
+
+        indices = np.select(
+            [values <= edges[0], values >= edges[-1], nearer_left],
+            [0, nintervals - 1, i - 1],
+            default=i,
+        )
+
+        bincounts = np.bincount(indices, minlength=nintervals)
+        for i, bincount in enumerate(bincounts):
+            if bincount:
+                self._counts[i] += int(bincount)
 
     def __iter__(self):
-        return iter(self._sdict)
+        return iter(self._intervals)
 
     def __len__(self):
-        return len(self._sdict)
+        return len(self._intervals)
 
     def __repr__(self):
         return str(dict(self))
@@ -96,39 +157,54 @@ class Bins(MutableMapping):
         return f"Bins({repr(self)})"
 
     @staticmethod
-    @lru_cache()
-    def find_closest_interval(intervals: Tuple[Real], key: Real):
-        minkey = intervals[0]
-        midkeys = intervals[1:-1]
-        maxkey = intervals[-1]
-
-        if key <= minkey:
-            return minkey
-        elif key >= maxkey:
-            return maxkey
-        elif key in midkeys:
-            return key
+    def find_closest_index(intervals: Tuple[Real], key: Real) -> int:
+        """Finds the index of the interval closest to ``key`` in O(log n)"""
+        if key <= intervals[0]:
+            return 0
+        elif key >= intervals[-1]:
+            return len(intervals) - 1
         else:
             i = bisect_left(intervals, key)
             leftkey = intervals[i - 1]
             rightkey = intervals[i]
 
             if abs(leftkey - key) < abs(rightkey - key):
-                return leftkey
+                return i - 1
             else:
-                return rightkey
+                return i
+
+    @staticmethod
+    def find_closest_interval(intervals: Tuple[Real], key: Real) -> Real:
+        """Finds the interval closest to ``key`` in O(log n)"""
+        i = Bins.find_closest_index(intervals, key)
+        return intervals[i]
 
 
 class defaultlist(MutableSequence):
     """A list with default values
 
+    Items are stored densely, where accessing or assigning past the end of the
+    list fills the gap with default values.
+
     Parameters
     ----------
     default_factory : ``Callable``, optional
+        Called without arguments to produce default values
+    dtype : ``dtype``, optional
+        If passed, items are stored in a growable numpy array of this type, where
+        ``default_factory`` should produce a value of this type
     """
 
-    def __init__(self, default_factory: Optional[Callable] = None):
-        self._ddict = defaultdict(default_factory or defaultlist._none_factory)
+    def __init__(
+        self, default_factory: Optional[Callable] = None, dtype: Any = None
+    ):
+        self._default_factory = default_factory or defaultlist._none_factory
+        self._dtype = None if dtype is None else np.dtype(dtype)
+        self._n = 0
+        if self._dtype is None:
+            self._items = []
+        else:
+            self._items = np.empty(0, dtype=self._dtype)
 
     @staticmethod
     def _none_factory() -> None:
@@ -136,22 +212,65 @@ class defaultlist(MutableSequence):
 
     @property
     def default_factory(self) -> Optional[Callable]:
-        return self._ddict.default_factory
+        return self._default_factory
 
     @default_factory.setter
     def default_factory(self, default_factory: Optional[Callable]):
-        self._ddict.default_factory = default_factory or defaultlist._none_factory
+        self._default_factory = default_factory or defaultlist._none_factory
+
+    @property
+    def dtype(self) -> Optional[np.dtype]:
+        return self._dtype
+
+    @property
+    def _typed(self) -> bool:
+        return self._dtype is not None
+
+    def _reserve(self, capacity: int):
+        """Grows the array of a typed defaultlist to hold ``capacity`` items"""
+        if capacity > len(self._items):
+            capacity = max(capacity, 2 * len(self._items))
+            items = np.empty(capacity, dtype=self._dtype)
+            items[: self._n] = self._items[: self._n]
+            self._items = items
+
+    def _pad(self, n: int):
+        """Fills with default values so there are at least ``n`` items"""
+        if n <= self._n:
+            return
+
+        if self._typed:
+            self._reserve(n)
+            self._items[self._n : n] = self._default_factory()
+        else:
+            self._items.extend(self._default_factory() for _ in range(n - self._n))
+
+        self._n = n
+
+    def _replace(self, items: Union[list, np.ndarray]):
+        self._items = items
+        self._n = len(items)
+
+    def _live_items(self) -> Union[list, np.ndarray]:
+        return self._items[: self._n] if self._typed else self._items
 
     def __getitem__(self, key: Union[int, slice]):
         if isinstance(key, int):
             i = self._actualise_index(key)
+            self._pad(i + 1)
 
-            return self._ddict[i]
+            return self._items[i].item() if self._typed else self._items[i]
 
         elif isinstance(key, slice):
-            srange = self._determine_srange(key)
-            dlist = defaultlist(self.default_factory)
-            dlist.extend(self._ddict[i] for i in srange)
+            srange = self._determine_srange(key, pad=True)
+            if srange:
+                self._pad(max(srange[0], srange[-1]) + 1)
+
+            dlist = defaultlist(self.default_factory, dtype=self._dtype)
+            if self._typed:
+                dlist._replace(self._items[np.array(srange, dtype=np.intp)])
+            else:
+                dlist._replace([self._items[i] for i in srange])
 
             return dlist
 
@@ -161,45 +280,37 @@ class defaultlist(MutableSequence):
     def __setitem__(self, key: Union[int, slice], value: Any):
         if isinstance(key, int):
             i = self._actualise_index(key)
-            self._ddict[i] = value
+            self._pad(i + 1)
+            self._items[i] = value
 
         elif isinstance(key, slice):
             values = list(value) if isinstance(value, Iterable) else [value]
-            nvalues = len(values)
-
-            srange = self._determine_srange(key)
-            if srange:
-                srange_min = min(srange[0], srange[-1])
-                srange_max = max(srange[0], srange[-1])
-            else:
-                srange_min = srange_max = srange.start
-
-            for i in srange:
-                try:
-                    del self._ddict[i]
-                except KeyError:
-                    pass
-
-            diff = nvalues - len(srange)
-            if diff:
-                keys = list(self._ddict.keys())
-
-                threshold = srange_min + nvalues
-                reindexed_subdict = {}
-
-                mid_keys = [k for k in keys if srange_min <= k < srange_max]
-                for i, k in enumerate(sorted(mid_keys), start=threshold):
-                    reindexed_subdict[i] = self._ddict[k]
 
-                larger_keys = [k for k in self._ddict.keys() if k > srange_max]
-                for k in larger_keys:
-                    i = k + diff
-                    reindexed_subdict[i] = self._ddict[k]
+            srange = self._determine_srange(key, pad=True)
+            if srange.step == 1:
+                self._pad(srange.start)
+                stop = min(max(srange.stop, srange.start), self._n)
+
+                items = self._live_items()
+                if self._typed:
+                    values = np.array(values, dtype=self._dtype)
+                    self._replace(
+                        np.concatenate([items[: srange.start], values, items[stop:]])
+                    )
+                else:
+                    items[srange.start : stop] = values
+                    self._n = len(items)
 
-                self._ddict.update(reindexed_subdict)
-
-            for i, v in enumerate(values, start=srange_min):
-                self[i] = v
+            else:
+                if len(values) != len(srange):
+                    raise ValueError(
+                        f"attempt to assign sequence of size {len(values)} "
+                        f"to extended slice of size {len(srange)}"
+                    )
+                if srange:
+                    self._pad(max(srange[0], srange[-1]) + 1)
+                for i, v in zip(srange, values):
+                    self._items[i] = v
 
         else:
             defaultlist._raise_type_error(type(key))
@@ -207,45 +318,25 @@ class defaultlist(MutableSequence):
     def __delitem__(self, key: Union[int, slice]):
         if isinstance(key, int):
             i = self._actualise_index(key)
-            try:
-                del self._ddict[i]
-            except KeyError:
-                pass
-
-            larger_keys = [k for k in self._ddict.keys() if k > i]
-            reindexed_subdict = {k - 1: self._ddict[k] for k in larger_keys}
-            for k in larger_keys:
-                del self._ddict[k]
-            self._ddict.update(reindexed_subdict)
+            if i < self._n:
+                if self._typed:
+                    self._items[i : self._n - 1] = self._items[i + 1 : self._n]
+                    self._n -= 1
+                else:
+                    del self._items[i]
+                    self._n -= 1
 
         elif isinstance(key, slice):
             srange = self._determine_srange(key)
             if srange:
-                for i in srange:
-                    try:
-                        del self._ddict[i]
-                    except KeyError:
-                        pass
-
-                srange_min = min(srange[0], srange[-1])
-                srange_max = max(srange[0], srange[-1])
-
-                reindexed_subdict = {}
-
-                mid_keys = [
-                    k for k in self._ddict.keys() if srange_min <= k < srange_max
-                ]
-                for i, k in enumerate(sorted(mid_keys), start=srange_min):
-                    reindexed_subdict[i] = self._ddict[k]
-
-                larger_keys = [k for k in self._ddict.keys() if k > srange_max]
-                for k in larger_keys:
-                    i = k - len(srange)
-                    reindexed_subdict[i] = self._ddict[k]
-
-                for k in chain(mid_keys, larger_keys):
-                    del self._ddict[k]
-                self._ddict.update(reindexed_subdict)
+                if self._typed:
+                    keep = np.ones(self._n, dtype=bool)
+                    keep[np.array(srange, dtype=np.intp)] = False
+                    self._replace(self._items[: self._n][keep])
+                else:
+                    removed = set(srange)
+                    items = [v for i, v in enumerate(self._items) if i not in removed]
+                    self._replace(items)
 
         else:
             defaultlist._raise_type_error(type(key))
@@ -262,30 +353,31 @@ class defaultlist(MutableSequence):
                     "negative list index larger than list length, unresolvable"
                 )
 
-    def _determine_srange(self, slice_: slice) -> range:
-        step = slice_.step or 1
+    def _determine_srange(self, slice_: slice, pad: bool = False) -> range:
+        """Resolves a slice into its indices
 
-        if slice_.start is None:
-            start = 0 if step > 0 else len(self)
-        else:
-            start = self._actualise_index(slice_.start)
-
-        if slice_.stop is None:
-            stop = len(self) if step > 0 else 0
-        else:
-            stop = self._actualise_index(slice_.stop)
+        Negative indices and slices in reverse resolve like they would for a
+        ``list``. If ``pad`` is ``True``, positive indices past the end of the
+        list are kept, i.e. so they can be filled with defaults.
+        """
+        n = self._n
+        if pad:
+            step = slice_.step or 1
+            if slice_.stop is not None and slice_.stop >= 0 and step > 0:
+                n = max(n, slice_.stop)
+            if slice_.start is not None and slice_.start >= 0:
+                n = max(n, slice_.start + (1 if step < 0 else 0))
 
-        return range(start, stop, step)
+        return range(*slice_.indices(n))
 
     def __len__(self):
-        try:
-            return max(self._ddict.keys()) + 1
-        except ValueError:
-            return 0
+        return self._n
 
     def __iter__(self):
-        for k in range(len(self)):
-            yield self._ddict[k]
+        if self._typed:
+            return iter(self._items[: self._n].tolist())
+        else:
+            return iter(self._items)
 
     def index(self, x: Any):
         """"""
@@ -297,13 +389,34 @@ class defaultlist(MutableSequence):
 
     def insert(self, i: int, value: Any):
         """"""
-        larger_keys = [k for k in self._ddict.keys() if k >= i]
-        reindexed_subdict = {k + 1: self._ddict[k] for k in larger_keys}
-        for k in larger_keys:
-            del self._ddict[k]
-        self._ddict.update(reindexed_subdict)
+        if i < 0:
+            i = max(self._n + i, 0)
+        self._pad(i)
+
+        if self._typed:
+            self._reserve(self._n + 1)
+            self._items[i + 1 : self._n + 1] = self._items[i : self._n]
+            self._items[i] = value
+            self._n += 1
+        else:
+            self._items.insert(i, value)
+            self._n += 1
 
-        self._ddict[i] = value
+    def extend(self, values: Iterable[Any]):
+        """"""
+        if self._typed:
+            values = np.fromiter(values, dtype=self._dtype)
+            n = self._n + len(values)
+            self._reserve(n)
+            self._items[self._n : n] = values
+            self._n = n
+        else:
+            self._items.extend(values)
+            self._n = len(self._items)
+
+    def to_numpy(self) -> np.ndarray:
+        """Copy of the items as a numpy array"""
+        return np.array(self._live_items(), dtype=self._dtype)
 
     def __eq__(self, other: Any):
         if isinstance(other, Sequence):
@@ -341,19 +454,40 @@ class FloorDict(Mapping):
 
     def __init__(self, dict: Dict):
         self._sdict = SortedDict(dict)
+        self._keys = tuple(self._sdict.keys())
+        self._values = tuple(self._sdict.values())
+        self._edges = np.asarray(self._keys)
 
     def __getitem__(self, key):
-        keys = iter(self._sdict.keys())
-        prevkey = next(keys)
-        if key < prevkey:
+        i = bisect_right(self._keys, key)
+        if i == 0:
             raise KeyError("Passed key smaller than all existing keys")
 
-        for interval in keys:
-            if key < interval:
-                return self._sdict[prevkey]
-            prevkey = interval
-        else:
-            return self._sdict[prevkey]
+        return self._values[i - 1]
+
+    def lookup_many(self, keys: Iterable) -> List:
+        """Floors every passed key at once
+
+        Parameters
+        ----------
+        keys : ``Iterable``
+            Keys to floor to the real keys
+
+        Returns
+        -------
+        values : ``List``
+            Value of the floored key for each passed key, in order
+
+        Raises
+        ------
+        KeyError
+            If any passed key is smaller than all existing keys
+        """
+        indices = np.searchsorted(self._edges, np.asarray(keys), side="right")
+        if np.any(indices == 0):
+            raise KeyError("Passed key smaller than all existing keys")
+
+        return [self._values[i - 1] for i in indices.ravel()]
 
     def __iter__(self):
         return iter(self._sdict)
@@ -8,9 +8,12 @@ from typing import Optional
 from typing import Tuple
 from warnings import warn
 
+import numpy as np
 import pandas as pd
 from rich.progress import Progress
 
+from coinflip._randtests.common.cache import get_cache
+from coinflip._randtests.common.cache import result_key
 from coinflip._randtests.common.exceptions import NonBinarySequenceError
 from coinflip._randtests.common.exceptions import TestInputError
 from coinflip._randtests.common.typing import Face
@@ -50,6 +53,14 @@ def randtest(min_n=2):
     The `heads` and `tails` of the ``sequence`` is inferred from its unique
     values.
 
+    Tests can register a vectorised implementation via the wrapper's
+    ``batched`` decorator. A 2D array of shape ``(nsequences, n)``, or a list of
+    equal-length packed buffers, is then passed to it as a 2D array of ``0``
+    and ``1`` bits instead of being parsed as a single sequence.
+
+    Results of single sequences are read from and written to the cache set by
+    ``set_cache()``, keyed by the packed sequence, the test and its parameters.
+
     Parameters
     ----------
     min_n : ``int``, default ``2``
@@ -82,6 +93,15 @@ def randtest(min_n=2):
     def decorator(func):
         @wraps(func)
         def wrapper(sequence, ctx: Progress = None, **kwargs):
+            if wrapper.batch_func and is_batch(sequence):
+                bits, heads, tails = parse_batch(sequence)
+
+                n = bits.shape[1]
+                if n < min_n:
+                    raise MinimumInputError(n, min_n)
+
+                return wrapper.batch_func(bits, heads, tails, ctx, **kwargs)
+
             if isinstance(sequence, pd.Series):
                 series = sequence
             else:
@@ -97,15 +117,105 @@ def randtest(min_n=2):
             values = series.unique()
             heads, tails = infer_faces(tuple(values))
 
+            cache = get_cache()
+            if cache:
+                bits = (series == heads).to_numpy()
+                key = result_key(bits, heads, tails, func.__name__, kwargs)
+
+                result = cache.get(key)
+                if result is not None:
+                    set_task_total(ctx, 1)
+                    advance_task(ctx)
+                    if result.failures and not ctx:
+                        warn(make_failures_msg(result.failures), UserWarning)
+
+                    return result
+
             result = func(series, heads, tails, ctx, **kwargs)
 
+            if cache:
+                cache.put(key, result)
+
             return result
 
+        def batched(batch_func):
+            """Registers the vectorised implementation of the test"""
+            wrapper.batch_func = batch_func
+
+            return batch_func
+
+        wrapper.batch_func = None
+        wrapper.batched = batched
+
         return wrapper
 
     return decorator
 
 
+def is_batch(sequence) -> bool:
+    """Checks if ``sequence`` is a batch of sequences rather than a sequence"""
+    if isinstance(sequence, np.ndarray):
+        return sequence.ndim == 2
+    elif isinstance(sequence, (list, tuple)) and len(sequence) > 0:
+        return all(isinstance(x, (bytes, bytearray, memoryview)) for x in sequence)
+    else:
+        return False
+
+
+def parse_batch(sequences) -> Tuple[np.ndarray, Face, Face]:
+    """Parses a batch of sequences into a 2D array of bits
+
+    Parameters
+    ----------
+    sequences : ``ndarray`` or ``List[bytes]``
+        2D array of shape ``(nsequences, n)`` with two distinct values, or
+        equal-length packed buffers where each byte holds 8 bits
+
+    Returns
+    -------
+    bits : ``ndarray``
+        2D ``uint8`` array of ``0`` and ``1`` bits, where ``1`` represents
+        ``heads``
+    heads
+        Inferred heads face of ``sequences``
+    tails
+        Inferred tails face of ``sequences``
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If the sequences do not contain only 2 distinct values
+    TestInputError
+        If packed buffers are of different lengths
+    """
+    if isinstance(sequences, np.ndarray):
+        if sequences.dtype.kind in "biu":
+            # Integers are only compared to their extremes, avoiding a sort
+            values = np.array([sequences.min(), sequences.max()])
+            if np.any((sequences != values[0]) & (sequences != values[1])):
+                raise NonBinarySequenceError()
+        else:
+            values = np.unique(sequences)
+        if len(set(values.tolist())) != 2:
+            raise NonBinarySequenceError()
+        heads, tails = infer_faces(tuple(values.tolist()))
+
+        if sequences.dtype == np.uint8 and (heads, tails) == (1, 0):
+            bits = sequences
+        else:
+            bits = (sequences == heads).astype(np.uint8)
+
+    else:
+        buffers = [np.frombuffer(buffer, dtype=np.uint8) for buffer in sequences]
+        if len({len(buffer) for buffer in buffers}) != 1:
+            raise TestInputError("Packed sequences must all be the same length")
+        heads, tails = 1, 0
+
+        bits = np.unpackbits(np.stack(buffers), axis=1)
+
+    return bits, heads, tails
+
+
 @lru_cache()
 def infer_faces(unique_values: Tuple[Face, Face]) -> Tuple[Face, Face]:
     """Infers the `heads` and `tails` faces from a list of unique values
@@ -8,6 +8,8 @@ from typing import List
 from typing import Tuple
 from typing import Union
 
+import numpy as np
+import pandas as pd
 from rich import box
 from rich.console import Console
 from rich.console import ConsoleRenderable
@@ -32,6 +34,7 @@ __all__ = [
     "BaseTestResult",
     "TestResult",
     "MultiTestResult",
+    "BatchTestResult",
     "make_testvars_table",
     "make_chisquare_table",
     "smartround",
@@ -179,6 +182,36 @@ class MultiTestResult(BaseTestResult):
         return meta_table
 
 
+@dataclass
+class BatchTestResult(BaseTestResult):
+    statistics: np.ndarray
+    pvalues: np.ndarray
+
+    @property
+    def nsequences(self) -> Integer:
+        return len(self.pvalues)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Statistic and p-value of every sequence, indexed by sequence"""
+        index = pd.RangeIndex(self.nsequences, name="sequence")
+
+        return pd.DataFrame(
+            {"statistic": self.statistics, "p": self.pvalues}, index=index
+        )
+
+    def _render(self):
+        with np.errstate(invalid="ignore"):
+            nfailing = int(np.count_nonzero(self.pvalues < 0.01))
+
+        yield make_testvars_list(
+            "batch results",
+            ("nsequences", self.nsequences),
+            ("min p-value", round(float(np.nanmin(self.pvalues)), 3)),
+            ("p < 0.01", nfailing),
+        )
+
+
 def make_chisquare_table(
     title: Union[str, Text],
     feature: Union[Text, str],
@@ -3,12 +3,21 @@ from typing import Any
 from typing import Iterator
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Integer
+
 __all__ = [
     "blocks",
     "rawblocks",
     "slider",
+    "binarise",
+    "window_codes",
+    "cyclic_pattern_counts",
+    "marginalise_counts",
+    "random_walk",
 ]
 
 
@@ -84,3 +93,131 @@ def slider(series, window_size) -> Iterator[Tuple[Any]]:
             window_tup = tuple(window)
 
             yield window_tup
+
+
+def binarise(series, heads: Face) -> np.ndarray:
+    """Represents a ``Series`` as an array of ``0`` and ``1`` bits
+
+    Parameters
+    ----------
+    series : ``Series``
+        The pandas ``Series`` to represent
+    heads : ``Face``
+        Value in ``series`` which represents the ``1`` bit
+
+    Returns
+    -------
+    bits : ``ndarray``
+        ``uint8`` array where ``heads`` is ``1`` and everything else is ``0``
+    """
+    return (series == heads).to_numpy(dtype=np.uint8)
+
+
+def window_codes(bits: np.ndarray, blocksize: Integer) -> np.ndarray:
+    """Encodes every overlapping window of a sequence as an integer
+
+    Parameters
+    ----------
+    bits : ``ndarray``
+        Array of ``0`` and ``1`` bits
+    blocksize : ``Integer``
+        Size of the windows
+
+    Returns
+    -------
+    codes : ``ndarray``
+        Integer encoding of each window of ``blocksize`` bits that fits in
+        ``bits``, where the first bit of a window is the most significant
+    """
+    nwindows = max(len(bits) - blocksize + 1, 0)
+
+    codes = np.zeros(nwindows, dtype=np.min_scalar_type(2 ** blocksize - 1))
+    for offset in range(blocksize):
+        shift = blocksize - 1 - offset
+        codes |= bits[offset : offset + nwindows].astype(codes.dtype) << shift
+
+    return codes
+
+
+def cyclic_pattern_counts(bits: np.ndarray, blocksize: Integer) -> np.ndarray:
+    """Histogram of overlapping patterns in a sequence wrapped around on itself
+
+    Every window of ``blocksize`` bits starting at each position of ``bits`` is
+    encoded as an integer (the first bit being the most significant), where
+    windows that pass the end of ``bits`` continue from its start. The
+    wraparound is handled by offsetting slices, so no "ouroboros" copy of the
+    sequence is ever made.
+
+    Parameters
+    ----------
+    bits : ``ndarray``
+        Array of ``0`` and ``1`` bits
+    blocksize : ``Integer``
+        Size of the patterns
+
+    Returns
+    -------
+    counts : ``ndarray``
+        Dense array of length ``2 ** blocksize``, where the count of each
+        pattern is found at the index of its integer encoding
+
+    See Also
+    --------
+    marginalise_counts: Derive the counts of smaller patterns from ``counts``
+    """
+    n = len(bits)
+    if blocksize == 0:
+        return np.array([n])
+
+    codes = np.zeros(n, dtype=np.min_scalar_type(2 ** blocksize - 1))
+    for offset in range(blocksize):
+        shift = blocksize - 1 - offset
+        i = offset % n
+
+        codes[: n - i] |= bits[i:].astype(codes.dtype) << shift
+        codes[n - i :] |= bits[:i].astype(codes.dtype) << shift
+
+    return np.bincount(codes, minlength=2 ** blocksize)
+
+
+def marginalise_counts(counts: np.ndarray, nbits: Integer = 1) -> np.ndarray:
+    """Sums pattern counts over their last bits
+
+    Cyclic pattern counts are consistent, i.e. every window of ``blocksize - 1``
+    bits is the prefix of exactly one window of ``blocksize`` bits, so the
+    histogram of smaller patterns can be found without re-reading the sequence.
+
+    Parameters
+    ----------
+    counts : ``ndarray``
+        Dense pattern counts, as returned by ``cyclic_pattern_counts``
+    nbits : ``Integer``, default ``1``
+        Number of trailing bits to sum over
+
+    Returns
+    -------
+    counts : ``ndarray``
+        Dense pattern counts of patterns ``nbits`` smaller
+    """
+    return counts.reshape(-1, 2 ** nbits).sum(axis=1)
+
+
+def random_walk(bits: np.ndarray) -> np.ndarray:
+    """Cumulative sums of a sequence treated as steps up and down
+
+    Parameters
+    ----------
+    bits : ``ndarray``
+        Array of ``0`` and ``1`` bits, which step the walk down and up. A 2D
+        array is walked along each row.
+
+    Returns
+    -------
+    walk : ``ndarray``
+        Position of the walk after each step, using the narrowest integer type
+        that can hold any position
+    """
+    oscillations = 2 * bits.astype(np.int8) - 1
+    dtype = np.int32 if bits.shape[-1] < 2 ** 31 else np.int64
+
+    return np.cumsum(oscillations, axis=-1, dtype=dtype)
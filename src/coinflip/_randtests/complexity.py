@@ -1,4 +1,4 @@
-from copy import copy
+from copy import deepcopy
 from dataclasses import dataclass
 from math import floor
 from math import sqrt
@@ -6,19 +6,22 @@ from typing import Dict
 from typing import List
 from typing import Sequence
 
+import numpy as np
 from scipy.stats import chisquare
 from typing_extensions import Literal
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.collections import Bins
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.result import make_chisquare_table
 from coinflip._randtests.common.result import smartround
 from coinflip._randtests.common.testutils import rawblocks
+from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["linear_complexity"]
+__all__ = ["linear_complexity", "LinearComplexityAccumulator"]
 
 
 # TODO - remove hardcoded degrees of freedom
@@ -40,51 +43,93 @@ def linear_complexity(series, heads, tails, ctx, blocksize=None):
     n = len(series)
 
     if not blocksize:
-        for blocksize in [1000, 2500, 500, 5000]:
-            nblocks = n // blocksize
-            if 500 <= blocksize <= 5000 and nblocks >= 200:
-                break
-        else:
-            blocksize = max(floor(sqrt(n)), 2)
+        blocksize = default_blocksize(n)
 
     nblocks = n // blocksize
 
     set_task_total(ctx, nblocks + 3)
 
     failures = check_recommendations(
-        ctx,
-        {
-            "n ≥ 1000000": n >= 1000000,
-            "500 ≤ blocksize ≤ 5000": 500 <= blocksize <= 5000,
-            "nblocks ≥ 200": nblocks >= 200,
-        },
+        ctx, linear_complexity_recommendations(n, blocksize, nblocks)
     )
 
     binary = series.map({heads: 1, tails: 0})
 
     advance_task(ctx)
 
-    mean_expect = (
-        blocksize / 2
-        + (9 + (-(1 ** (blocksize + 1)))) / 36
-        - (blocksize / 3 + 2 / 9) / 2 ** blocksize
-    )
-    expected_bincounts = [nblocks * prob for prob in probabilities]
+    mean_expect = expected_mean(blocksize)
 
     advance_task(ctx)
 
-    variance_bins = Bins([-3, -2, -1, 0, 1, 2, 3])
+    linear_complexities = []
     for block_tup in rawblocks(binary, blocksize):
         linear_complexity = berlekamp_massey(block_tup)
-        variance = (-1) ** blocksize * (linear_complexity - mean_expect) + 2 / 9
-        variance_bins[variance] += 1
+        linear_complexities.append(linear_complexity)
 
         advance_task(ctx)
 
-    statistic, p = chisquare(list(variance_bins.values()), expected_bincounts)
+    variance_bins = Bins([-3, -2, -1, 0, 1, 2, 3])
+    variance_bins.add_many(
+        complexity_variances(np.array(linear_complexities), blocksize, mean_expect)
+    )
+
+    result = linear_complexity_from_bins(
+        heads, tails, failures, blocksize, variance_bins
+    )
 
     advance_task(ctx)
 
+    return result
+
+
+def default_blocksize(n: Integer) -> Integer:
+    for blocksize in [1000, 2500, 500, 5000]:
+        nblocks = n // blocksize
+        if 500 <= blocksize <= 5000 and nblocks >= 200:
+            return blocksize
+
+    return max(floor(sqrt(n)), 2)
+
+
+def linear_complexity_recommendations(
+    n: Integer, blocksize: Integer, nblocks: Integer
+) -> Dict[str, bool]:
+    return {
+        "n ≥ 1000000": n >= 1000000,
+        "500 ≤ blocksize ≤ 5000": 500 <= blocksize <= 5000,
+        "nblocks ≥ 200": nblocks >= 200,
+    }
+
+
+def expected_mean(blocksize: Integer) -> Float:
+    return (
+        blocksize / 2
+        + (9 + (-(1 ** (blocksize + 1)))) / 36
+        - (blocksize / 3 + 2 / 9) / 2 ** blocksize
+    )
+
+
+def complexity_variances(
+    linear_complexities: np.ndarray, blocksize: Integer, mean_expect: Float
+) -> np.ndarray:
+    deviations = linear_complexities - mean_expect
+
+    return (-1) ** blocksize * deviations + 2 / 9
+
+
+def linear_complexity_from_bins(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    blocksize: Integer,
+    variance_bins: Bins,
+) -> "LinearComplexityTestResult":
+    nblocks = sum(variance_bins.values())
+    mean_expect = expected_mean(blocksize)
+    expected_bincounts = [nblocks * prob for prob in probabilities]
+
+    statistic, p = chisquare(list(variance_bins.values()), expected_bincounts)
+
     return LinearComplexityTestResult(
         heads,
         tails,
@@ -98,6 +143,67 @@ def linear_complexity(series, heads, tails, ctx, blocksize=None):
     )
 
 
+class LinearComplexityAccumulator(Accumulator):
+    """Linear complexity test ran incrementally over chunks of a sequence
+
+    The linear complexity of each block is found as soon as it is completed,
+    so only the binned variances of the blocks are kept between chunks, as
+    well as the bits of the block left open at the end of the last chunk.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``
+        Size of the blocks that partition the sequence, which the batch test
+        derives from the length of the sequence
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    def __init__(self, blocksize: Integer, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.blocksize = blocksize
+        self.mean_expect = expected_mean(blocksize)
+        self.variance_bins = Bins([-3, -2, -1, 0, 1, 2, 3])
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+
+    def _update(self, bits):
+        blocksize = self.blocksize
+
+        bits = np.concatenate([self._open_bits, bits])
+        nblocks = len(bits) // blocksize
+        boundary = nblocks * blocksize
+        self._open_bits = bits[boundary:]
+
+        linear_complexities = np.array(
+            [
+                berlekamp_massey(block)
+                for block in bits[:boundary].reshape(nblocks, blocksize).tolist()
+            ]
+        )
+        self.variance_bins.add_many(
+            complexity_variances(linear_complexities, blocksize, self.mean_expect)
+        )
+
+    def result(self) -> "LinearComplexityTestResult":
+        self._check_input()
+
+        nblocks = self.n // self.blocksize
+        failures = check_recommendations(
+            None,
+            linear_complexity_recommendations(self.n, self.blocksize, nblocks),
+        )
+
+        return linear_complexity_from_bins(
+            self.heads,
+            self.tails,
+            failures,
+            self.blocksize,
+            deepcopy(self.variance_bins),
+        )
+
+
 @dataclass
 class LinearComplexityTestResult(TestResult):
     blocksize: Integer
@@ -123,34 +229,23 @@ class LinearComplexityTestResult(TestResult):
 
 def berlekamp_massey(sequence: Sequence[Literal[0, 1]]) -> int:
     """Finds the shortest LSFR in a sequence"""
-    n = len(sequence)
-
-    error_locator = [0 for _ in range(n)]
-    error_locator[0] = 1
-
-    error_locator_prev = copy(error_locator)
+    # Polynomials over GF(2) are held as ints, where bit j is the coefficient
+    # of x^j, so they are updated with shifts and XORs
+    error_locator = 1
+    error_locator_prev = 1
 
     min_size = 0  # of the LSFR
     nloops = -1  # since error_locator_prev and min_size were updated
 
+    seq_window = 0  # where bit j is the bit j places before the current bit
     for i, seq_bit in enumerate(sequence):
-        discrepancy = seq_bit
-        seq_window = reversed(sequence[i - min_size : i])
-        errloc_window = error_locator[1 : min_size + 1]
-        for seq_bit, errloc_bit in zip(seq_window, errloc_window):
-            product = seq_bit & errloc_bit
-            discrepancy = discrepancy ^ product
+        seq_window = (seq_window << 1) | int(seq_bit)
+        discrepancy = bin(error_locator & seq_window).count("1") & 1
 
         if discrepancy:
-            error_locator_temp = copy(error_locator)
-
-            recalc_bits = []
-            for errloc_bit, prev_bit in zip(
-                error_locator[i - nloops : n], error_locator_prev
-            ):
-                bit = errloc_bit ^ prev_bit
-                recalc_bits.append(bit)
-            error_locator[i - nloops : n] = recalc_bits
+            error_locator_temp = error_locator
+
+            error_locator ^= error_locator_prev << (i - nloops)
 
             if min_size <= i / 2:
                 min_size = i + 1 - min_size
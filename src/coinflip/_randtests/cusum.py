@@ -1,15 +1,34 @@
 from dataclasses import dataclass
 from math import floor
 from math import sqrt
+from typing import List
+from typing import Tuple
 
 import numpy as np
-from scipy.stats import norm
+from rich.text import Text
+from scipy.special import ndtr
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.core import *
+from coinflip._randtests.common.result import BatchTestResult
+from coinflip._randtests.common.result import MultiTestResult
+from coinflip._randtests.common.result import SubTestResult
 from coinflip._randtests.common.result import TestResult
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.testutils import random_walk
 from coinflip._randtests.common.typing import Bool
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Float
+from coinflip._randtests.common.typing import Integer
 
-__all__ = ["cusum"]
+__all__ = [
+    "cusum",
+    "bidirectional_cusum",
+    "cusum_maxima",
+    "cusum_p",
+    "CusumAccumulator",
+    "BidirectionalCusumAccumulator",
+]
 
 
 @randtest()
@@ -20,40 +39,241 @@ def cusum(series, heads, tails, ctx, reverse=False):
 
     failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
 
-    oscillations = series.map({heads: 1, tails: -1})
+    forward_max, reverse_max = walk_maxima(binarise(series, heads))
+    max_cusum = reverse_max if reverse else forward_max
 
     advance_task(ctx)
 
-    if reverse:
-        oscillations = oscillations[::-1]
+    p = cusum_p(max_cusum, n)
+
+    advance_task(ctx)
 
-    cusums = oscillations.cumsum()
-    abs_cusums = cusums.abs()
-    max_cusum = abs_cusums.nlargest(1).iloc[0]
+    result = CusumTestResult(heads, tails, failures, max_cusum, p, reverse)
 
     advance_task(ctx)
 
-    # TODO this all can be done more elegantly
-    start1 = floor((-n / max_cusum + 1) / 4)
-    start2 = floor((-n / max_cusum - 3) / 4)
-    stop = floor((n / max_cusum - 1) / 4) + 1
-    p = (
-        1
-        - sum(
-            norm.cdf((4 * k + 1) * max_cusum / sqrt(n))
-            - norm.cdf((4 * k - 1) * max_cusum / sqrt(n))
-            for k in np.arange(start1, stop, 1)
+    return result
+
+
+@cusum.batched
+def cusum_batch(bits, heads, tails, ctx, reverse=False):
+    n = bits.shape[1]
+
+    failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
+
+    walks = random_walk(bits)
+    totals = walks[:, -1]
+    maxima = np.maximum(walks.max(axis=1), 0)
+    minima = np.minimum(walks.min(axis=1), 0)
+
+    if reverse:
+        max_cusums = np.maximum(totals - minima, maxima - totals)
+    else:
+        max_cusums = np.maximum(maxima, -minima)
+
+    # Maxima are bounded by n, so each distinct maximum's p-value is found once
+    uniq_max_cusums, indices = np.unique(max_cusums, return_inverse=True)
+    uniq_pvalues = np.array([cusum_p(max_cusum, n) for max_cusum in uniq_max_cusums])
+    pvalues = uniq_pvalues[indices]
+
+    return BatchTestResult(heads, tails, failures, max_cusums, pvalues)
+
+
+class CusumAccumulator(Accumulator):
+    """Cumulative sums test ran incrementally over chunks of a sequence
+
+    Only the position of the walk and the extremes it has visited are kept
+    between chunks, as both modes' maximum cusums are found from them.
+
+    Parameters
+    ----------
+    reverse : ``bool``, default ``False``
+        Find the maximum cusum starting from the end of the sequence
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    def __init__(self, reverse: Bool = False, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.reverse = reverse
+        self.total = 0
+        self.maximum = 0
+        self.minimum = 0
+
+    def _update(self, bits):
+        walk = random_walk(bits)
+
+        self.maximum = max(self.maximum, self.total + int(walk.max()))
+        self.minimum = min(self.minimum, self.total + int(walk.min()))
+        self.total += int(walk[-1])
+
+    def result(self) -> "CusumTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 100": self.n >= 100})
+
+        forward_max, reverse_max = cusum_maxima(
+            self.total, self.maximum, self.minimum
         )
-        + sum(
-            norm.cdf((4 * k + 3) * max_cusum / sqrt(n))
-            - norm.cdf((4 * k + 1) * max_cusum / sqrt(n))
-            for k in np.arange(start2, stop, 1)
+        max_cusum = reverse_max if self.reverse else forward_max
+        p = cusum_p(max_cusum, self.n)
+
+        return CusumTestResult(
+            self.heads, self.tails, failures, max_cusum, p, self.reverse
         )
+
+
+@randtest()
+def bidirectional_cusum(series, heads, tails, ctx):
+    n = len(series)
+
+    set_task_total(ctx, 2)
+
+    failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
+
+    forward_max, reverse_max = walk_maxima(binarise(series, heads))
+
+    advance_task(ctx)
+
+    result = bidirectional_cusum_from_maxima(
+        heads, tails, failures, forward_max, reverse_max, n
     )
 
     advance_task(ctx)
 
-    return CusumTestResult(heads, tails, failures, max_cusum, p, reverse)
+    return result
+
+
+def bidirectional_cusum_from_maxima(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    forward_max: Integer,
+    reverse_max: Integer,
+    n: Integer,
+) -> "BidirectionalCusumMultiTestResult":
+    """Finds the result of both modes of the cusum test from their maximum cusums"""
+    results = {
+        "forward": CusumSubTestResult(forward_max, cusum_p(forward_max, n), False),
+        "reverse": CusumSubTestResult(reverse_max, cusum_p(reverse_max, n), True),
+    }
+
+    return BidirectionalCusumMultiTestResult(heads, tails, failures, results)
+
+
+class BidirectionalCusumAccumulator(CusumAccumulator):
+    """Cumulative sums test of both modes ran incrementally over chunks of a sequence
+
+    Parameters
+    ----------
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    def __init__(self, heads: Face = 1, tails: Face = 0):
+        super().__init__(False, heads, tails)
+
+    def result(self) -> "BidirectionalCusumMultiTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 100": self.n >= 100})
+
+        forward_max, reverse_max = cusum_maxima(
+            self.total, self.maximum, self.minimum
+        )
+
+        return bidirectional_cusum_from_maxima(
+            self.heads, self.tails, failures, forward_max, reverse_max, self.n
+        )
+
+
+def walk_maxima(bits: np.ndarray) -> Tuple[Integer, Integer]:
+    """Finds the furthest detours of a random walk, from either end
+
+    Parameters
+    ----------
+    bits : ``ndarray``
+        Array of ``0`` and ``1`` bits, which step the walk down and up
+
+    Returns
+    -------
+    forward_max : ``Integer``
+        Largest absolute cumulative sum starting from the first bit
+    reverse_max : ``Integer``
+        Largest absolute cumulative sum starting from the last bit
+    """
+    cusums = random_walk(bits)
+
+    return cusum_maxima(cusums[-1], cusums.max(), cusums.min())
+
+
+def cusum_maxima(
+    total: Integer, maximum: Integer, minimum: Integer
+) -> Tuple[Integer, Integer]:
+    """Finds the forward and reverse maximum cusums of a random walk
+
+    Every partial sum from the end of the walk is the ``total`` minus a
+    partial sum from the start, so the reverse mode is found from the extremes
+    of the forward walk without walking it backwards.
+
+    Parameters
+    ----------
+    total : ``Integer``
+        Final position of the walk
+    maximum : ``Integer``
+        Largest position the walk visited
+    minimum : ``Integer``
+        Smallest position the walk visited
+
+    Returns
+    -------
+    forward_max : ``Integer``
+        Largest absolute cumulative sum starting from the first step
+    reverse_max : ``Integer``
+        Largest absolute cumulative sum starting from the last step
+    """
+    maximum = max(int(maximum), 0)
+    minimum = min(int(minimum), 0)
+    total = int(total)
+
+    forward_max = max(maximum, -minimum)
+    reverse_max = max(total - minimum, maximum - total)
+
+    return forward_max, reverse_max
+
+
+def cusum_p(max_cusum: Integer, n: Integer) -> Float:
+    """Finds the p-value of a walk's maximum cusum
+
+    Parameters
+    ----------
+    max_cusum : ``Integer``
+        Largest absolute cumulative sum of the walk
+    n : ``Integer``
+        Number of steps in the walk
+
+    Returns
+    -------
+    p : ``Float``
+        p-value of ``max_cusum``
+    """
+    z = max_cusum / sqrt(n)
+
+    stop = floor((n / max_cusum - 1) / 4) + 1
+    k1 = np.arange(floor((-n / max_cusum + 1) / 4), stop)
+    k2 = np.arange(floor((-n / max_cusum - 3) / 4), stop)
+
+    p = (
+        1
+        - np.sum(ndtr((4 * k1 + 1) * z) - ndtr((4 * k1 - 1) * z))
+        + np.sum(ndtr((4 * k2 + 3) * z) - ndtr((4 * k2 + 1) * z))
+    )
+
+    return p
 
 
 @dataclass
@@ -62,3 +282,19 @@ class CusumTestResult(TestResult):
 
     def _render(self):
         yield self._pretty_result("max cusum")
+
+
+@dataclass
+class CusumSubTestResult(SubTestResult):
+    reverse: Bool
+
+
+class BidirectionalCusumMultiTestResult(MultiTestResult):
+    def _pretty_feature(self, result: CusumSubTestResult):
+        return Text("reverse" if result.reverse else "forward", style="bold")
+
+    def _render(self):
+        yield self._results_table("mode", "max cusum")
+
+    def _render_sub(self, result: CusumSubTestResult):
+        yield result._pretty_result("max cusum")
@@ -1,18 +1,28 @@
-from collections import defaultdict
 from dataclasses import dataclass
 from math import floor
 from math import log
 from math import log2
+from typing import Dict
+from typing import List
 
-import pandas as pd
+import numpy as np
 from scipy.special import gammaincc
 
+from coinflip._randtests.common.accumulator import PatternAccumulator
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.result import TestResult
-from coinflip._randtests.common.testutils import slider
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.testutils import cyclic_pattern_counts
+from coinflip._randtests.common.testutils import marginalise_counts
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["approximate_entropy"]
+__all__ = [
+    "approximate_entropy",
+    "approximate_entropy_from_counts",
+    "ApproximateEntropyAccumulator",
+]
 
 
 @randtest()
@@ -20,46 +30,132 @@ def approximate_entropy(series, heads, tails, ctx, blocksize=None):
     n = len(series)
 
     if not blocksize:
-        blocksize = max(floor(log2(n)) - 5 - 1, 2)
+        blocksize = default_blocksize(n)
 
-    set_task_total(ctx, (n + 2) * 2 + 1)
+    set_task_total(ctx, 3)
 
-    failures = check_recommendations(
-        ctx, {"blocksize < ⌊log2(n)⌋ - 5": blocksize < floor(log2(n)) - 5}
-    )
+    failures = check_recommendations(ctx, entropy_recommendations(n, blocksize))
 
-    phis = []
-    for template_size in [blocksize, blocksize + 1]:
-        head = series[: template_size - 1]
-        ouroboros = pd.concat([series, head])
+    bits = binarise(series, heads)
 
-        permutation_counts = defaultdict(int)
-        for window_tup in slider(ouroboros, template_size):
-            permutation_counts[window_tup] += 1
+    advance_task(ctx)
 
-            advance_task(ctx)
+    next_counts = cyclic_pattern_counts(bits, blocksize + 1)
 
-        normalised_counts = []
-        for count in permutation_counts.values():
-            normcount = count / n
-            normalised_counts.append(normcount)
+    advance_task(ctx)
 
-        advance_task(ctx)
+    result = approximate_entropy_from_counts(
+        heads, tails, failures, next_counts, blocksize, n
+    )
 
-        phi = sum(normcount * log(normcount) for normcount in normalised_counts)
-        phis.append(phi)
+    advance_task(ctx)
 
-        advance_task(ctx)
+    return result
+
+
+def default_blocksize(n: Integer) -> Integer:
+    return max(floor(log2(n)) - 5 - 1, 2)
+
+
+def entropy_recommendations(n: Integer, blocksize: Integer) -> Dict[str, bool]:
+    return {"blocksize < ⌊log2(n)⌋ - 5": blocksize < floor(log2(n)) - 5}
+
+
+def approximate_entropy_from_counts(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    next_counts: np.ndarray,
+    blocksize: Integer,
+    n: Integer,
+) -> "ApproximateEntropyTestResult":
+    """Finds the approximate entropy test result from cyclic counts of patterns
+
+    Parameters
+    ----------
+    heads : ``Face``
+        The ``1`` abstraction
+    tails : ``Face``
+        The ``0`` abstraction
+    failures : ``List[str]``
+        Recommendations the test input did not meet
+    next_counts : ``ndarray``
+        Dense cyclic counts of patterns of size ``blocksize + 1``
+    blocksize : ``Integer``
+        Size of the patterns
+    n : ``Integer``
+        Length of the sequence the patterns were counted from
+
+    Returns
+    -------
+    result : ``ApproximateEntropyTestResult``
+        Result of the test
+    """
+    counts = marginalise_counts(next_counts)
+    approx_entropy = phi(counts, n) - phi(next_counts, n)
 
-    approx_entropy = phis[0] - phis[1]
     chi2 = 2 * n * (log(2) - approx_entropy)
     p = gammaincc(2 ** (blocksize - 1), chi2 / 2)
 
-    advance_task(ctx)
-
     return ApproximateEntropyTestResult(heads, tails, failures, chi2, p, blocksize)
 
 
+class ApproximateEntropyAccumulator(PatternAccumulator):
+    """Approximate entropy test ran incrementally over chunks of a sequence
+
+    Only the counts of overlapping patterns one bit larger than the blocksize
+    are kept between chunks, along with the bits needed to complete the
+    patterns which span chunks or wrap around the sequence.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``, optional
+        Size of the patterns. By default the size for the length of the
+        sequence is used, up to a size of ``max_blocksize``.
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    max_blocksize : ``Integer``, default ``15``
+        Largest pattern size that can be found by default
+    """
+
+    def __init__(
+        self,
+        blocksize: Integer = None,
+        heads: Face = 1,
+        tails: Face = 0,
+        max_blocksize: Integer = 15,
+    ):
+        super().__init__((blocksize or max_blocksize) + 1, heads, tails)
+        self.blocksize = blocksize
+
+    def result(self) -> "ApproximateEntropyTestResult":
+        self._check_input()
+
+        n = self.n
+        blocksize = self.blocksize or min(
+            default_blocksize(n), self.max_blocksize - 1
+        )
+        failures = check_recommendations(None, entropy_recommendations(n, blocksize))
+
+        return approximate_entropy_from_counts(
+            self.heads,
+            self.tails,
+            failures,
+            self.cyclic_counts(blocksize + 1),
+            blocksize,
+            n,
+        )
+
+
+def phi(counts: np.ndarray, n: Integer) -> Float:
+    """Finds φ⁽ᵐ⁾, the sum of x log(x) over the normalised pattern counts"""
+    normcounts = counts[counts > 0] / n
+
+    return np.sum(normcounts * np.log(normcounts))
+
+
 @dataclass
 class ApproximateEntropyTestResult(TestResult):
     blocksize: Integer
@@ -1,86 +1,212 @@
-from collections import Counter
+from copy import deepcopy
 from dataclasses import dataclass
-from math import erfc
-from math import sqrt
-
-import pandas as pd
+from functools import lru_cache
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
 from rich.text import Text
+from scipy.special import erfc
 from scipy.stats import chisquare
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.collections import Bins
 from coinflip._randtests.common.core import *
+from coinflip._randtests.common.exceptions import TestInputError
 from coinflip._randtests.common.result import MultiTestResult
 from coinflip._randtests.common.result import SubTestResult
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.testutils import random_walk
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["random_excursions", "random_excursions_variant"]
+__all__ = [
+    "random_excursions",
+    "random_excursions_variant",
+    "RandomExcursionsAccumulator",
+    "RandomExcursionsVariantAccumulator",
+]
 
 # ------------------------------------------------------------------------------
 # Random Excursions Test
 
-# TODO comment why these states and df were chosen
-states = [-4, -3, -2, -1, 1, 2, 3, 4]
+# SP800-22 tests the states ±1 to ±4, as the visits to further states are too
+# sparse for the chi-square approximation at recommended sequence lengths
+default_states = [-4, -3, -2, -1, 1, 2, 3, 4]
 df = 5
 
-# TODO calculate these dynamically
-state_probabilities = {
-    1: [0.5000, 0.2500, 0.1250, 0.0625, 0.0312, 0.0312],
-    2: [0.7500, 0.0625, 0.0469, 0.0352, 0.0264, 0.0791],
-    3: [0.8333, 0.0278, 0.0231, 0.0193, 0.0161, 0.0804],
-    4: [0.8750, 0.0156, 0.0137, 0.0120, 0.0105, 0.0733],
-    5: [0.9000, 0.0100, 0.0090, 0.0081, 0.0073, 0.0656],
-    6: [0.9167, 0.0069, 0.0064, 0.0058, 0.0053, 0.0588],
-    7: [0.9286, 0.0051, 0.0047, 0.0044, 0.0041, 0.0531],
-}
+
+@lru_cache()
+def state_probabilities(state: Integer, maxcount: Integer = df) -> Tuple[Float, ...]:
+    """Probabilities of a cycle visiting a state 0 to ``maxcount`` (or more) times
+
+    Parameters
+    ----------
+    state : ``Integer``
+        Non-zero state of a random walk
+    maxcount : ``Integer``, default ``5``
+        Visit count where any larger counts are binned together
+
+    Returns
+    -------
+    probabilities : ``Tuple[Float, ...]``
+        Probability of ``0``, ``1``, ..., ``maxcount - 1`` and then ``maxcount``
+        or more visits to ``state`` in a cycle
+
+    Notes
+    -----
+    See section 3.14, "Random Excursions Test", p. 84 of SP800-22, where the
+    probability of exactly ``k`` visits to state ``x`` in a cycle is
+
+        π₀(x) = 1 - 1 / 2|x|
+
+        πₖ(x) = 1 / 4x² (1 - 1 / 2|x|)ᵏ⁻¹
+
+    and the probability of ``maxcount`` or more visits is the remainder
+
+        π(x) = 1 / 2|x| (1 - 1 / 2|x|)ᵐᵃˣᶜᵒᵘⁿᵗ⁻¹
+    """
+    revisit_prob = 1 - 1 / (2 * abs(state))
+
+    probabilities = [revisit_prob]
+    for count in range(1, maxcount):
+        prob = 1 / (4 * state ** 2) * revisit_prob ** (count - 1)
+        probabilities.append(prob)
+    last_prob = 1 / (2 * abs(state)) * revisit_prob ** (maxcount - 1)
+    probabilities.append(last_prob)
+
+    return tuple(probabilities)
 
 
 @randtest()
-def random_excursions(series, heads, tails, ctx):
+def random_excursions(series, heads, tails, ctx, states=None):
     n = len(series)
 
+    states = check_states(states)
+
     set_task_total(ctx, 4)
 
     failures = check_recommendations(ctx, {"n ≥ 1000000": n >= 1000000})
 
-    oscillations = series.map({heads: 1, tails: -1})
-    cumulative_sums = oscillations.cumsum()
+    walk = random_walk(binarise(series, heads))
 
     advance_task(ctx)
 
-    head = pd.Series({-1: 0})
-    tail = pd.Series({n + 1: 0})
-    walk = pd.concat([head, cumulative_sums, tail])
+    ncycles, state_visits = cycle_state_visits(walk, states)
 
     advance_task(ctx)
 
     # TODO standardise or differentiate language of "bins"/"occurences"/"bincounts"
-    ncycles = 0
-    state_count_bins = {state: Bins(range(df + 1)) for state in states}
-    for cycle in ascycles(walk):
-        ncycles += 1
-        state_counts = Counter(cycle)
-        for state in states:
-            count = state_counts[state]
-            state_count_bins[state][count] += 1
+    state_count_bins = {}
+    for state, counts in zip(states, state_visits.T):
+        state_count_bins[state] = Bins(range(df + 1))
+        state_count_bins[state].add_many(counts)
+
+    advance_task(ctx)
+
+    result = random_excursions_from_bins(
+        heads, tails, failures, ncycles, state_count_bins
+    )
 
     advance_task(ctx)
 
+    return result
+
+
+def check_states(states: Optional[Sequence[Integer]]) -> List[Integer]:
+    if states is None:
+        states = default_states
+    states = sorted(states)
+    if 0 in states:
+        raise TestInputError("State 0 cannot be tested, as it delimits cycles")
+
+    return states
+
+
+def random_excursions_from_bins(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    ncycles: Integer,
+    state_count_bins: Dict[Integer, Bins],
+) -> "RandomExcursionsMultiTestResult":
     results = {}
-    for state in states:
-        probabilities = state_probabilities[abs(state)]
+    for state, bins in state_count_bins.items():
+        probabilities = state_probabilities(state)
         expected_bincounts = [ncycles * prob for prob in probabilities]
 
-        bincounts = state_count_bins[state].values()
+        bincounts = bins.values()
 
         chi2, p = chisquare(list(bincounts), expected_bincounts)
 
         results[state] = RandomExcursionsSubTestResult(chi2, p, state)
 
-    advance_task(ctx)
-
     return RandomExcursionsMultiTestResult(heads, tails, failures, results)
 
 
+class RandomExcursionsAccumulator(Accumulator):
+    """Random excursions test ran incrementally over chunks of a sequence
+
+    The position of the walk and the visits to each state in the cycle left
+    open at the end of the last chunk are kept, and every completed cycle's
+    visits are binned as it closes.
+
+    Parameters
+    ----------
+    states : ``List[Integer]``, optional
+        Non-zero states to test, defaulting to ±1 to ±4
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    def __init__(
+        self,
+        states: Optional[List[Integer]] = None,
+        heads: Face = 1,
+        tails: Face = 0,
+    ):
+        super().__init__(heads, tails)
+        self.states = check_states(states)
+        self.position = 0
+        self.ncycles = 1
+        self.state_count_bins = {state: Bins(range(df + 1)) for state in self.states}
+        self._open_visits = np.zeros(len(self.states), dtype=np.int64)
+
+    def _update(self, bits):
+        walk = random_walk(bits).astype(np.int64)
+        walk += self.position
+        self.position = int(walk[-1])
+
+        ncycles, state_visits = cycle_state_visits(walk, self.states)
+        state_visits[0] += self._open_visits
+
+        # All but the last cycle were closed by a return to the origin
+        for state, counts in zip(self.states, state_visits[:-1].T):
+            self.state_count_bins[state].add_many(counts)
+        self.ncycles += ncycles - 1
+        self._open_visits = state_visits[-1]
+
+    def result(self) -> "RandomExcursionsMultiTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 1000000": self.n >= 1000000})
+
+        # The open cycle is closed by the zero padding the end of the walk
+        state_count_bins = deepcopy(self.state_count_bins)
+        for state, count in zip(self.states, self._open_visits):
+            state_count_bins[state][count] += 1
+
+        return random_excursions_from_bins(
+            self.heads, self.tails, failures, self.ncycles, state_count_bins
+        )
+
+
 @dataclass
 class RandomExcursionsSubTestResult(SubTestResult):
     state: Integer
@@ -97,17 +223,41 @@ class RandomExcursionsMultiTestResult(MultiTestResult):
         yield result._pretty_result("chi-square")
 
 
-def ascycles(walk):
-    items = walk.items()
-    _, firstval = next(items)
-    cycle = [firstval]
-    for _, cusum in items:
-        if cusum == 0:
-            cycle.append(cusum)
-            yield cycle
-            cycle = [cusum]
-        else:
-            cycle.append(cusum)
+def cycle_state_visits(
+    walk: np.ndarray, states: Sequence[Integer]
+) -> Tuple[Integer, np.ndarray]:
+    """Counts the visits to each state in every cycle of a random walk
+
+    A cycle is a part of the walk that starts and ends at ``0``, where the walk
+    is padded with a ``0`` at both ends.
+
+    Parameters
+    ----------
+    walk : ``ndarray``
+        Position of the walk after each step
+    states : ``Sequence[Integer]``
+        Sorted non-zero states to count
+
+    Returns
+    -------
+    ncycles : ``Integer``
+        Number of cycles in the walk
+    state_visits : ``ndarray``
+        Array of shape ``(ncycles, len(states))`` where each row contains the
+        visits of every state in a cycle
+    """
+    at_origin = walk == 0
+    ncycles = np.count_nonzero(at_origin) + 1
+    nstates = len(states)
+
+    visited = np.isin(walk, states)
+    cycles = np.cumsum(at_origin)[visited]  # i.e. no. of origin visits before
+    columns = np.searchsorted(states, walk[visited])
+
+    flat_visits = np.bincount(cycles * nstates + columns, minlength=ncycles * nstates)
+    state_visits = flat_visits.reshape(ncycles, nstates)
+
+    return ncycles, state_visits
 
 
 # ------------------------------------------------------------------------------
@@ -120,44 +270,128 @@ variant_states = [-9, -8, -7, -6, -5, -4, -3, -2, -1, 1, 2, 3, 4, 5, 6, 7, 8, 9]
 def random_excursions_variant(series, heads, tails, ctx):
     n = len(series)
 
-    set_task_total(ctx, 4)
+    set_task_total(ctx, 3)
 
     failures = check_recommendations(ctx, {"n ≥ 1000000": n >= 1000000})
 
-    oscillations = series.map({heads: 1, tails: -1})
-    cumulative_sums = oscillations.cumsum()
+    walk = random_walk(binarise(series, heads))
 
     advance_task(ctx)
 
-    head = pd.Series({-1: 0})
-    tail = pd.Series({n + 1: 0})
-    walk = pd.concat([head, cumulative_sums, tail])
+    position_counts = clipped_position_counts(walk, variant_maxstate)
 
     advance_task(ctx)
 
-    state_counts = walk.value_counts()
-    ncycles = state_counts.at[0] - 1
+    result = random_excursions_variant_from_counts(
+        heads, tails, failures, position_counts
+    )
 
     advance_task(ctx)
 
-    results = {}
-    for state in variant_states:
-        try:
-            count = state_counts.at[state]
-        except KeyError:
-            count = 0
+    return result
 
-        p = erfc(abs(count - ncycles) / sqrt(2 * ncycles * (4 * abs(state) - 2)))
 
-        advance_task(ctx)
+variant_maxstate = max(abs(state) for state in variant_states)
 
-        results[state] = RandomExcursionsVariantSubTestResult(count, p, state)
 
-    advance_task(ctx)
+def random_excursions_variant_from_counts(
+    heads: Face, tails: Face, failures: List[str], position_counts: np.ndarray
+) -> "RandomExcursionsVariantMultiTestResult":
+    # i.e. the walk is padded with zeros
+    ncycles = position_counts[variant_maxstate] + 1
+
+    state_counts = position_counts[np.array(variant_states) + variant_maxstate]
+    pvalues = variant_pvalues(state_counts, ncycles, variant_states)
+
+    results = {}
+    for state, count, p in zip(variant_states, state_counts, pvalues):
+        results[state] = RandomExcursionsVariantSubTestResult(int(count), p, state)
 
     return RandomExcursionsVariantMultiTestResult(heads, tails, failures, results)
 
 
+class RandomExcursionsVariantAccumulator(Accumulator):
+    """Random excursions variant test ran incrementally over chunks of a sequence
+
+    Only the position of the walk and its visits to each position up to ±9
+    are kept between chunks.
+    """
+
+    def __init__(self, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.position = 0
+        self.position_counts = np.zeros(2 * variant_maxstate + 1, dtype=np.int64)
+
+    def _update(self, bits):
+        walk = random_walk(bits).astype(np.int64)
+        walk += self.position
+        self.position = int(walk[-1])
+
+        self.position_counts += clipped_position_counts(walk, variant_maxstate)
+
+    def result(self) -> "RandomExcursionsVariantMultiTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 1000000": self.n >= 1000000})
+
+        return random_excursions_variant_from_counts(
+            self.heads, self.tails, failures, self.position_counts
+        )
+
+
+def clipped_position_counts(walk: np.ndarray, maxstate: Integer) -> np.ndarray:
+    """Counts the visits of a random walk to positions ``-maxstate`` to ``maxstate``
+
+    The walk is clipped in-place so that no further arrays of its length are
+    needed, with positions out of range being binned together at either end.
+
+    Parameters
+    ----------
+    walk : ``ndarray``
+        Position of the walk after each step, which is modified
+    maxstate : ``Integer``
+        Largest absolute position to count
+
+    Returns
+    -------
+    position_counts : ``ndarray``
+        Array of length ``2 * maxstate + 1``, where visits to a position ``x``
+        are found at the index ``x + maxstate``
+    """
+    edge = maxstate + 1
+    np.clip(walk, -edge, edge, out=walk)
+    walk += edge
+
+    bincounts = np.bincount(walk, minlength=2 * edge + 1)
+
+    return bincounts[1:-1]
+
+
+def variant_pvalues(
+    state_counts: np.ndarray, ncycles: Integer, states: Sequence[Integer]
+) -> np.ndarray:
+    """Finds the p-values of the visit counts of each state
+
+    Parameters
+    ----------
+    state_counts : ``ndarray``
+        Visits of the walk to each state
+    ncycles : ``Integer``
+        Number of cycles in the walk
+    states : ``Sequence[Integer]``
+        States that were counted
+
+    Returns
+    -------
+    pvalues : ``ndarray``
+        p-value of each state's visit count
+    """
+    states = np.asarray(states)
+    deviations = np.abs(state_counts - ncycles)
+
+    return erfc(deviations / np.sqrt(2 * ncycles * (4 * np.abs(states) - 2)))
+
+
 @dataclass
 class RandomExcursionsVariantSubTestResult(SubTestResult):
     state: Integer
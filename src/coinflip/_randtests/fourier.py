@@ -3,11 +3,14 @@ from math import erfc
 from math import log
 from math import sqrt
 
+import numpy as np
 import pandas as pd
+from scipy import special
 from scipy.fft import fft
 
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.result import BatchTestResult
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.result import make_testvars_list
 from coinflip._randtests.common.typing import Float
@@ -68,6 +71,32 @@ def spectral(series, heads, tails, ctx):
     )
 
 
+@spectral.batched
+def spectral_batch(bits, heads, tails, ctx):
+    n = bits.shape[1]
+
+    failures = check_recommendations(ctx, {"n ≥ 1000": n >= 1000})
+
+    if n % 2 != 0:
+        bits = bits[:, :-1]
+
+    threshold = sqrt(log(1 / 0.05) * n)
+    nbelow_expect = 0.95 * n / 2
+
+    oscillations = 2 * bits.astype(np.int8) - 1
+    fourier = fft(oscillations, axis=1)
+
+    peaks = np.abs(fourier[:, : n // 2])
+    nbelow = np.count_nonzero(peaks < threshold, axis=1)
+
+    diffs = nbelow - nbelow_expect
+    normdiffs = diffs / sqrt((n * 0.95 * 0.05) / 4)
+
+    pvalues = special.erfc(np.abs(normdiffs) / sqrt(2))
+
+    return BatchTestResult(heads, tails, failures, normdiffs, pvalues)
+
+
 @dataclass
 class SpectralTestResult(TestResult):
     nbelow_expect: Float
@@ -1,10 +1,11 @@
-from collections import Counter
 from dataclasses import dataclass
 from functools import lru_cache
 from math import ceil
 from math import erfc
 from math import sqrt
 from operator import attrgetter
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import NamedTuple
 
@@ -12,11 +13,14 @@ import altair as alt
 import numpy as np
 import pandas as pd
 from rich.text import Text
+from scipy import special
 from scipy.special import gammaincc
 from scipy.stats import chi2
 from scipy.stats import halfnorm
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.core import *
+from coinflip._randtests.common.result import BatchTestResult
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.result import make_testvars_table
 from coinflip._randtests.common.result import smartround
@@ -24,7 +28,12 @@ from coinflip._randtests.common.testutils import blocks
 from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["monobit", "frequency_within_block"]
+__all__ = [
+    "monobit",
+    "frequency_within_block",
+    "MonobitAccumulator",
+    "FrequencyWithinBlockAccumulator",
+]
 
 
 # ------------------------------------------------------------------------------
@@ -65,19 +74,59 @@ def monobit(series, heads, tails, ctx):
 
     failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
 
-    counts = FaceCounts.from_series(series.value_counts(), heads, tails)
+    nheads = series.value_counts()[heads]
 
     advance_task(ctx)
 
+    result = monobit_from_counts(heads, tails, failures, nheads, n)
+
+    advance_task(ctx)
+
+    return result
+
+
+def monobit_from_counts(
+    heads: Face, tails: Face, failures: List[str], nheads: Integer, n: Integer
+) -> "MonobitTestResult":
+    counts = FaceCounts(FaceCount(heads, nheads), FaceCount(tails, n - nheads))
+
     diff = counts.max.count - counts.min.count
     normdiff = diff / sqrt(n)
     p = erfc(normdiff / sqrt(2))
 
-    advance_task(ctx)
-
     return MonobitTestResult(heads, tails, failures, normdiff, p, n, counts, diff)
 
 
+@monobit.batched
+def monobit_batch(bits, heads, tails, ctx):
+    n = bits.shape[1]
+
+    failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
+
+    nheads = bits.sum(axis=1, dtype=np.int64)
+    diffs = np.abs(2 * nheads - n)
+    normdiffs = diffs / sqrt(n)
+    pvalues = special.erfc(normdiffs / sqrt(2))
+
+    return BatchTestResult(heads, tails, failures, normdiffs, pvalues)
+
+
+class MonobitAccumulator(Accumulator):
+    """Monobit test ran incrementally over chunks of a sequence
+
+    Only the counts of ``heads`` and values are kept between chunks.
+    """
+
+    def result(self) -> "MonobitTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 100": self.n >= 100})
+
+        return monobit_from_counts(
+            self.heads, self.tails, failures, self.nheads, self.n
+        )
+
+
 @dataclass
 class MonobitTestResult(TestResult):
     n: Integer
@@ -162,14 +211,12 @@ class MonobitTestResult(TestResult):
 def frequency_within_block(series, heads, tails, ctx, blocksize=None):
     n = len(series)
 
-    # TODO - smarter defaults
-    #      - meet 0.01 * n recommendation
     if not blocksize:
-        blocksize = 8
+        blocksize = default_blocksize(n)
 
     nblocks = n // blocksize
 
-    set_task_total(ctx, nblocks + 3)
+    set_task_total(ctx, nblocks + 2)
 
     failures = check_recommendations(
         ctx,
@@ -191,16 +238,38 @@ def frequency_within_block(series, heads, tails, ctx, blocksize=None):
 
         advance_task(ctx)
 
-    proportions = (count / blocksize for count in counts)
-    deviations = [prop - 1 / 2 for prop in proportions]
+    counts = np.asarray(counts, dtype=np.int64)
+    count_nblocks = np.bincount(counts, minlength=blocksize + 1)
+    result = frequency_within_block_from_counts(
+        heads, tails, failures, count_nblocks.tolist(), blocksize
+    )
 
     advance_task(ctx)
 
-    # TODO figure out the chi-square test being used
-    statistic = 4 * blocksize * sum(x ** 2 for x in deviations)
-    p = gammaincc(nblocks / 2, statistic / 2)
+    return result
 
-    advance_task(ctx)
+
+def default_blocksize(n: Integer) -> Integer:
+    """Smallest blocksize meeting the recommendations for a sequence of length n"""
+    return min(max(n // 100 + 1, 20), n)
+
+
+def frequency_within_block_from_counts(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    count_nblocks: List[Integer],
+    blocksize: Integer,
+) -> "FrequencyWithinBlockTestResult":
+    nblocks = sum(count_nblocks)
+
+    # 4 * blocksize * sum((count / blocksize - 1/2) ** 2), where the squared
+    # deviations are summed as integers
+    sqdiffs = sum(
+        nb * (2 * count - blocksize) ** 2 for count, nb in enumerate(count_nblocks)
+    )
+    statistic = sqdiffs / blocksize
+    p = gammaincc(nblocks / 2, statistic / 2)
 
     return FrequencyWithinBlockTestResult(
         heads,
@@ -210,15 +279,122 @@ def frequency_within_block(series, heads, tails, ctx, blocksize=None):
         p,
         blocksize,
         nblocks,
-        counts,
+        count_nblocks,
     )
 
 
+@frequency_within_block.batched
+def frequency_within_block_batch(bits, heads, tails, ctx, blocksize=None):
+    nsequences, n = bits.shape
+
+    if not blocksize:
+        blocksize = default_blocksize(n)
+
+    nblocks = n // blocksize
+
+    failures = check_recommendations(
+        ctx,
+        {
+            "n ≥ 100": n >= 100,
+            "blocksize ≥ 20": blocksize >= 20,
+            "blocksize > 0.01 * n": blocksize > 0.01 * n,
+            "nblocks < 100": nblocks < 100,
+        },
+    )
+
+    blocked_bits = bits[:, : nblocks * blocksize].reshape(nsequences, nblocks, -1)
+    counts = blocked_bits.sum(axis=2, dtype=np.int64)
+    deviations = counts / blocksize - 1 / 2
+
+    statistics = 4 * blocksize * np.sum(deviations ** 2, axis=1)
+    pvalues = gammaincc(nblocks / 2, statistics / 2)
+
+    return BatchTestResult(heads, tails, failures, statistics, pvalues)
+
+
+class FrequencyWithinBlockAccumulator(Accumulator):
+    """Frequency within block test ran incrementally over chunks of a sequence
+
+    Only the number of complete blocks with each count of ``heads`` is kept, as
+    well as the count in the block left open at the end of the last chunk, so
+    the state does not grow with the sequence.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``, optional
+        Size of the blocks that partition the sequence, defaulting to ``8``.
+        Pass ``default_blocksize(n)`` for the blocksize the batch test uses
+        for a sequence of length ``n``.
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    min_n = 8
+
+    def __init__(self, blocksize: Integer = None, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.blocksize = blocksize or 8
+        self.count_nblocks = np.zeros(self.blocksize + 1, dtype=np.int64)
+        self._open_count = 0
+        self._open_len = 0
+
+    def _update(self, bits):
+        nmissing = self.blocksize - self._open_len
+        if len(bits) < nmissing:
+            self._open_count += int(bits.sum())
+            self._open_len += len(bits)
+            return
+
+        self.count_nblocks[self._open_count + int(bits[:nmissing].sum())] += 1
+        bits = bits[nmissing:]
+
+        nblocks = len(bits) // self.blocksize
+        boundary = nblocks * self.blocksize
+        block_counts = bits[:boundary].reshape(nblocks, self.blocksize).sum(
+            axis=1, dtype=np.int64
+        )
+        self.count_nblocks += np.bincount(block_counts, minlength=self.blocksize + 1)
+
+        self._open_count = int(bits[boundary:].sum())
+        self._open_len = len(bits) - boundary
+
+    def result(self) -> "FrequencyWithinBlockTestResult":
+        self._check_input()
+
+        n = self.n
+        blocksize = self.blocksize
+        nblocks = int(self.count_nblocks.sum())
+        failures = check_recommendations(
+            None,
+            {
+                "n ≥ 100": n >= 100,
+                "blocksize ≥ 20": blocksize >= 20,
+                "blocksize > 0.01 * n": blocksize > 0.01 * n,
+                "nblocks < 100": nblocks < 100,
+            },
+        )
+
+        return frequency_within_block_from_counts(
+            self.heads, self.tails, failures, self.count_nblocks.tolist(), blocksize
+        )
+
+
 @dataclass
 class FrequencyWithinBlockTestResult(TestResult):
     blocksize: Integer
     nblocks: Integer
-    counts: List[Integer]
+    count_nblocks: List[Integer]
+
+    def __setstate__(self, state: Dict[str, Any]):
+        # Results pickled by older versions kept the count of every block
+        if "counts" in state:
+            state = dict(state)
+            counts = np.asarray(state.pop("counts"), dtype=np.int64)
+            count_nblocks = np.bincount(counts, minlength=state["blocksize"] + 1)
+            state["count_nblocks"] = count_nblocks.tolist()
+        self.__dict__.update(state)
 
     def _render(self):
         yield self._pretty_result("chi-square")
@@ -233,19 +409,19 @@ class FrequencyWithinBlockTestResult(TestResult):
         f_count_expect = smartround(count_expect)
         caption = f"expected count {f_count_expect}"
 
-        count_nblocks = Counter(self.counts)
         table = make_testvars_table("count", "nblocks", title=title, caption=caption)
-        for count in range(self.blocksize + 1):
-            nblocks = count_nblocks[count]
-            table.add_row(str(count), str(nblocks))
+        # Counts no block has are left out, as large blocksizes have many
+        for count, nblocks in enumerate(self.count_nblocks):
+            if nblocks > 0:
+                table.add_row(str(count), str(nblocks))
 
         yield table
 
     def plot_block_counts(self):
         df = pd.DataFrame(
             {
-                "Block": range(1, self.nblocks + 1),
-                "Count": self.counts,
+                "Count": range(self.blocksize + 1),
+                "Blocks": self.count_nblocks,
             }
         )
 
@@ -253,14 +429,10 @@ class FrequencyWithinBlockTestResult(TestResult):
             alt.Chart(df)
             .mark_bar()
             .encode(
-                alt.X("Block"),
-                alt.Y(
-                    "Count",
-                    axis=alt.Axis(tickMinStep=1),
-                    scale=alt.Scale(domain=(0, self.blocksize)),
-                ),
+                alt.X("Count", scale=alt.Scale(domain=(0, self.blocksize))),
+                alt.Y("Blocks", axis=alt.Axis(tickMinStep=1)),
             )
-            .properties(title=f"Counts of {self.heads} per block")
+            .properties(title=f"Blocks by their count of {self.heads}")
         )
 
         # TODO use Altair's new datum encoding when 4.2 comes out
@@ -268,7 +440,7 @@ class FrequencyWithinBlockTestResult(TestResult):
         line = (
             alt.Chart(pd.DataFrame({"Count": [self.blocksize / 2]}))
             .mark_rule(strokeDash=[1, 1], opacity=0.5)
-            .encode(y="Count")
+            .encode(x="Count")
         )
 
         return chart + line
@@ -2,20 +2,30 @@ from dataclasses import astuple
 from dataclasses import dataclass
 from math import floor
 from math import sqrt
+from typing import Dict
 from typing import Iterable
+from typing import List
 from typing import Tuple
 
+import numpy as np
 from scipy.stats import chisquare
 from typing_extensions import Literal
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.result import make_chisquare_table
 from coinflip._randtests.common.testutils import blocks
 from coinflip._randtests.common.testutils import rawblocks
+from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["binary_matrix_rank", "matrix_rank"]
+__all__ = [
+    "binary_matrix_rank",
+    "matrix_rank",
+    "matrix_ranks",
+    "BinaryMatrixRankAccumulator",
+]
 
 
 @dataclass
@@ -32,36 +42,18 @@ def binary_matrix_rank(
     n = len(series)
 
     if matrix_dimen is None:
-        if n // (32 * 32) > 38:
-            nrows = 32
-            ncols = 32
-        else:
-            blocksize = max(n // 38, 4)
-            nrows = floor(sqrt(blocksize))
-            ncols = nrows
-    else:
-        nrows, ncols = matrix_dimen
+        matrix_dimen = default_matrix_dimen(n)
+    nrows, ncols = matrix_dimen
 
     blocksize = nrows * ncols
     nblocks = n // blocksize
 
     set_task_total(ctx, nblocks + 3)
 
-    failures = check_recommendations(
-        ctx,
-        {
-            "n ≥ 128": n >= 152,  # nblocks=38, blocksize=4
-            "n ≥ 38 * blocksize": n >= 38 * blocksize,
-        },
-    )
+    failures = check_recommendations(ctx, matrix_recommendations(n, blocksize))
 
     fullrank = min(nrows, ncols)
 
-    # TODO find expressive and performative calculation for constants
-    expected_rankcounts = RankCounts(
-        full=0.2888 * nblocks, runnerup=0.5776 * nblocks, remaining=0.1336 * nblocks,
-    )
-
     rankable_series = series.map({heads: 1, tails: 0})
 
     advance_task(ctx)
@@ -87,10 +79,52 @@ def binary_matrix_rank(
 
     advance_task(ctx)
 
-    statistic, p = chisquare(astuple(rankcounts), astuple(expected_rankcounts))
+    result = binary_matrix_rank_from_counts(
+        heads, tails, failures, nrows, ncols, rankcounts
+    )
 
     advance_task(ctx)
 
+    return result
+
+
+def default_matrix_dimen(n: Integer) -> Tuple[Integer, Integer]:
+    if n // (32 * 32) > 38:
+        nrows = 32
+        ncols = 32
+    else:
+        blocksize = max(n // 38, 4)
+        nrows = floor(sqrt(blocksize))
+        ncols = nrows
+
+    return nrows, ncols
+
+
+def matrix_recommendations(n: Integer, blocksize: Integer) -> Dict[str, bool]:
+    return {
+        "n ≥ 128": n >= 152,  # nblocks=38, blocksize=4
+        "n ≥ 38 * blocksize": n >= 38 * blocksize,
+    }
+
+
+def binary_matrix_rank_from_counts(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    nrows: Integer,
+    ncols: Integer,
+    rankcounts: RankCounts,
+) -> "BinaryMatrixRankTestResult":
+    nblocks = sum(astuple(rankcounts))
+    fullrank = min(nrows, ncols)
+
+    # TODO find expressive and performative calculation for constants
+    expected_rankcounts = RankCounts(
+        full=0.2888 * nblocks, runnerup=0.5776 * nblocks, remaining=0.1336 * nblocks,
+    )
+
+    statistic, p = chisquare(astuple(rankcounts), astuple(expected_rankcounts))
+
     return BinaryMatrixRankTestResult(
         heads,
         tails,
@@ -105,6 +139,73 @@ def binary_matrix_rank(
     )
 
 
+class BinaryMatrixRankAccumulator(Accumulator):
+    """Binary matrix rank test ran incrementally over chunks of a sequence
+
+    Each matrix is ranked as soon as it is completed, so only the counts of
+    ranks are kept between chunks, as well as the bits of the matrix left open
+    at the end of the last chunk.
+
+    Parameters
+    ----------
+    matrix_dimen : ``Tuple[Integer, Integer]``, optional
+        Number of rows and columns of each matrix, defaulting to the 32 by 32
+        matrices the batch test uses for sequences of 39936 bits or more
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    min_n = 4
+
+    def __init__(
+        self,
+        matrix_dimen: Tuple[Integer, Integer] = None,
+        heads: Face = 1,
+        tails: Face = 0,
+    ):
+        super().__init__(heads, tails)
+        self.nrows, self.ncols = matrix_dimen or (32, 32)
+        self.rankcounts = RankCounts()
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+
+    def _update(self, bits):
+        blocksize = self.nrows * self.ncols
+
+        bits = np.concatenate([self._open_bits, bits])
+        nblocks = len(bits) // blocksize
+        boundary = nblocks * blocksize
+        self._open_bits = bits[boundary:]
+
+        matrices = bits[:boundary].reshape(nblocks, self.nrows, self.ncols)
+        ranks = matrix_ranks(matrices)
+
+        fullrank = min(self.nrows, self.ncols)
+        nfull = int(np.count_nonzero(ranks == fullrank))
+        nrunnerup = int(np.count_nonzero(ranks == fullrank - 1))
+        self.rankcounts.full += nfull
+        self.rankcounts.runnerup += nrunnerup
+        self.rankcounts.remaining += nblocks - nfull - nrunnerup
+
+    def result(self) -> "BinaryMatrixRankTestResult":
+        self._check_input()
+
+        blocksize = self.nrows * self.ncols
+        failures = check_recommendations(
+            None, matrix_recommendations(self.n, blocksize)
+        )
+
+        return binary_matrix_rank_from_counts(
+            self.heads,
+            self.tails,
+            failures,
+            self.nrows,
+            self.ncols,
+            RankCounts(*astuple(self.rankcounts)),
+        )
+
+
 @dataclass
 class BinaryMatrixRankTestResult(TestResult):
     nrows: Integer
@@ -172,6 +273,50 @@ def matrix_rank(matrix: Iterable[Iterable[Literal[0, 1]]]) -> Integer:
     return rank
 
 
+def matrix_ranks(matrices: np.ndarray) -> np.ndarray:
+    """Finds the ranks of many binary matrices at once
+
+    Each matrix's rows are packed into integers, and Gaussian elimination is
+    performed on every matrix at once, one column at a time.
+
+    Parameters
+    ----------
+    matrices : ``ndarray``
+        3D array of ``0`` and ``1`` bits, where each item is a matrix
+
+    Returns
+    -------
+    ranks : ``ndarray``
+        Rank of each matrix
+    """
+    nmatrices, nrows, ncols = matrices.shape
+    if ncols > 64:
+        return np.array([matrix_rank(matrix.tolist()) for matrix in matrices])
+
+    weights = np.left_shift(np.uint64(1), np.arange(ncols - 1, -1, -1, dtype=np.uint64))
+    rows = np.zeros((nmatrices, nrows), dtype=np.uint64)
+    for col, weight in enumerate(weights):
+        rows[matrices[:, :, col] == 1] |= weight
+
+    indices = np.arange(nmatrices)
+    ranks = np.zeros(nmatrices, dtype=np.int64)
+    pivoted = np.zeros((nmatrices, nrows), dtype=bool)
+    for weight in weights:
+        has_bit = (rows & weight) != 0
+        candidates = has_bit & ~pivoted
+        found = candidates.any(axis=1)
+        pivots = candidates.argmax(axis=1)
+
+        pivot_rows = np.where(found, rows[indices, pivots], np.uint64(0))
+        has_bit[indices, pivots] = False
+        rows ^= np.where(has_bit, pivot_rows[:, np.newaxis], np.uint64(0))
+
+        pivoted[indices[found], pivots[found]] = True
+        ranks += found
+
+    return ranks
+
+
 def bits2int(bits: Iterable[Literal[0, 1]]) -> Integer:
     """Converts a list of bits into a numerical representation"""
     num = 0
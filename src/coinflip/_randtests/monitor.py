@@ -0,0 +1,275 @@
+from functools import lru_cache
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import as_strided
+from scipy.special import erfc
+from scipy.special import gammaincc
+
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip._randtests.common.testutils import random_walk
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Integer
+from coinflip._randtests.cusum import cusum_p
+
+__all__ = ["WindowMonitor", "monitor_randtests"]
+
+
+# Tests whose statistics can be slid along a sequence from block summaries
+monitor_randtests = ["monobit", "frequency_within_block", "runs", "cusum"]
+
+
+class WindowMonitor:
+    """Randomness tests ran over a window sliding along a sequence
+
+    A sequence is read in chunks and partitioned into blocks. Only a summary
+    of each block is kept, for the blocks in the last window: its count of
+    ``heads``, its changes of value, its first and last values, and the
+    extremes of its random walk. Each time a block is completed the window
+    slides forward by a block, where the window's statistics are updated by
+    adding the block entering it and subtracting the block leaving it.
+
+    Statistics are found as the batch tests would for the sequence in the
+    window, where ``frequency_within_block`` uses the window's blocks and
+    ``cusum`` is ran forwards.
+
+    Parameters
+    ----------
+    window : ``Integer``
+        Length of the window, which must be a multiple of ``blocksize``
+    blocksize : ``Integer``
+        Length of each block, which is also the step the window slides by
+    randtest_names : ``List[str]``, optional
+        Names of the tests to run, defaulting to every test in
+        ``monitor_randtests``
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+
+    Attributes
+    ----------
+    n : ``int``
+        Length of the sequence read so far
+
+    Raises
+    ------
+    TestInputError
+        If the window and blocksize are invalid, or a test cannot be monitored
+    """
+
+    def __init__(
+        self,
+        window: Integer,
+        blocksize: Integer,
+        randtest_names: Optional[List[str]] = None,
+        heads: Face = 1,
+        tails: Face = 0,
+    ):
+        if blocksize < 1:
+            raise TestInputError("blocksize must be a positive integer")
+        if window < blocksize or window % blocksize != 0:
+            raise TestInputError(
+                f"window of {window} is not a positive multiple of blocksize "
+                f"{blocksize}"
+            )
+        if randtest_names is None:
+            randtest_names = monitor_randtests
+        for name in randtest_names:
+            if name not in monitor_randtests:
+                raise TestInputError(f"{name} cannot be ran over a sliding window")
+
+        self.window = window
+        self.blocksize = blocksize
+        self.nblocks = window // blocksize
+        self.randtest_names = list(randtest_names)
+        self.heads = heads
+        self.tails = tails
+        self.n = 0
+
+        # Consecutive windows mostly share a few maximum cusums
+        self._cusum_p = lru_cache(maxsize=2 ** 12)(cusum_p)
+
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+        self._summaries = block_summaries(np.zeros((0, blocksize), dtype=np.uint8))
+
+    def update(self, chunk) -> pd.DataFrame:
+        """Reads the next chunk of the sequence
+
+        Parameters
+        ----------
+        chunk : array-like
+            Next values of the sequence, which are all either ``heads`` or
+            ``tails``
+
+        Returns
+        -------
+        steps : ``DataFrame``
+            p-value of each test (the columns) for each step the window slid
+            in ``chunk``, indexed by the length of the sequence at the end of
+            the window
+
+        Raises
+        ------
+        NonBinarySequenceError
+            If ``chunk`` contains values other than ``heads`` and ``tails``
+        """
+        array = np.asarray(chunk).ravel()
+        matches = array == self.heads
+        nheads = np.count_nonzero(matches)
+        if nheads + np.count_nonzero(array == self.tails) != len(array):
+            raise NonBinarySequenceError()
+
+        return self._update(matches.astype(np.uint8))
+
+    def update_packed(self, buffer) -> pd.DataFrame:
+        """Reads the next chunk of the sequence as packed bits
+
+        Parameters
+        ----------
+        buffer : bytes-like
+            Next bits of the sequence, 8 per byte with the most significant bit
+            first, where ``1`` bits represent ``heads``
+
+        Returns
+        -------
+        steps : ``DataFrame``
+            p-value of each test (the columns) for each step the window slid
+            in ``buffer``, indexed by the length of the sequence at the end of
+            the window
+        """
+        return self._update(np.unpackbits(np.frombuffer(buffer, dtype=np.uint8)))
+
+    def _update(self, bits: np.ndarray) -> pd.DataFrame:
+        self.n += len(bits)
+
+        bits = np.concatenate([self._open_bits, bits])
+        nblocks = len(bits) // self.blocksize
+        boundary = nblocks * self.blocksize
+        self._open_bits = bits[boundary:]
+
+        new = block_summaries(bits[:boundary].reshape(nblocks, self.blocksize))
+        summaries = {
+            key: np.concatenate([self._summaries[key], new[key]]) for key in new
+        }
+        nkept = len(self._summaries["nheads"])
+        ntotal = nkept + nblocks
+
+        # Only the blocks which can be in a future window are kept
+        keep = max(ntotal - (self.nblocks - 1), 0)
+        self._summaries = {key: array[keep:] for key, array in summaries.items()}
+
+        first_end = max(nkept, self.nblocks - 1)
+        nsteps = max(ntotal - first_end, 0)
+        ends = self.n - len(self._open_bits) - self.blocksize * np.arange(nsteps)[::-1]
+        steps = pd.DataFrame(
+            {
+                name: self._window_pvalues(name, summaries, nsteps)
+                for name in self.randtest_names
+            },
+            index=pd.Index(ends, name="end"),
+        )
+
+        return steps
+
+    def _window_pvalues(
+        self, name: str, summaries: Dict[str, np.ndarray], nsteps: int
+    ) -> np.ndarray:
+        """Finds a test's p-values of the last ``nsteps`` windows in ``summaries``"""
+        n = self.window
+        blocksize = self.blocksize
+        nblocks = self.nblocks
+        nheads = window_sums(summaries["nheads"], nblocks, nsteps)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if name == "monobit":
+                diffs = np.abs(2 * nheads - n)
+
+                return erfc(diffs / np.sqrt(n) / np.sqrt(2))
+
+            elif name == "frequency_within_block":
+                sq_diffs = (2 * summaries["nheads"] - blocksize) ** 2
+                statistics = window_sums(sq_diffs, nblocks, nsteps) / blocksize
+
+                return gammaincc(nblocks / 2, statistics / 2)
+
+            elif name == "runs":
+                changes = summaries["first"][1:] != summaries["last"][:-1]
+                boundary_changes = window_sums(changes, nblocks - 1, nsteps)
+                block_changes = window_sums(summaries["changes"], nblocks, nsteps)
+                nruns = 1 + boundary_changes + block_changes
+
+                prop_heads = nheads / n
+                prop_tails = 1 - prop_heads
+
+                return erfc(
+                    np.abs(nruns - (2 * nheads * prop_tails))
+                    / (2 * np.sqrt(2 * n) * prop_heads * prop_tails)
+                )
+
+            elif name == "cusum":
+                totals = 2 * summaries["nheads"] - blocksize
+                positions = np.concatenate([[0], np.cumsum(totals)])
+                stop = len(positions) - nblocks
+                starts = positions[stop - nsteps : stop]
+
+                maxima = window_maxima(positions[:-1] + summaries["max"], nblocks)
+                minima = -window_maxima(-(positions[:-1] + summaries["min"]), nblocks)
+                maxima = np.maximum(maxima[len(maxima) - nsteps :] - starts, 0)
+                minima = np.minimum(minima[len(minima) - nsteps :] - starts, 0)
+                max_cusums = np.maximum(maxima, -minima)
+
+                uniq_max_cusums, indices = np.unique(max_cusums, return_inverse=True)
+                uniq_pvalues = np.array(
+                    [self._cusum_p(max_cusum, n) for max_cusum in uniq_max_cusums]
+                )
+
+                return uniq_pvalues[indices].reshape(nsteps)
+
+
+def block_summaries(blocks: np.ndarray) -> Dict[str, np.ndarray]:
+    """Summarises the bits of each block for the monitored tests
+
+    Parameters
+    ----------
+    blocks : ``ndarray``
+        2D array where each row is a block of ``0`` and ``1`` bits
+
+    Returns
+    -------
+    summaries : ``Dict[str, ndarray]``
+        Arrays of each block's count of ``1`` bits, number of changes of value,
+        first and last bits, and largest and smallest positions of its random
+        walk
+    """
+    walks = random_walk(blocks).astype(np.int64)
+
+    return {
+        "nheads": blocks.sum(axis=1, dtype=np.int64),
+        "changes": np.count_nonzero(blocks[:, 1:] != blocks[:, :-1], axis=1),
+        "first": blocks[:, 0],
+        "last": blocks[:, -1],
+        "max": walks.max(axis=1),
+        "min": walks.min(axis=1),
+    }
+
+
+def window_sums(values: np.ndarray, size: int, nsteps: int) -> np.ndarray:
+    """Sums the last ``nsteps`` windows of ``size`` consecutive values"""
+    sums = np.concatenate([[0], np.cumsum(values, dtype=np.int64)])
+    stop = len(sums) - size
+
+    return sums[len(sums) - nsteps :] - sums[stop - nsteps : stop]
+
+
+def window_maxima(values: np.ndarray, size: int) -> np.ndarray:
+    """Finds the maximum of every window of ``size`` consecutive values"""
+    nwindows = max(len(values) - size + 1, 0)
+    stride = values.strides[0]
+    windows = as_strided(values, shape=(nwindows, size), strides=(stride, stride))
+
+    return windows.max(axis=1) if nwindows else np.zeros(0, dtype=values.dtype)
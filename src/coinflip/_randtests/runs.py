@@ -10,21 +10,26 @@ from typing import NamedTuple
 from typing import Tuple
 
 import altair as alt
+import numpy as np
 import pandas as pd
 from rich.text import Text
+from scipy import special
 from scipy.stats import chisquare
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.collections import Bins
 from coinflip._randtests.common.collections import FloorDict
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.exceptions import TestNotImplementedError
+from coinflip._randtests.common.result import BatchTestResult
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.result import make_chisquare_table
 from coinflip._randtests.common.testutils import blocks
+from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["runs", "longest_runs"]
+__all__ = ["runs", "longest_runs", "RunsAccumulator", "LongestRunsAccumulator"]
 
 
 # ------------------------------------------------------------------------------
@@ -35,34 +40,96 @@ __all__ = ["runs", "longest_runs"]
 def runs(series, heads, tails, ctx):
     n = len(series)
 
-    set_task_total(ctx, 4)
+    set_task_total(ctx, 3)
 
     failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
 
-    counts = series.value_counts()
+    nheads = series.value_counts()[heads]
 
     advance_task(ctx)
 
-    nheads = counts[heads]
-    prop_heads = nheads / n
-    prop_tails = 1 - prop_heads
+    nruns = sum(1 for _ in asruns(series))
 
     advance_task(ctx)
 
-    nruns = sum(1 for _ in asruns(series))
+    result = runs_from_counts(heads, tails, failures, n, nheads, nruns)
 
     advance_task(ctx)
 
+    return result
+
+
+def runs_from_counts(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    n: Integer,
+    nheads: Integer,
+    nruns: Integer,
+) -> "RunsTestResult":
+    prop_heads = nheads / n
+    prop_tails = 1 - prop_heads
+
     p = erfc(
         abs(nruns - (2 * nheads * prop_tails))
         / (2 * sqrt(2 * n) * prop_heads * prop_tails)
     )
 
-    advance_task(ctx)
-
     return RunsTestResult(heads, tails, failures, nruns, p)
 
 
+@runs.batched
+def runs_batch(bits, heads, tails, ctx):
+    n = bits.shape[1]
+
+    failures = check_recommendations(ctx, {"n ≥ 100": n >= 100})
+
+    nheads = bits.sum(axis=1, dtype=np.int64)
+    prop_heads = nheads / n
+    prop_tails = 1 - prop_heads
+
+    nruns = 1 + np.count_nonzero(bits[:, 1:] != bits[:, :-1], axis=1)
+
+    # Sequences of only one value have undefined p-values
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pvalues = special.erfc(
+            np.abs(nruns - (2 * nheads * prop_tails))
+            / (2 * sqrt(2 * n) * prop_heads * prop_tails)
+        )
+
+    return BatchTestResult(heads, tails, failures, nruns, pvalues)
+
+
+class RunsAccumulator(Accumulator):
+    """Runs test ran incrementally over chunks of a sequence
+
+    The number of runs is kept, as well as the last value of the last chunk so
+    that a run spanning chunks is only counted once.
+    """
+
+    def __init__(self, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.nruns = 0
+        self._lastbit = None
+
+    def _update(self, bits):
+        nruns = 1 + np.count_nonzero(bits[1:] != bits[:-1])
+        if bits[0] == self._lastbit:
+            nruns -= 1
+
+        self.nruns += int(nruns)
+        self._lastbit = bits[-1]
+
+    def result(self) -> "RunsTestResult":
+        self._check_input()
+
+        failures = check_recommendations(None, {"n ≥ 100": self.n >= 100})
+
+        return runs_from_counts(
+            self.heads, self.tails, failures, self.n, self.nheads, self.nruns
+        )
+
+
 @dataclass
 class RunsTestResult(TestResult):
     def _render(self):
@@ -111,24 +178,15 @@ def longest_runs(series, heads, tails, ctx):
         raise TestNotImplementedError(
             "Test implementation cannot handle sequences below length 128"
         ) from e
-    maxlen_bins = Bins(intervals)
 
     set_task_total(ctx, nblocks + 2)
 
     failures = check_recommendations(ctx, {"n ≥ 128": n >= 128})
 
-    try:
-        probabilities = blocksize_probabilities[blocksize]
-    except KeyError as e:
-        raise TestNotImplementedError(
-            "Test implementation currently cannot calculate probabilities\n"
-            f"Values are pre-calculated, which do not include blocksizes of {blocksize}"
-        ) from e
-    expected_bincounts = [prob * nblocks for prob in probabilities]
-
     advance_task(ctx)
 
     boundary = nblocks * blocksize
+    maxlens = []
     for block in blocks(series[:boundary], blocksize):
         runlengths = (length for value, length in asruns(block) if value == heads)
 
@@ -137,14 +195,44 @@ def longest_runs(series, heads, tails, ctx):
             if length > maxlen:
                 maxlen = length
 
-        maxlen_bins[maxlen] += 1
+        maxlens.append(maxlen)
 
         advance_task(ctx)
 
-    statistic, p = chisquare(list(maxlen_bins.values()), expected_bincounts)
+    result = longest_runs_from_maxlens(
+        heads, tails, failures, blocksize, intervals, maxlens
+    )
 
     advance_task(ctx)
 
+    return result
+
+
+def longest_runs_from_maxlens(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    blocksize: Integer,
+    intervals: List[Integer],
+    maxlens: List[Integer],
+) -> "LongestRunsTestResult":
+    nblocks = len(maxlens)
+
+    try:
+        probabilities = blocksize_probabilities[blocksize]
+    except KeyError as e:
+        raise TestNotImplementedError(
+            "Test implementation currently cannot calculate probabilities\n"
+            f"Values are pre-calculated, which do not include blocksizes of {blocksize}"
+        ) from e
+    expected_bincounts = [prob * nblocks for prob in probabilities]
+
+    maxlen_bins = Bins(intervals)
+    for maxlen in maxlens:
+        maxlen_bins[maxlen] += 1
+
+    statistic, p = chisquare(list(maxlen_bins.values()), expected_bincounts)
+
     return LongestRunsTestResult(
         heads,
         tails,
@@ -158,6 +246,68 @@ def longest_runs(series, heads, tails, ctx):
     )
 
 
+class LongestRunsAccumulator(Accumulator):
+    """Longest runs in block test ran incrementally over chunks of a sequence
+
+    The parameters of the test depend on the final length of the sequence, so
+    the longest runs of ``heads`` per block are kept for every set of default
+    parameters. Only the first ``nblocks`` blocks are ever tested, so the kept
+    state is bounded no matter how long the sequence grows.
+    """
+
+    min_n = 128
+
+    def __init__(self, heads: Face = 1, tails: Face = 0):
+        super().__init__(heads, tails)
+        self.maxlens = {params.blocksize: [] for params in n_defaults.values()}
+        self._runlens = {params.blocksize: 0 for params in n_defaults.values()}
+
+    def _update(self, bits):
+        for blocksize, nblocks, _ in n_defaults.values():
+            boundary = nblocks * blocksize
+            if self.n < boundary:
+                self._update_maxlens(bits[: boundary - self.n], blocksize)
+
+    def _update_maxlens(self, bits: np.ndarray, blocksize: Integer):
+        positions = np.arange(self.n, self.n + len(bits))
+        block_starts = positions % blocksize == 0
+
+        # The length of the current run at each position is the count of heads
+        # since the last tails or start of a block, i.e. since the last reset
+        counts = np.cumsum(bits, dtype=np.int64)
+        resets = np.where(bits == 0, counts, np.iinfo(np.int64).min)
+        resets = np.where(block_starts & (bits == 1), counts - 1, resets)
+        resets[0] = max(resets[0], -self._runlens[blocksize])
+        runlens = counts - np.maximum.accumulate(resets)
+
+        block_indices = np.flatnonzero(block_starts)
+        if len(block_indices) == 0 or block_indices[0] != 0:
+            block_indices = np.insert(block_indices, 0, 0)
+        block_maxlens = np.maximum.reduceat(runlens, block_indices).tolist()
+
+        maxlens = self.maxlens[blocksize]
+        if not block_starts[0]:
+            maxlens[-1] = max(maxlens[-1], block_maxlens.pop(0))
+        maxlens.extend(block_maxlens)
+
+        self._runlens[blocksize] = int(runlens[-1])
+
+    def result(self) -> "LongestRunsTestResult":
+        self._check_input()
+
+        blocksize, nblocks, intervals = n_defaults[self.n]
+        failures = check_recommendations(None, {"n ≥ 128": self.n >= 128})
+
+        return longest_runs_from_maxlens(
+            self.heads,
+            self.tails,
+            failures,
+            blocksize,
+            intervals,
+            self.maxlens[blocksize][:nblocks],
+        )
+
+
 @dataclass
 class LongestRunsTestResult(TestResult):
     blocksize: Integer
@@ -1,25 +1,26 @@
-from collections import defaultdict
 from dataclasses import dataclass
 from math import floor
 from math import log2
-from typing import DefaultDict
 from typing import Dict
-from typing import Tuple
+from typing import List
 
-import pandas as pd
+import numpy as np
 from rich.table import Table
 from rich.text import Text
 from scipy.special import gammaincc
 
+from coinflip._randtests.common.accumulator import PatternAccumulator
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.result import MultiTestResult
 from coinflip._randtests.common.result import SubTestResult
-from coinflip._randtests.common.testutils import slider
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.testutils import cyclic_pattern_counts
+from coinflip._randtests.common.testutils import marginalise_counts
 from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["serial"]
+__all__ = ["serial", "serial_from_counts", "SerialAccumulator"]
 
 
 @randtest()
@@ -27,42 +28,78 @@ def serial(series, heads, tails, ctx, blocksize=None):
     n = len(series)
 
     if not blocksize:
-        blocksize = max(floor(log2(n)) - 2 - 1, 2)
+        blocksize = default_blocksize(n)
 
-    set_task_total(ctx, (1 + n) * 3 + 2)
+    set_task_total(ctx, 3)
 
-    failures = check_recommendations(
-        ctx, {"blocksize < ⌊log2(n) - 2⌋": blocksize < floor(log2(n)) - 2}
-    )
+    failures = check_recommendations(ctx, serial_recommendations(n, blocksize))
 
-    permutation_counts = {}
-    normalised_sums = {}
-    for window_size in [blocksize, blocksize - 1, blocksize - 2]:
-        if window_size > 0:
-            head = series[: window_size - 1]
-            ouroboros = pd.concat([series, head])
+    bits = binarise(series, heads)
 
-            advance_task(ctx)
+    advance_task(ctx)
 
-            counts = defaultdict(int)
-            for window_tup in slider(ouroboros, window_size):
-                counts[window_tup] += 1
+    counts = cyclic_pattern_counts(bits, blocksize)
 
-                advance_task(ctx)
+    advance_task(ctx)
 
-            permutation_counts[window_size] = counts
+    result = serial_from_counts(heads, tails, failures, counts, blocksize, n)
 
-            sum_squares = sum(count ** 2 for count in counts.values())
-            normsum = (2 ** window_size / n) * sum_squares - n
+    advance_task(ctx)
 
-            normalised_sums[window_size] = normsum
+    return result
+
+
+def default_blocksize(n: Integer) -> Integer:
+    return max(floor(log2(n)) - 2 - 1, 2)
+
+
+def serial_recommendations(n: Integer, blocksize: Integer) -> Dict[str, bool]:
+    return {"blocksize < ⌊log2(n) - 2⌋": blocksize < floor(log2(n)) - 2}
+
+
+def serial_from_counts(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    counts: np.ndarray,
+    blocksize: Integer,
+    n: Integer,
+) -> "SerialMultiTestResult":
+    """Finds the serial test results from the cyclic counts of patterns
+
+    Parameters
+    ----------
+    heads : ``Face``
+        The ``1`` abstraction
+    tails : ``Face``
+        The ``0`` abstraction
+    failures : ``List[str]``
+        Recommendations the test input did not meet
+    counts : ``ndarray``
+        Dense cyclic counts of patterns of size ``blocksize``
+    blocksize : ``Integer``
+        Size of the patterns
+    n : ``Integer``
+        Length of the sequence the patterns were counted from
+
+    Returns
+    -------
+    results : ``SerialMultiTestResult``
+        Results of the test
+    """
+    permutation_counts = {}
+    normalised_sums = {}
+    for window_size in [blocksize, blocksize - 1, blocksize - 2]:
+        if window_size > 0:
+            permutation_counts[window_size] = counts
+            normalised_sums[window_size] = normalised_sum(counts, window_size, n)
+
+            counts = marginalise_counts(counts)
 
         else:
-            permutation_counts[window_size] = defaultdict(int)
+            permutation_counts[window_size] = np.zeros(0, dtype=int)
             normalised_sums[window_size] = 0
 
-    advance_task(ctx)
-
     normsum_delta1 = normalised_sums[blocksize] - normalised_sums[blocksize - 1]
     p1 = gammaincc(2 ** (blocksize - 2), normsum_delta1 / 2)
 
@@ -73,8 +110,6 @@ def serial(series, heads, tails, ctx, blocksize=None):
     )
     p2 = gammaincc(2 ** (blocksize - 3), normsum_delta2 / 2)
 
-    advance_task(ctx)
-
     results = {
         "∇ψ²ₘ": SubTestResult(normsum_delta1, p1,),
         "∇²ψ²ₘ": SubTestResult(normsum_delta2, p2,),
@@ -85,10 +120,64 @@ def serial(series, heads, tails, ctx, blocksize=None):
     )
 
 
+class SerialAccumulator(PatternAccumulator):
+    """Serial test ran incrementally over chunks of a sequence
+
+    Only the counts of overlapping patterns are kept between chunks, along
+    with the bits needed to complete the patterns which span chunks or wrap
+    around the sequence, so memory use depends on the blocksize alone.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``, optional
+        Size of the patterns. By default the size for the length of the
+        sequence is used, up to a size of ``max_blocksize``.
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    max_blocksize : ``Integer``, default ``16``
+        Largest pattern size that can be found by default
+    """
+
+    def __init__(
+        self,
+        blocksize: Integer = None,
+        heads: Face = 1,
+        tails: Face = 0,
+        max_blocksize: Integer = 16,
+    ):
+        super().__init__(blocksize or max_blocksize, heads, tails)
+        self.blocksize = blocksize
+
+    def result(self) -> "SerialMultiTestResult":
+        self._check_input()
+
+        n = self.n
+        blocksize = self.blocksize or min(default_blocksize(n), self.max_blocksize)
+        failures = check_recommendations(None, serial_recommendations(n, blocksize))
+
+        return serial_from_counts(
+            self.heads,
+            self.tails,
+            failures,
+            self.cyclic_counts(blocksize),
+            blocksize,
+            n,
+        )
+
+
+def normalised_sum(counts: np.ndarray, window_size: Integer, n: Integer) -> Float:
+    """Finds ψ²ₘ of the cyclic pattern counts of a sequence"""
+    sum_squares = np.dot(counts, counts)
+
+    return (2 ** window_size / n) * sum_squares - n
+
+
 @dataclass
 class SerialMultiTestResult(MultiTestResult):
     blocksize: Integer
-    permutation_counts: Dict[Integer, DefaultDict[Tuple[Face, ...], Integer]]
+    permutation_counts: Dict[Integer, np.ndarray]
     normalised_sums: Dict[Integer, Float]
 
     def _render(self):
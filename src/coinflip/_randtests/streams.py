@@ -0,0 +1,460 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from math import sqrt
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from warnings import catch_warnings
+from warnings import simplefilter
+
+import numpy as np
+import pandas as pd
+from scipy.special import gammaincc
+
+from coinflip import _randtests
+from coinflip._randtests.common.cache import uncached
+from coinflip._randtests.common.core import CliContext
+from coinflip._randtests.common.core import advance_task
+from coinflip._randtests.common.core import check_recommendations
+from coinflip._randtests.common.core import infer_faces
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.exceptions import TestError
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip._randtests.common.result import BaseTestResult
+from coinflip._randtests.common.result import MultiTestResult
+from coinflip._randtests.common.result import make_testvars_table
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Float
+from coinflip._randtests.common.typing import Integer
+
+__all__ = ["multistream", "split_streams", "StreamsTestResult"]
+
+
+SIGLEVEL = 0.01
+UNIFORMITY_SIGLEVEL = 0.0001
+NBINS = 10
+
+
+def multistream(
+    streams: Iterable[np.ndarray],
+    randtest_names: Optional[Iterable[str]] = None,
+    heads: Face = 1,
+    tails: Face = 0,
+    workers: Optional[int] = None,
+    siglevel: Float = SIGLEVEL,
+    ctx: Optional[CliContext] = None,
+) -> Iterator[Tuple[str, Optional["StreamsTestResult"]]]:
+    """Runs randomness tests across many bitstreams and assesses their p-values
+
+    Each test is ran on every stream, and the p-values of a test (or of each
+    of its sub-tests) are then assessed as ``sts`` does: the proportion of
+    streams which pass is compared to its confidence interval, and the
+    uniformity of the p-values is found by a chi-square test over 10 bins.
+
+    Streams are tested a batch at a time, and the outcomes of each batch are
+    added to the assessment as soon as it completes, so neither the streams
+    nor their results are all held in memory.
+
+    Parameters
+    ----------
+    streams : ``Iterable[ndarray]``
+        Arrays of ``0`` and ``1`` bits, which are only read as needed
+    randtest_names : ``Iterable[str]``, optional
+        Names of the tests to run, defaulting to every test
+    heads : ``Face``, default ``1``
+        Face the ``1`` bits represent
+    tails : ``Face``, default ``0``
+        Face the ``0`` bits represent
+    workers : ``int``, optional
+        Number of processes to test streams in, defaulting to the number of
+        processors. Passing ``1`` tests streams in the current process.
+    siglevel : ``Float``, default ``0.01``
+        Significance level a stream's p-value must meet to pass
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``StreamsTestResult``
+        Assessment of the test's p-values, or ``None`` if the test could not
+        be ran on any stream
+    """
+    if randtest_names is None:
+        randtest_names = _randtests.__all__
+    randtest_names = list(randtest_names)
+
+    assessment = StreamsAssessment(randtest_names)
+    for batch in map_streams(streams, randtest_names, workers):
+        for outcomes in batch:
+            assessment.add(outcomes)
+            advance_task(ctx)
+
+    check_recommendations(None, assessment.recommendations())
+
+    for name in randtest_names:
+        yield name, assessment.result(name, heads, tails, siglevel)
+
+
+# Smallest number of p-values sts assesses uniformity for
+min_nstreams = 55
+
+
+def split_streams(
+    sequence,
+    nstreams: Optional[Integer] = None,
+    streamlen: Optional[Integer] = None,
+) -> Tuple[Face, Face, Iterator[np.ndarray]]:
+    """Splits a sequence into bitstreams of equal length
+
+    Remaining values which do not fill a stream are discarded.
+
+    Parameters
+    ----------
+    sequence : array-like with two distinct values
+        Sequence containing 2 distinct elements
+    nstreams : ``Integer``, optional
+        Number of streams to split the sequence into
+    streamlen : ``Integer``, optional
+        Length of each stream, defaulting to the sequence evenly divided into
+        ``nstreams``
+
+    Returns
+    -------
+    heads : ``Face``
+        Inferred heads face of the sequence
+    tails : ``Face``
+        Inferred tails face of the sequence
+    streams : ``Iterator[ndarray]``
+        Arrays of ``0`` and ``1`` bits, where ``1`` represents ``heads``
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If sequence does not contain only 2 values
+    TestInputError
+        If neither or invalid ``nstreams`` and ``streamlen`` are passed
+    """
+    series = sequence if isinstance(sequence, pd.Series) else pd.Series(sequence)
+    if series.nunique() != 2:
+        raise NonBinarySequenceError()
+    heads, tails = infer_faces(tuple(series.unique()))
+
+    nstreams, streamlen = stream_dimensions(len(series), nstreams, streamlen)
+    # Each stream is only binarised once it is read
+    streams = (
+        binarise(series.iloc[i * streamlen : (i + 1) * streamlen], heads)
+        for i in range(nstreams)
+    )
+
+    return heads, tails, streams
+
+
+def split_packed_streams(
+    packed: np.ndarray,
+    nstreams: Optional[Integer] = None,
+    streamlen: Optional[Integer] = None,
+) -> Iterator[np.ndarray]:
+    """Splits packed bits, e.g. a memory-mapped binary file, into bitstreams
+
+    Each stream is only unpacked from the bytes it spans once it is read, so
+    the bits are never all held in memory at once. Remaining bits which do not
+    fill a stream are discarded.
+
+    Parameters
+    ----------
+    packed : ``ndarray``
+        ``uint8`` array of bits packed as ``np.packbits()`` does
+    nstreams : ``Integer``, optional
+        Number of streams to split the bits into
+    streamlen : ``Integer``, optional
+        Length of each stream, defaulting to the bits evenly divided into
+        ``nstreams``
+
+    Returns
+    -------
+    streams : ``Iterator[ndarray]``
+        Arrays of ``0`` and ``1`` bits
+
+    Raises
+    ------
+    TestInputError
+        If neither or invalid ``nstreams`` and ``streamlen`` are passed
+    """
+    nstreams, streamlen = stream_dimensions(8 * len(packed), nstreams, streamlen)
+
+    return (unpack_stream(packed, i * streamlen, streamlen) for i in range(nstreams))
+
+
+def unpack_stream(packed: np.ndarray, start: Integer, streamlen: Integer) -> np.ndarray:
+    """Unpacks the ``streamlen`` bits from bit ``start`` of packed bits"""
+    stop = start + streamlen
+    bits = np.unpackbits(packed[start // 8 : -(-stop // 8)])
+    offset = start % 8
+
+    return bits[offset : offset + streamlen]
+
+
+def stream_dimensions(
+    n: Integer, nstreams: Optional[Integer], streamlen: Optional[Integer]
+) -> Tuple[Integer, Integer]:
+    """Finds the number and length of streams a sequence of length ``n`` holds"""
+    if nstreams is None and streamlen is None:
+        raise TestInputError("Either nstreams or streamlen must be passed")
+    if nstreams is not None and nstreams < 1:
+        raise TestInputError("nstreams must be a positive integer")
+    if streamlen is not None and streamlen < 1:
+        raise TestInputError("streamlen must be a positive integer")
+
+    if streamlen is None:
+        streamlen = n // nstreams
+    if nstreams is None:
+        nstreams = n // streamlen
+
+    if nstreams * streamlen > n:
+        raise TestInputError(
+            f"Sequence of length {n} cannot be split into {nstreams} streams "
+            f"of length {streamlen}"
+        )
+    if streamlen < 1 or nstreams < 1:
+        raise TestInputError(f"Sequence of length {n} is too short to split")
+
+    return nstreams, streamlen
+
+
+StreamOutcomes = Dict[str, Optional[Tuple[List[str], Dict[Any, Float]]]]
+
+
+def map_streams(
+    streams: Iterable[np.ndarray], randtest_names: List[str], workers: Optional[int]
+) -> Iterator[List[StreamOutcomes]]:
+    """Tests every stream, yielding the outcomes of each batch of streams
+
+    Streams are read and tested a batch at a time, so only a few streams are
+    held in memory at once and the outcomes of a batch are yielded as soon as
+    it completes.
+    """
+    workers = workers or os.cpu_count() or 1
+    streams = iter(streams)
+    # Submitting in batches stops every stream being queued at once
+    batchsize = 4 * workers
+    batches = iter(lambda: list(islice(streams, batchsize)), [])
+
+    if workers == 1:
+        for batch in batches:
+            yield [run_stream(stream, randtest_names) for stream in batch]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in batches:
+            names = [randtest_names] * len(batch)
+            yield list(executor.map(run_stream, batch, names))
+
+
+def run_stream(bits: np.ndarray, randtest_names: List[str]) -> StreamOutcomes:
+    """Runs tests on a stream, keeping only the outcomes needed to assess it"""
+    outcomes = {}
+    # Streams are rarely tested twice, so caching them would only fill the cache
+    with catch_warnings(), uncached():
+        simplefilter("ignore")
+        for name in randtest_names:
+            randtest = getattr(_randtests, name)
+            try:
+                result = randtest(bits)
+            except TestError:
+                outcomes[name] = None
+            else:
+                outcomes[name] = (result.failures, result_pvalues(result))
+
+    return outcomes
+
+
+def result_pvalues(result: BaseTestResult) -> Dict[Any, Float]:
+    if isinstance(result, MultiTestResult):
+        return {feature: sub.p for feature, sub in result.results.items()}
+    else:
+        return {None: result.p}
+
+
+class StreamsAssessment:
+    """Outcomes of tests across streams, gathered as each stream is tested
+
+    Only the failures, p-values and number of errors of each test are kept, so
+    the outcomes of a stream can be dropped as soon as they are added.
+    """
+
+    def __init__(self, randtest_names: Iterable[str]):
+        self.nstreams = 0
+        self.failures = {name: set() for name in randtest_names}
+        self.feature_pvalues = {name: {} for name in self.failures}
+        self.nerrors = {name: 0 for name in self.failures}
+
+    def add(self, outcomes: StreamOutcomes):
+        """Adds the outcomes of the tests on another stream"""
+        self.nstreams += 1
+        for name in self.failures:
+            outcome = outcomes[name]
+            if outcome is None:
+                self.nerrors[name] += 1
+                continue
+
+            stream_failures, pvalues = outcome
+            self.failures[name].update(stream_failures)
+            for feature, p in pvalues.items():
+                self.feature_pvalues[name].setdefault(feature, []).append(p)
+
+    def recommendations(self) -> Dict[str, bool]:
+        """Map of the recommendations on the streams to whether they are met"""
+        return {f"nstreams ≥ {min_nstreams}": self.nstreams >= min_nstreams}
+
+    def result(
+        self, randtest_name: str, heads: Face, tails: Face, siglevel: Float = SIGLEVEL
+    ) -> Optional["StreamsTestResult"]:
+        """Assesses the p-values of a test, or ``None`` if it was never ran"""
+        feature_pvalues = self.feature_pvalues[randtest_name]
+        if not feature_pvalues:
+            return None
+
+        failures = sorted(self.failures[randtest_name])
+        failures += [expr for expr, met in self.recommendations().items() if not met]
+
+        results = {
+            feature: SecondLevelResult(np.asarray(pvalues), siglevel)
+            for feature, pvalues in feature_pvalues.items()
+        }
+
+        return StreamsTestResult(
+            heads,
+            tails,
+            failures,
+            randtest_name,
+            self.nstreams,
+            self.nerrors[randtest_name],
+            results,
+        )
+
+
+@dataclass
+class SecondLevelResult:
+    """Assessment of the p-values a test gave across many streams
+
+    Non-finite p-values (e.g. from a stream the test statistic was undefined
+    for) cannot be binned, so they are dropped on construction and counted by
+    ``ndropped``.
+    """
+
+    pvalues: np.ndarray
+    siglevel: Float
+    ndropped: Integer = 0
+
+    def __post_init__(self):
+        pvalues = np.asarray(self.pvalues, dtype=np.float64)
+        finite = np.isfinite(pvalues)
+        self.ndropped += int(np.count_nonzero(~finite))
+        self.pvalues = pvalues[finite]
+
+    @property
+    def nstreams(self) -> Integer:
+        return len(self.pvalues)
+
+    @property
+    def npassed(self) -> Integer:
+        return int(np.count_nonzero(self.pvalues >= self.siglevel))
+
+    @property
+    def proportion(self) -> Float:
+        """Proportion of streams which passed"""
+        if self.nstreams == 0:
+            return np.nan
+
+        return self.npassed / self.nstreams
+
+    @property
+    def interval(self) -> Tuple[Float, Float]:
+        """Confidence interval of the proportion of streams which should pass"""
+        if self.nstreams == 0:
+            return np.nan, np.nan
+
+        expect = 1 - self.siglevel
+        margin = 3 * sqrt(expect * self.siglevel / self.nstreams)
+
+        return expect - margin, expect + margin
+
+    @property
+    def pvalue_counts(self) -> np.ndarray:
+        """Occurences of p-values in each tenth of the unit interval"""
+        bins = np.minimum((self.pvalues * NBINS).astype(int), NBINS - 1)
+
+        return np.bincount(bins, minlength=NBINS)
+
+    @property
+    def uniformity_p(self) -> Float:
+        """p-value of the p-values being uniformly distributed (P-value_T)"""
+        if self.nstreams == 0:
+            return np.nan
+
+        expect = self.nstreams / NBINS
+        chi2 = np.sum((self.pvalue_counts - expect) ** 2 / expect)
+
+        return gammaincc((NBINS - 1) / 2, chi2 / 2)
+
+    @property
+    def passed(self) -> bool:
+        low, _ = self.interval
+
+        return self.proportion >= low and self.uniformity_p >= UNIFORMITY_SIGLEVEL
+
+
+@dataclass
+class StreamsTestResult(BaseTestResult):
+    randtest_name: str
+    nstreams: Integer
+    nerrors: Integer
+    results: Dict[Any, SecondLevelResult]
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results.values())
+
+    def _render(self):
+        columns = [f"C{i}" for i in range(1, NBINS + 1)]
+        table = make_testvars_table(
+            "feature",
+            *columns,
+            "P-value_T",
+            "proportion",
+            title=f"second-level results of {self.nstreams} streams",
+        )
+        for feature, result in self.results.items():
+            low, _ = result.interval
+            f_uniformity_p = str(round(result.uniformity_p, 6))
+            if result.uniformity_p < UNIFORMITY_SIGLEVEL:
+                f_uniformity_p += "*"
+            f_proportion = f"{result.npassed}/{result.nstreams}"
+            if result.proportion < low:
+                f_proportion += "*"
+
+            table.add_row(
+                "" if feature is None else str(feature),
+                *(str(count) for count in result.pvalue_counts),
+                f_uniformity_p,
+                f_proportion,
+            )
+
+        yield table
+
+        if self.nerrors:
+            yield f"test could not be ran on {self.nerrors} streams"
+        for feature, result in self.results.items():
+            if result.ndropped:
+                of_feature = "" if feature is None else f" of feature {feature}"
+                yield (
+                    f"{result.ndropped} non-finite p-values{of_feature} "
+                    "were dropped"
+                )
@@ -0,0 +1,144 @@
+from dataclasses import dataclass
+from math import floor
+from math import log2
+from typing import Dict
+from typing import List
+
+import pandas as pd
+
+from coinflip._randtests.common.core import *
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip._randtests.common.result import BaseTestResult
+from coinflip._randtests.common.result import make_testvars_table
+from coinflip._randtests.common.testutils import binarise
+from coinflip._randtests.common.testutils import cyclic_pattern_counts
+from coinflip._randtests.common.testutils import marginalise_counts
+from coinflip._randtests.common.typing import Float
+from coinflip._randtests.common.typing import Integer
+from coinflip._randtests.entropy import ApproximateEntropyTestResult
+from coinflip._randtests.entropy import approximate_entropy_from_counts
+from coinflip._randtests.serial import SerialMultiTestResult
+from coinflip._randtests.serial import serial_from_counts
+
+__all__ = ["pattern_sweep"]
+
+
+@randtest()
+def pattern_sweep(series, heads, tails, ctx, blocksizes=None):
+    n = len(series)
+
+    if not blocksizes:
+        blocksizes = range(2, max(floor(log2(n)) - 2, 3))
+    blocksizes = sorted(set(blocksizes))
+    if blocksizes[0] < 1:
+        raise TestInputError("Blocksizes must be positive integers")
+    maxsize = blocksizes[-1]
+
+    set_task_total(ctx, len(blocksizes) + 3)
+
+    # Recommendations are checked once for the whole sweep, so only a single
+    # warning is raised however many blocksizes fail them
+    serial_maxsize = floor(log2(n)) - 2
+    entropy_maxsize = floor(log2(n)) - 5
+    failures = check_recommendations(
+        ctx,
+        {
+            "max(blocksizes) < ⌊log2(n) - 2⌋": maxsize < serial_maxsize,
+            "max(blocksizes) < ⌊log2(n)⌋ - 5": maxsize < entropy_maxsize,
+        },
+    )
+
+    bits = binarise(series, heads)
+
+    advance_task(ctx)
+
+    # approximate_entropy at blocksize m needs the counts of (m + 1)-bit patterns
+    counts = cyclic_pattern_counts(bits, maxsize + 1)
+
+    advance_task(ctx)
+
+    size_counts = {maxsize + 1: counts}
+    for size in range(maxsize, blocksizes[0] - 1, -1):
+        counts = marginalise_counts(counts)
+        size_counts[size] = counts
+
+    advance_task(ctx)
+
+    serial_results = {}
+    approximate_entropy_results = {}
+    for blocksize in blocksizes:
+        serial_failures = []
+        if blocksize >= serial_maxsize:
+            serial_failures.append("blocksize < ⌊log2(n) - 2⌋")
+        serial_results[blocksize] = serial_from_counts(
+            heads, tails, serial_failures, size_counts[blocksize], blocksize, n
+        )
+
+        entropy_failures = []
+        if blocksize >= entropy_maxsize:
+            entropy_failures.append("blocksize < ⌊log2(n)⌋ - 5")
+        approximate_entropy_results[blocksize] = approximate_entropy_from_counts(
+            heads, tails, entropy_failures, size_counts[blocksize + 1], blocksize, n
+        )
+
+        advance_task(ctx)
+
+    return PatternSweepTestResult(
+        heads,
+        tails,
+        failures,
+        blocksizes,
+        serial_results,
+        approximate_entropy_results,
+    )
+
+
+@dataclass
+class PatternSweepTestResult(BaseTestResult):
+    blocksizes: List[Integer]
+    serial_results: Dict[Integer, SerialMultiTestResult]
+    approximate_entropy_results: Dict[Integer, ApproximateEntropyTestResult]
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """Statistics and p-values of every test, indexed by blocksize"""
+        rows = []
+        for blocksize in self.blocksizes:
+            serial = self.serial_results[blocksize]
+            (stat1, stat2), (p1, p2) = serial.statistics, serial.pvalues
+            entropy = self.approximate_entropy_results[blocksize]
+
+            rows.append((stat1, p1, stat2, p2, entropy.statistic, entropy.p))
+
+        columns = [
+            "serial_statistic1",
+            "serial_p1",
+            "serial_statistic2",
+            "serial_p2",
+            "approximate_entropy_statistic",
+            "approximate_entropy_p",
+        ]
+        index = pd.Index(self.blocksizes, name="blocksize")
+
+        return pd.DataFrame(rows, index=index, columns=columns)
+
+    def failing_blocksizes(self, siglevel: Float = 0.01) -> List[Integer]:
+        """Blocksizes where any of the tests failed at the significance level"""
+        pvalues = self.table[["serial_p1", "serial_p2", "approximate_entropy_p"]]
+        failing = pvalues.lt(siglevel).any(axis=1)
+
+        return list(pvalues.index[failing])
+
+    def _render(self):
+        table = make_testvars_table(
+            "blocksize", "∇ψ²ₘ p", "∇²ψ²ₘ p", "ApEn p", title="p-values per blocksize"
+        )
+        for blocksize, row in self.table.iterrows():
+            table.add_row(
+                str(blocksize),
+                str(round(row["serial_p1"], 3)),
+                str(round(row["serial_p2"], 3)),
+                str(round(row["approximate_entropy_p"], 3)),
+            )
+
+        yield table
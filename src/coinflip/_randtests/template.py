@@ -8,14 +8,17 @@ from math import floor
 from math import isclose
 from math import log2
 from math import sqrt
+from typing import Dict
 from typing import List
 from typing import Tuple
 
+import numpy as np
 from rich.text import Text
 from scipy.special import gammaincc
 from scipy.special import hyp1f1
 from scipy.stats import chisquare
 
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.collections import defaultlist
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.pprint import pretty_subseq
@@ -31,7 +34,12 @@ from coinflip._randtests.common.typing import Face
 from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["non_overlapping_template_matching", "overlapping_template_matching"]
+__all__ = [
+    "non_overlapping_template_matching",
+    "NonOverlappingTemplateMatchingAccumulator",
+    "overlapping_template_matching",
+    "OverlappingTemplateMatchingAccumulator",
+]
 
 
 # ------------------------------------------------------------------------------
@@ -50,36 +58,22 @@ def non_overlapping_template_matching(
     n = len(series)
 
     if not blocksize:
-        blocksize = max(ceil(0.01 * n), 6)
-        if blocksize % 2 != 0:
-            blocksize -= 1
+        blocksize = nonoverlapping_blocksize(n)
     nblocks = n // blocksize
 
     if not template_size:
-        template_size = max(min(blocksize // 3, 9), 2)
+        template_size = nonoverlapping_template_size(blocksize)
 
     nblocks_sub = blocksize // template_size
     set_task_total(ctx, 1 + nblocks * (nblocks_sub + 1) + 1)
 
     failures = check_recommendations(
-        ctx,
-        {
-            "n ≥ 100": n >= 100,
-            "template_size = 9 or 10": template_size == 9 or template_size == 10,
-            "blocksize > 0.01 * n": blocksize > 0.01 * n,
-            "nblocks ≤ 100": nblocks <= 100,  # TODO same thing as above?
-            "nblocks = ⌊n / blocksize⌋": nblocks == n // blocksize,
-        },
-    )
-
-    matches_expect = (blocksize - template_size + 1) / 2 ** template_size
-    variance = blocksize * (
-        (1 / 2 ** template_size) - ((2 * template_size - 1)) / 2 ** (2 * template_size)
+        ctx, nonoverlapping_recommendations(n, template_size, blocksize, nblocks)
     )
 
     advance_task(ctx)
 
-    template_block_matches = defaultdict(lambda: defaultlist(int))
+    template_block_matches = defaultdict(lambda: defaultlist(int, dtype=np.int64))
     for i, block in enumerate(blocks(series, blocksize)):
         matches = defaultdict(int)
 
@@ -93,9 +87,64 @@ def non_overlapping_template_matching(
 
         advance_task(ctx)
 
+    result = non_overlapping_template_matching_from_matches(
+        heads,
+        tails,
+        failures,
+        template_size,
+        blocksize,
+        {
+            template: template_block_matches[template][:nblocks]
+            for template in product([heads, tails], repeat=template_size)
+        },
+    )
+
+    advance_task(ctx)
+
+    return result
+
+
+def nonoverlapping_blocksize(n: Integer) -> Integer:
+    blocksize = max(ceil(0.01 * n), 6)
+    if blocksize % 2 != 0:
+        blocksize -= 1
+
+    return blocksize
+
+
+def nonoverlapping_template_size(blocksize: Integer) -> Integer:
+    return max(min(blocksize // 3, 9), 2)
+
+
+def nonoverlapping_recommendations(
+    n: Integer, template_size: Integer, blocksize: Integer, nblocks: Integer
+) -> Dict[str, bool]:
+    return {
+        "n ≥ 100": n >= 100,
+        "template_size = 9 or 10": template_size == 9 or template_size == 10,
+        "blocksize > 0.01 * n": blocksize > 0.01 * n,
+        "nblocks ≤ 100": nblocks <= 100,  # TODO same thing as above?
+        "nblocks = ⌊n / blocksize⌋": nblocks == n // blocksize,
+    }
+
+
+def non_overlapping_template_matching_from_matches(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    template_size: Integer,
+    blocksize: Integer,
+    template_block_matches: Dict[Tuple[Face, ...], List[Integer]],
+) -> "NonOverlappingTemplateMatchingMultiTestResult":
+    nblocks = len(next(iter(template_block_matches.values())))
+
+    matches_expect = (blocksize - template_size + 1) / 2 ** template_size
+    variance = blocksize * (
+        (1 / 2 ** template_size) - ((2 * template_size - 1)) / 2 ** (2 * template_size)
+    )
+
     results = {}
-    for template in product([heads, tails], repeat=template_size):
-        block_matches = template_block_matches[template][:nblocks]
+    for template, block_matches in template_block_matches.items():
         match_diffs = [matches - matches_expect for matches in block_matches]
 
         statistic = sum(diff ** 2 / variance for diff in match_diffs)
@@ -109,8 +158,6 @@ def non_overlapping_template_matching(
             match_diffs,
         )
 
-    advance_task(ctx)
-
     return NonOverlappingTemplateMatchingMultiTestResult(
         heads,
         tails,
@@ -124,6 +171,107 @@ def non_overlapping_template_matching(
     )
 
 
+class NonOverlappingTemplateMatchingAccumulator(Accumulator):
+    """Non-overlapping template matching test ran incrementally over sequence chunks
+
+    The batch test derives its blocksize from the length of the sequence, so
+    here it must be passed. The counts of each template in every block are
+    kept between chunks, along with the trailing bits of a window left open at
+    the end of the last chunk.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``
+        Size of the blocks that partition the sequence
+    template_size : ``Integer``, optional
+        Size of the templates to match
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    """
+
+    def __init__(
+        self,
+        blocksize: Integer,
+        template_size: Integer = None,
+        heads: Face = 1,
+        tails: Face = 0,
+    ):
+        super().__init__(heads, tails)
+        self.blocksize = blocksize
+        self.template_size = template_size or nonoverlapping_template_size(blocksize)
+        self._block_counts = []
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+
+    def _update(self, bits):
+        blocksize = self.blocksize
+        template_size = self.template_size
+        ntemplates = 2 ** template_size
+
+        start = self.n - len(self._open_bits)
+        bits = np.concatenate([self._open_bits, bits])
+        stop = start + len(bits)
+
+        # Windows are consecutive from the start of each block
+        first_block = start // blocksize
+        last_block = (stop - 1) // blocksize
+        block_starts = blocksize * np.arange(first_block, last_block + 1)
+        offsets = template_size * np.arange(blocksize // template_size)
+        starts = (block_starts[:, np.newaxis] + offsets).ravel()
+        starts = starts[(starts >= start) & (starts + template_size <= stop)]
+
+        codes = np.zeros(len(starts), dtype=np.int64)
+        for i in range(template_size):
+            codes = (codes << 1) | bits[starts - start + i]
+
+        nrows = last_block - first_block + 1
+        rows = np.bincount(
+            (starts // blocksize - first_block) * ntemplates + codes,
+            minlength=nrows * ntemplates,
+        ).reshape(nrows, ntemplates)
+
+        if first_block < len(self._block_counts):
+            self._block_counts[first_block] += rows[0]
+            rows = rows[1:]
+        self._block_counts.extend(rows)
+
+        self._open_bits = bits[max(len(bits) - (template_size - 1), 0) :]
+
+    def result(self) -> "NonOverlappingTemplateMatchingMultiTestResult":
+        self._check_input()
+
+        n = self.n
+        nblocks = n // self.blocksize
+        failures = check_recommendations(
+            None,
+            nonoverlapping_recommendations(
+                n, self.template_size, self.blocksize, nblocks
+            ),
+        )
+
+        ntemplates = 2 ** self.template_size
+        counts = np.zeros((nblocks, ntemplates), dtype=np.int64)
+        if nblocks > 0:
+            counts[:] = self._block_counts[:nblocks]
+
+        # Templates are ordered from all heads, i.e. from the largest code
+        templates = product([self.heads, self.tails], repeat=self.template_size)
+        template_block_matches = {
+            template: counts[:, code].tolist()
+            for template, code in zip(templates, range(ntemplates - 1, -1, -1))
+        }
+
+        return non_overlapping_template_matching_from_matches(
+            self.heads,
+            self.tails,
+            failures,
+            self.template_size,
+            self.blocksize,
+            template_block_matches,
+        )
+
+
 @dataclass(unsafe_hash=True)
 class NonOverlappingTemplateMatchingSubTestResult(SubTestResult):
     template: Tuple[Face, ...]
@@ -194,36 +342,20 @@ def overlapping_template_matching(
     nblocks = n // blocksize
 
     if not template_size:
-        template_size = min(max(floor(sqrt(blocksize)), 2), 12)
+        template_size = overlapping_template_size(blocksize)
     template = [heads for _ in range(template_size)]
 
-    lambda_ = (blocksize - template_size + 1) / 2 ** template_size
-    eta = lambda_ / 2
-
-    first_prob = exp(-eta)
-    probabilities = [first_prob]
-    for matches in range(1, matches_ceil):
-        prob = ((eta * exp(-2 * eta)) / 2 ** matches) * hyp1f1(matches + 1, 2, eta)
-        probabilities.append(prob)
-    last_prob = 1 - sum(probabilities)
-    probabilities.append(last_prob)
+    lambda_, probabilities = overlapping_probabilities(template_size, blocksize)
 
     set_task_total(ctx, 1 + nblocks + 2)
 
     failures = check_recommendations(
         ctx,
-        {
-            "n ≥ 288": n >= 288,
-            "n ≥ nblocks * blocksize": n >= nblocks * blocksize,
-            "nblocks * min(probabilities) > df": nblocks * min(probabilities) > df,
-            "λ ≈ 2": isclose(lambda_, 2),
-            "len(template) ≈ log2(nblocks)": isclose(template_size, log2(nblocks)),
-            "df ≈ 2 * λ": isclose(template_size, 2 * lambda_),
-        },
+        overlapping_recommendations(
+            n, template_size, blocksize, nblocks, df, lambda_, probabilities
+        ),
     )
 
-    expected_tallies = [prob * nblocks for prob in probabilities]
-
     advance_task(ctx)
 
     block_matches = []
@@ -245,10 +377,87 @@ def overlapping_template_matching(
 
     advance_task(ctx)
 
-    statistic, p = chisquare(tallies, expected_tallies)
+    result = overlapping_template_matching_from_tallies(
+        heads, tails, failures, tallies, probabilities, template_size, blocksize
+    )
 
     advance_task(ctx)
 
+    return result
+
+
+def overlapping_template_size(blocksize: Integer) -> Integer:
+    return min(max(floor(sqrt(blocksize)), 2), 12)
+
+
+def overlapping_probabilities(
+    template_size: Integer, blocksize: Integer
+) -> Tuple[Float, List[Float]]:
+    """Finds the probabilities of a block having 0 to 5 (or more) matches
+
+    Parameters
+    ----------
+    template_size : ``Integer``
+        Size of the template
+    blocksize : ``Integer``
+        Size of the blocks
+
+    Returns
+    -------
+    lambda_ : ``Float``
+        Expected number of matches per block
+    probabilities : ``List[Float]``
+        Probability of ``0``, ``1``, ..., ``4`` and then ``5`` or more matches in
+        a block
+    """
+    lambda_ = (blocksize - template_size + 1) / 2 ** template_size
+    eta = lambda_ / 2
+
+    first_prob = exp(-eta)
+    probabilities = [first_prob]
+    for matches in range(1, matches_ceil):
+        prob = ((eta * exp(-2 * eta)) / 2 ** matches) * hyp1f1(matches + 1, 2, eta)
+        probabilities.append(prob)
+    last_prob = 1 - sum(probabilities)
+    probabilities.append(last_prob)
+
+    return lambda_, probabilities
+
+
+def overlapping_recommendations(
+    n: Integer,
+    template_size: Integer,
+    blocksize: Integer,
+    nblocks: Integer,
+    df: Integer,
+    lambda_: Float,
+    probabilities: List[Float],
+) -> Dict[str, bool]:
+    return {
+        "n ≥ 288": n >= 288,
+        "n ≥ nblocks * blocksize": n >= nblocks * blocksize,
+        "nblocks * min(probabilities) > df": nblocks * min(probabilities) > df,
+        "λ ≈ 2": isclose(lambda_, 2),
+        "len(template) ≈ log2(nblocks)": isclose(template_size, log2(nblocks)),
+        "df ≈ 2 * λ": isclose(template_size, 2 * lambda_),
+    }
+
+
+def overlapping_template_matching_from_tallies(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    tallies: List[Integer],
+    probabilities: List[Float],
+    template_size: Integer,
+    blocksize: Integer,
+) -> "OverlappingTemplateMatchingTestResult":
+    nblocks = sum(tallies)
+    template = [heads for _ in range(template_size)]
+    expected_tallies = [prob * nblocks for prob in probabilities]
+
+    statistic, p = chisquare(tallies, expected_tallies)
+
     return OverlappingTemplateMatchingTestResult(
         heads,
         tails,
@@ -264,6 +473,114 @@ def overlapping_template_matching(
     )
 
 
+class OverlappingTemplateMatchingAccumulator(Accumulator):
+    """Overlapping template matching test ran incrementally over sequence chunks
+
+    The batch test derives its blocksize from the length of the sequence, so
+    here it must be passed. Only the tallies of matches per completed block
+    are kept between chunks, along with the matches and trailing bits of the
+    block left open at the end of the last chunk.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``
+        Size of the blocks that partition the sequence
+    template_size : ``Integer``, optional
+        Size of the template of ``heads`` to match
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+    df : ``Integer``, default ``5``
+        Degrees of freedom the blocks are recommended to exceed
+    """
+
+    def __init__(
+        self,
+        blocksize: Integer,
+        template_size: Integer = None,
+        heads: Face = 1,
+        tails: Face = 0,
+        df: Integer = 5,
+    ):
+        super().__init__(heads, tails)
+        self.blocksize = blocksize
+        self.template_size = template_size or overlapping_template_size(blocksize)
+        self.df = df
+        self.tallies = [0 for _ in range(matches_ceil + 1)]
+        self._open_matches = 0
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+
+    def _update(self, bits):
+        blocksize = self.blocksize
+        template_size = self.template_size
+
+        start = self.n - len(self._open_bits)
+        bits = np.concatenate([self._open_bits, bits])
+        stop = start + len(bits)
+
+        # Windows of all heads, which only match if they lie within one block
+        heads_counts = np.concatenate([[0], np.cumsum(bits, dtype=np.int64)])
+        window_heads = heads_counts[template_size:] - heads_counts[:-template_size]
+        starts = start + np.flatnonzero(window_heads == template_size)
+        ends = starts + template_size - 1
+        starts = starts[starts // blocksize == ends // blocksize]
+
+        first_block = start // blocksize
+        block_matches = np.bincount(
+            starts // blocksize - first_block,
+            minlength=(stop - 1) // blocksize - first_block + 1,
+        )
+        block_matches[0] += self._open_matches
+
+        nclosed = stop // blocksize - first_block
+        closed_tallies = np.bincount(
+            np.minimum(block_matches[:nclosed], matches_ceil),
+            minlength=matches_ceil + 1,
+        )
+        self.tallies = [a + b for a, b in zip(self.tallies, closed_tallies.tolist())]
+
+        open_start = stop // blocksize * blocksize
+        if open_start < stop:
+            self._open_matches = int(block_matches[nclosed])
+            keep_start = max(open_start, stop - (template_size - 1))
+            self._open_bits = bits[keep_start - start :]
+        else:
+            self._open_matches = 0
+            self._open_bits = bits[:0]
+
+    def result(self) -> "OverlappingTemplateMatchingTestResult":
+        self._check_input()
+
+        n = self.n
+        nblocks = n // self.blocksize
+        lambda_, probabilities = overlapping_probabilities(
+            self.template_size, self.blocksize
+        )
+        failures = check_recommendations(
+            None,
+            overlapping_recommendations(
+                n,
+                self.template_size,
+                self.blocksize,
+                nblocks,
+                self.df,
+                lambda_,
+                probabilities,
+            ),
+        )
+
+        return overlapping_template_matching_from_tallies(
+            self.heads,
+            self.tails,
+            failures,
+            list(self.tallies),
+            probabilities,
+            self.template_size,
+            self.blocksize,
+        )
+
+
 @dataclass
 class OverlappingTemplateMatchingTestResult(TestResult):
     template_size: Integer
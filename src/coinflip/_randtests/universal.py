@@ -8,19 +8,24 @@ from math import log
 from math import log2
 from math import sqrt
 from typing import DefaultDict
+from typing import Dict
 from typing import List
 from typing import NamedTuple
 from typing import Tuple
 
+import numpy as np
+
+from coinflip._randtests.common.accumulator import Accumulator
 from coinflip._randtests.common.collections import FloorDict
 from coinflip._randtests.common.core import *
 from coinflip._randtests.common.exceptions import TestNotImplementedError
 from coinflip._randtests.common.result import TestResult
 from coinflip._randtests.common.testutils import rawblocks
 from coinflip._randtests.common.typing import Face
+from coinflip._randtests.common.typing import Float
 from coinflip._randtests.common.typing import Integer
 
-__all__ = ["maurers_universal"]
+__all__ = ["maurers_universal", "MaurersUniversalAccumulator"]
 
 
 class Dist(NamedTuple):
@@ -87,33 +92,16 @@ def maurers_universal(series, heads, tails, ctx, blocksize=None, init_nblocks=No
     n = len(series)
 
     if not blocksize or not init_nblocks:
-        try:
-            blocksize, init_nblocks = n_defaults[n]
-        except KeyError:
-            blocksize = min(max(ceil(log(n)), 2), 16)  # largest blocksize_dists key
-            nblocks = n // blocksize
-            init_nblocks = max(nblocks // 100, 1)
+        blocksize, init_nblocks = default_params(n)
 
     init_n = init_nblocks * blocksize
     init_series, segment_series = series[:init_n], series[init_n:]
     segment_nblocks = (n - init_n) // blocksize
 
-    mean_expect, variance = blocksize_dists[blocksize]
-
     set_task_total(ctx, init_nblocks + segment_nblocks + 2)
 
     failures = check_recommendations(
-        ctx,
-        {
-            "n ≥ 387840": n >= 387840,
-            "6 ≤ blocksize ≤ 16": 6 <= blocksize <= 16,
-            "init_nblocks ≈ 10 * 2 ** segment_nblocks": intclose(
-                init_nblocks, 10 * 2 ** segment_nblocks
-            ),
-            "segment_nblocks ≈ ⌈n / blocksize⌉ - init_nblocks": isclose(
-                segment_nblocks, floor(n / blocksize) - init_nblocks
-            ),
-        },
+        ctx, universal_recommendations(n, blocksize, init_nblocks, segment_nblocks)
     )
 
     permutation_last_init_pos = defaultdict(int)
@@ -143,13 +131,67 @@ def maurers_universal(series, heads, tails, ctx, blocksize=None, init_nblocks=No
 
     advance_task(ctx)
 
+    result = universal_from_distances(
+        heads,
+        tails,
+        failures,
+        distances_total,
+        blocksize,
+        init_nblocks,
+        segment_nblocks,
+        permutation_last_init_pos,
+        permutation_positions,
+    )
+
+    advance_task(ctx)
+
+    return result
+
+
+def default_params(n: Integer) -> Tuple[Integer, Integer]:
+    try:
+        blocksize, init_nblocks = n_defaults[n]
+    except KeyError:
+        blocksize = min(max(ceil(log(n)), 2), 16)  # largest blocksize_dists key
+        nblocks = n // blocksize
+        init_nblocks = max(nblocks // 100, 1)
+
+    return blocksize, init_nblocks
+
+
+def universal_recommendations(
+    n: Integer, blocksize: Integer, init_nblocks: Integer, segment_nblocks: Integer
+) -> Dict[str, bool]:
+    return {
+        "n ≥ 387840": n >= 387840,
+        "6 ≤ blocksize ≤ 16": 6 <= blocksize <= 16,
+        "init_nblocks ≈ 10 * 2 ** blocksize": intclose(
+            init_nblocks, 10 * 2 ** blocksize
+        ),
+        "segment_nblocks ≈ ⌈n / blocksize⌉ - init_nblocks": isclose(
+            segment_nblocks, floor(n / blocksize) - init_nblocks
+        ),
+    }
+
+
+def universal_from_distances(
+    heads: Face,
+    tails: Face,
+    failures: List[str],
+    distances_total: Float,
+    blocksize: Integer,
+    init_nblocks: Integer,
+    segment_nblocks: Integer,
+    permutation_last_init_pos: DefaultDict[Tuple[Face, ...], Integer],
+    permutation_positions: DefaultDict[Tuple[Face, ...], List[Integer]],
+) -> "UniversalTestResult":
+    mean_expect, variance = blocksize_dists[blocksize]
+
     statistic = distances_total / segment_nblocks
 
     normdiff = abs((statistic - mean_expect) / (sqrt(2 * variance)))
     p = erfc(normdiff)
 
-    advance_task(ctx)
-
     return UniversalTestResult(
         heads,
         tails,
@@ -164,6 +206,165 @@ def maurers_universal(series, heads, tails, ctx, blocksize=None, init_nblocks=No
     )
 
 
+class MaurersUniversalAccumulator(Accumulator):
+    """Maurer's universal test ran incrementally over chunks of a sequence
+
+    For each pattern only the position of the block it last occurred in is
+    kept, along with the running sum of the log distances between
+    occurrences and the bits of the block left open at the end of the last
+    chunk. The positions of every occurrence are not kept, so results have an
+    empty ``permutation_positions``.
+
+    If ``blocksize`` and ``init_nblocks`` are not both passed, the default
+    parameters for each sequence length from 387840 bits are tracked, as the
+    batch test picks them from the final length of the sequence.
+
+    Parameters
+    ----------
+    blocksize : ``Integer``, optional
+        Size of the blocks that partition the sequence
+    init_nblocks : ``Integer``, optional
+        Number of initial blocks which only mark the positions of patterns
+    heads : ``Face``, default ``1``
+        Value in the sequence which represents a ``1`` bit
+    tails : ``Face``, default ``0``
+        Value in the sequence which represents a ``0`` bit
+
+    Raises
+    ------
+    TestNotImplementedError
+        If ``blocksize`` is over 16
+    """
+
+    min_n = 4
+
+    def __init__(
+        self,
+        blocksize: Integer = None,
+        init_nblocks: Integer = None,
+        heads: Face = 1,
+        tails: Face = 0,
+    ):
+        if blocksize and blocksize > 16:
+            raise TestNotImplementedError(
+                "Test implementation cannot handle blocksize over 16"
+            )
+
+        super().__init__(heads, tails)
+        self.fixed_params = bool(blocksize and init_nblocks)
+        if self.fixed_params:
+            self.tables = {DefaultParams(blocksize, init_nblocks): PositionsTable()}
+        else:
+            self.min_n = next(iter(n_defaults))
+            self.tables = {params: PositionsTable() for params in n_defaults.values()}
+
+    def _update(self, bits):
+        for params, table in self.tables.items():
+            table.update(bits, *params)
+
+        n = self.n + len(bits)
+        if not self.fixed_params and n >= self.min_n:
+            # Parameters for lengths the sequence has outgrown are never used
+            params = n_defaults[n]
+            self.tables = {
+                p: table for p, table in self.tables.items() if p >= params
+            }
+
+    def result(self) -> "UniversalTestResult":
+        self._check_input()
+
+        n = self.n
+        if self.fixed_params:
+            params = next(iter(self.tables))
+        else:
+            params = n_defaults[n]
+        blocksize, init_nblocks = params
+        table = self.tables[params]
+        segment_nblocks = (n - init_nblocks * blocksize) // blocksize
+
+        failures = check_recommendations(
+            None, universal_recommendations(n, blocksize, init_nblocks, segment_nblocks)
+        )
+
+        init_last_pos = table.init_last_pos()
+        codes = np.flatnonzero(init_last_pos)
+        codebits = (codes[:, np.newaxis] >> np.arange(blocksize - 1, -1, -1)) & 1
+        faces = np.array([self.tails, self.heads], dtype=object)
+        permutations = map(tuple, faces[codebits].tolist())
+        permutation_last_init_pos = defaultdict(
+            int, zip(permutations, init_last_pos[codes].tolist())
+        )
+
+        return universal_from_distances(
+            self.heads,
+            self.tails,
+            failures,
+            table.distances_total,
+            blocksize,
+            init_nblocks,
+            segment_nblocks,
+            permutation_last_init_pos,
+            defaultdict(list),
+        )
+
+
+class PositionsTable:
+    """Last positions of patterns in a sequence of blocks, and their distances"""
+
+    def __init__(self):
+        self.nblocks = 0
+        self.distances_total = 0.0
+        self._last_pos = None
+        self._init_last_pos = None
+        self._open_bits = np.zeros(0, dtype=np.uint8)
+
+    def update(self, bits: np.ndarray, blocksize: Integer, init_nblocks: Integer):
+        if self._last_pos is None:
+            self._last_pos = np.zeros(2 ** blocksize, dtype=np.int64)
+
+        bits = np.concatenate([self._open_bits, bits])
+        nblocks = len(bits) // blocksize
+        boundary = nblocks * blocksize
+        self._open_bits = bits[boundary:]
+
+        # Codes fit in 16 bits, which numpy can stable sort by radix
+        codes = np.zeros(nblocks, dtype=np.uint16)
+        for offset, column in enumerate(bits[:boundary].reshape(nblocks, blocksize).T):
+            codes |= column.astype(np.uint16) << (blocksize - 1 - offset)
+        positions = np.arange(self.nblocks + 1, self.nblocks + nblocks + 1)
+        ninit = min(max(init_nblocks - self.nblocks, 0), nblocks)
+        self.nblocks += nblocks
+
+        np.maximum.at(self._last_pos, codes[:ninit], positions[:ninit])
+        if self._init_last_pos is None and self.nblocks >= init_nblocks:
+            self._init_last_pos = self._last_pos.copy()
+
+        # Occurrences of each pattern are grouped in order, so each one's last
+        # occurrence is either the one before it or from a previous chunk
+        order = np.argsort(codes[ninit:], kind="stable")
+        codes = codes[ninit:][order]
+        positions = positions[ninit:][order]
+        if len(codes) == 0:
+            return
+
+        last_positions = self._last_pos[codes]
+        repeats = np.flatnonzero(codes[1:] == codes[:-1]) + 1
+        last_positions[repeats] = positions[repeats - 1]
+        self.distances_total += float(np.sum(np.log2(positions - last_positions)))
+
+        lasts = np.append(codes[1:] != codes[:-1], True)
+        self._last_pos[codes[lasts]] = positions[lasts]
+
+    def init_last_pos(self) -> np.ndarray:
+        """Last positions of patterns in the initial blocks"""
+        if self._init_last_pos is not None:
+            return self._init_last_pos
+        elif self._last_pos is not None:
+            return self._last_pos
+        else:
+            return np.zeros(0, dtype=np.int64)
+
+
 @dataclass
 class UniversalTestResult(TestResult):
     blocksize: Integer
@@ -0,0 +1,52 @@
+"""Randomness tests ran incrementally over chunks of a sequence
+
+Each accumulator is fed the sequence chunk by chunk via ``update()`` (or
+``update_packed()`` for packed bits), carrying only the state its test needs
+across chunk boundaries. ``result()`` can be called at any point, and produces
+the same result the batch test would on the sequence accumulated so far.
+
+``run_chunked()`` feeds a packed sequence, such as a memory-mapped file, to
+the accumulators of every test a chunk at a time, so sequences larger than
+memory can be tested. The state of an accumulator can be serialised via
+``snapshot()`` and restored via ``Accumulator.restore()``, which
+``run_chunked()`` does periodically when passed a ``Checkpoint``.
+"""
+from coinflip._randtests.chunked import default_accumulators
+from coinflip._randtests.chunked import run_chunked
+from coinflip._randtests.common.accumulator import Accumulator
+from coinflip._randtests.complexity import LinearComplexityAccumulator
+from coinflip._randtests.cusum import BidirectionalCusumAccumulator
+from coinflip._randtests.cusum import CusumAccumulator
+from coinflip._randtests.entropy import ApproximateEntropyAccumulator
+from coinflip._randtests.excursions import RandomExcursionsAccumulator
+from coinflip._randtests.excursions import RandomExcursionsVariantAccumulator
+from coinflip._randtests.frequency import FrequencyWithinBlockAccumulator
+from coinflip._randtests.frequency import MonobitAccumulator
+from coinflip._randtests.matrix import BinaryMatrixRankAccumulator
+from coinflip._randtests.runs import LongestRunsAccumulator
+from coinflip._randtests.runs import RunsAccumulator
+from coinflip._randtests.serial import SerialAccumulator
+from coinflip._randtests.template import NonOverlappingTemplateMatchingAccumulator
+from coinflip._randtests.template import OverlappingTemplateMatchingAccumulator
+from coinflip._randtests.universal import MaurersUniversalAccumulator
+
+__all__ = [
+    "Accumulator",
+    "MonobitAccumulator",
+    "FrequencyWithinBlockAccumulator",
+    "RunsAccumulator",
+    "LongestRunsAccumulator",
+    "BinaryMatrixRankAccumulator",
+    "NonOverlappingTemplateMatchingAccumulator",
+    "CusumAccumulator",
+    "BidirectionalCusumAccumulator",
+    "RandomExcursionsAccumulator",
+    "RandomExcursionsVariantAccumulator",
+    "SerialAccumulator",
+    "ApproximateEntropyAccumulator",
+    "OverlappingTemplateMatchingAccumulator",
+    "MaurersUniversalAccumulator",
+    "LinearComplexityAccumulator",
+    "default_accumulators",
+    "run_chunked",
+]
@@ -0,0 +1,17 @@
+"""On-disk cache of randomness test results
+
+Once a cache is set via ``set_cache()``, results of the tests in ``randtests``
+are cached, keyed by a BLAKE2 hash of the packed sequence along with the test's
+name, its parameters and the version of ``coinflip``. Running a test again on
+the same sequence then loads its result instead. Nothing is cached unless a
+cache is set, except by the ``run`` command which caches its results unless
+passed ``--no-cache``. Results live in the directory set by the
+``COINFLIP_CACHE_DIR`` environment variable, or else ``~/.cache/coinflip``,
+and the least recently used are evicted once the cache grows too large.
+"""
+from coinflip._randtests.common.cache import ResultCache
+from coinflip._randtests.common.cache import get_cache
+from coinflip._randtests.common.cache import result_key
+from coinflip._randtests.common.cache import set_cache
+
+__all__ = ["ResultCache", "get_cache", "set_cache", "result_key"]
@@ -0,0 +1,14 @@
+"""Checkpoints of runs of randomness tests, to resume them once interrupted
+
+The outcome of each test in a run is put in a ``Checkpoint`` as soon as the
+test completes, so running again with the same checkpoint skips the completed
+tests. Tests ran over chunks via ``run_chunked`` also put periodic snapshots of
+their accumulators, so they can continue from their last snapshot. Checkpoints
+are keyed by the hash of the sequence and the run's parameters, and live in a
+``checkpoints`` directory of the cache directory by default, where they are
+evicted along with the least used cached results.
+"""
+from coinflip._randtests.common.checkpoint import Checkpoint
+from coinflip._randtests.common.checkpoint import run_key
+
+__all__ = ["Checkpoint", "run_key"]
@@ -0,0 +1,270 @@
+import io
+import pickle
+from collections import defaultdict
+from numbers import Real
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+
+__all__ = ["dump_result", "load_result"]
+
+
+# Arrays, lists and mappings with fewer items than this are left in the pickle
+MIN_ITEMS = 16
+
+# Reference to a slice of a pool, as its name, offset, shape and original dtype
+ArrayRef = Tuple[str, int, Tuple[int, ...], str]
+
+
+def dump_result(result: Any) -> Tuple[bytes, Optional[bytes]]:
+    """Pickles a result, writing the arrays it holds to an ``.npz`` archive
+
+    Numeric arrays, lists of numbers and mappings of numbers (or of tuples and
+    lists of numbers) are taken out of the pickle, which only references them.
+    Pickling numbers one by one takes many times the space of the numbers
+    themselves, so this keeps results holding many numbers small.
+
+    Returns
+    -------
+    pickled : ``bytes``
+        Pickle of the result
+    arrays : ``bytes``
+        Compressed ``.npz`` archive of the arrays the pickle references, or
+        ``None`` if the result holds no arrays
+    """
+    pool = ArrayPool()
+    f = io.BytesIO()
+    ResultPickler(f, pool).dump(result)
+
+    return f.getvalue(), pool.npz() if pool else None
+
+
+def load_result(pickled: bytes, read_arrays: Callable[[], bytes]) -> Any:
+    """Unpickles a result pickled by ``dump_result()``
+
+    Parameters
+    ----------
+    pickled : ``bytes``
+        Pickle of the result
+    read_arrays : ``Callable[[], bytes]``
+        Reads the ``.npz`` archive of the result's arrays, which is only called
+        if the pickle references any arrays
+
+    Returns
+    -------
+    result
+        Unpickled result
+    """
+    return ResultUnpickler(io.BytesIO(pickled), read_arrays).load()
+
+
+class ArrayPool:
+    """Arrays concatenated by their type, so a result is written as few arrays"""
+
+    def __init__(self):
+        self._chunks = defaultdict(list)
+        self._sizes = defaultdict(int)
+
+    def add(self, array: np.ndarray) -> ArrayRef:
+        """Adds an array to the pool, returning a reference to it"""
+        name = f"{array.dtype.kind}{array.dtype.itemsize}"
+        offset = self._sizes[name]
+        self._chunks[name].append(array.ravel())
+        self._sizes[name] += array.size
+
+        return name, offset, array.shape, array.dtype.str
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    def npz(self) -> bytes:
+        """Writes the pool to a compressed ``.npz`` archive"""
+        arrays = {}
+        for name, chunks in self._chunks.items():
+            array = np.concatenate(chunks)
+            # Integers are mostly small counts, which compress better narrowed
+            if array.dtype.kind in "iu" and array.size > 0:
+                dtype = np.promote_types(
+                    np.min_scalar_type(array.min()), np.min_scalar_type(array.max())
+                )
+                array = array.astype(dtype)
+            arrays[name] = array
+
+        f = io.BytesIO()
+        np.savez_compressed(f, **arrays)
+
+        return f.getvalue()
+
+
+def number_type(values: Iterable) -> Optional[type]:
+    """Finds the type every value is, if they are all numbers of the same type"""
+    types = set(map(type, values))
+    if len(types) != 1:
+        return None
+
+    (type_,) = types
+    if not issubclass(type_, Real) or issubclass(type_, (bool, np.bool_)):
+        return None
+
+    return type_
+
+
+def as_array(values: list) -> Optional[np.ndarray]:
+    """Converts a list of numbers to an array, if it can be exactly"""
+    if len(values) > 0 and number_type(values) is None:
+        return None
+
+    array = np.asarray(values)
+    if array.dtype.kind not in "iuf":
+        return None
+
+    return array
+
+
+def as_items(array: np.ndarray, numpy: bool) -> list:
+    """Converts an array to a list of numpy or Python numbers"""
+    return list(array) if numpy else array.tolist()
+
+
+class ResultPickler(pickle.Pickler):
+    def __init__(self, file, pool: ArrayPool):
+        super().__init__(file)
+        self.pool = pool
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray:
+            if obj.dtype.kind in "biuf" and obj.size >= MIN_ITEMS:
+                return "array", self.pool.add(obj)
+
+        elif type(obj) is list:
+            if len(obj) >= MIN_ITEMS:
+                array = as_array(obj)
+                if array is not None:
+                    numpy = isinstance(obj[0], np.generic)
+                    return "list", self.pool.add(array), numpy
+
+        elif type(obj) in (dict, defaultdict):
+            if len(obj) >= MIN_ITEMS:
+                return self._mapping_id(obj)
+
+        return None
+
+    def _mapping_id(self, mapping: Dict):
+        keys = list(mapping.keys())
+        if all(type(key) is tuple for key in keys):
+            if len(set(map(len, keys))) != 1:
+                return None
+            key_items = [x for key in keys for x in key]
+            keys_array = as_array(key_items)
+            if keys_array is None:
+                return None
+            keys_array = keys_array.reshape(len(keys), -1)
+            numpy_keys = isinstance(key_items[0], np.generic)
+        else:
+            keys_array = as_array(keys)
+            if keys_array is None:
+                return None
+            numpy_keys = isinstance(keys[0], np.generic)
+
+        values = list(mapping.values())
+        if all(type(value) is list for value in values):
+            value_items = [x for value in values for x in value]
+            values_array = as_array(value_items)
+            if values_array is None:
+                return None
+            lengths = np.array([len(value) for value in values], dtype=np.int64)
+            lengths_ref = self.pool.add(lengths)
+            numpy_values = len(value_items) > 0 and isinstance(
+                value_items[0], np.generic
+            )
+        else:
+            values_array = as_array(values)
+            if values_array is None:
+                return None
+            lengths_ref = None
+            numpy_values = isinstance(values[0], np.generic)
+
+        default_factory = getattr(mapping, "default_factory", None)
+
+        return (
+            "mapping",
+            type(mapping),
+            default_factory,
+            self.pool.add(keys_array),
+            numpy_keys,
+            self.pool.add(values_array),
+            numpy_values,
+            lengths_ref,
+        )
+
+
+class ResultUnpickler(pickle.Unpickler):
+    def __init__(self, file, read_arrays: Callable[[], bytes]):
+        super().__init__(file)
+        self._read_arrays = read_arrays
+        self._npz = None
+        self._pools = {}
+
+    def _array(self, ref: ArrayRef) -> np.ndarray:
+        name, offset, shape, dtype = ref
+        if self._npz is None:
+            self._npz = np.load(io.BytesIO(self._read_arrays()))
+        if name not in self._pools:
+            self._pools[name] = self._npz[name]
+
+        size = int(np.prod(shape))
+        pool = self._pools[name]
+
+        return pool[offset : offset + size].astype(dtype).reshape(shape)
+
+    def persistent_load(self, pid):
+        kind, *args = pid
+        if kind == "array":
+            (ref,) = args
+            return self._array(ref)
+
+        elif kind == "list":
+            ref, numpy = args
+            return as_items(self._array(ref), numpy)
+
+        elif kind == "mapping":
+            (
+                type_,
+                default_factory,
+                keys_ref,
+                numpy_keys,
+                values_ref,
+                numpy_values,
+                lengths_ref,
+            ) = args
+
+            keys_array = self._array(keys_ref)
+            keys = as_items(keys_array, numpy_keys)
+            if keys_array.ndim == 2:
+                keys = [tuple(key) for key in keys]
+
+            values_array = self._array(values_ref)
+            if lengths_ref is None:
+                values = as_items(values_array, numpy_values)
+            else:
+                bounds = np.cumsum(self._array(lengths_ref))[:-1]
+                values = [
+                    as_items(value, numpy_values)
+                    for value in np.split(values_array, bounds)
+                ]
+
+            if type_ is defaultdict:
+                mapping = defaultdict(default_factory)
+            else:
+                mapping = type_()
+            mapping.update(zip(keys, values))
+
+            return mapping
+
+        else:
+            raise pickle.UnpicklingError(f"Unknown persistent id {kind}")
@@ -1,31 +1,55 @@
 import webbrowser
 from datetime import datetime
+from inspect import signature
+from math import ceil
 from pathlib import Path
+from time import perf_counter
 
 import pandas as pd
+from click import BadParameter
 from click import Choice
+from click import File
 from click import Path as Path_
 from click import argument
+from click import echo
+from click import get_current_context
 from click import group
 from click import option
 from rich.text import Text
 
 from coinflip import generators
+from coinflip._randtests.common.cache import ResultCache
+from coinflip._randtests.common.cache import get_cache
+from coinflip._randtests.common.cache import set_cache
+from coinflip._randtests.common.checkpoint import Checkpoint
+from coinflip._randtests.common.checkpoint import run_key
 from coinflip._randtests.common.exceptions import NonBinarySequenceError
 from coinflip._randtests.common.exceptions import TestError
+from coinflip._randtests.monitor import WindowMonitor
+from coinflip._randtests.monitor import monitor_randtests
 from coinflip.cli import console
+from coinflip.cli.database import *
+from coinflip.cli.generating import *
+from coinflip.cli.monitoring import *
 from coinflip.cli.parsing import DataParsingError
 from coinflip.cli.parsing import *
 from coinflip.cli.pprint import *
 from coinflip.cli.report import *
 from coinflip.cli.runner import *
-from coinflip.randtests import __all__ as randtest_names
 
-__all__ = ["run", "example_run", "read", "report"]
+__all__ = [
+    "run",
+    "example_run",
+    "generate",
+    "monitor",
+    "query",
+    "read",
+    "report",
+]
 
 
 # TODO extend Choice to use print_error and newline-delimit lists
-test_choice = Choice(randtest_names)
+test_choice = Choice([name for name, _ in list_tests()])
 
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
@@ -41,6 +65,10 @@ def main():
     """
 
 
+# Bytes at the start of DATA kept when it is tested out-of-core
+preview_nbytes = 512
+
+
 @main.command()
 @argument("data", type=Path_(exists=True))
 @argument("out", type=Path_(), required=False, metavar="OUT")
@@ -51,7 +79,48 @@ def main():
     flag_value=True,
     help="Read DATA as a raw binary file.",
 )
-def run(data, out, binary):
+@option(
+    "-m",
+    "--streams",
+    type=int,
+    help="Split DATA into this many bitstreams and test each.",
+)
+@option("--streamlen", type=int, help="Length of each bitstream.")
+@option(
+    "--max-memory",
+    metavar="SIZE",
+    help="Test a binary DATA in chunks to use roughly SIZE memory, e.g. 512M.",
+)
+@option(
+    "--no-cache",
+    is_flag=True,
+    help="Run every test instead of loading cached results.",
+)
+@option("-l", "--label", help="Label the results, e.g. with the device tested.")
+@option(
+    "--format",
+    "output_format",
+    type=Choice(["rich", "ndjson"]),
+    default="rich",
+    help="Print results richly, or as a JSON line each.",
+)
+@option(
+    "--resume",
+    is_flag=True,
+    help="Checkpoint the run, resuming an interrupted run if it was checkpointed.",
+)
+def run(
+    data,
+    out,
+    binary,
+    streams,
+    streamlen,
+    max_memory,
+    no_cache,
+    label,
+    output_format,
+    resume,
+):
     """Run randomness tests on DATA and write results to OUT.
 
     DATA is a newline-delimited text file which contains output of a random
@@ -60,11 +129,70 @@ def run(data, out, binary):
     Individual results of each test are printed as they come. Once they are
     all finished, the results are written to OUT.
 
+    Passing --streams and/or --streamlen splits DATA into many bitstreams. Each
+    test is then ran on every stream, and the p-values are assessed by the
+    proportion of streams which passed and by the uniformity of their
+    distribution, as NIST's sts does.
+
+    Passing --max-memory with --binary tests DATA out-of-core, reading it a
+    chunk at a time so files larger than memory can be tested. Only the start
+    of DATA is saved in OUT, and the spectral test is only ran on as much of
+    DATA as fits within SIZE.
+
+    Results of each test are cached, so running tests on the same DATA again
+    loads their results. Passing --no-cache runs every test regardless.
+
+    Passing --format ndjson prints each result as a compact JSON line as soon
+    as its test completes instead, with a line for each sub-test before the
+    line of its test. Nothing else is printed, and the results are only
+    written if OUT is passed.
+
+    Passing --resume checkpoints the outcome of each test as soon as it
+    completes. Runs via --max-memory are always checkpointed, and the tests ran
+    over chunks are also checkpointed every minute. If a checkpointed run is
+    interrupted, running it again on the same DATA with the same options and
+    --resume skips the tests it completed, and continues the chunked tests from
+    their last checkpoint. Checkpoints are removed once OUT is written, and are
+    otherwise evicted along with the least used cached results (unless
+    --no-cache is passed).
+
+    OUT is a zip archive, unless it ends with .db, .sqlite or .sqlite3 where the
+    results are instead added as a new run to a SQLite database of many runs.
+    Runs in a database can be filtered and aggregated via the query command.
+
     The results saved in OUT can be printed again via the read command. OUT can
     also be used to generate an informational web document via the report
     command.
     """
-    if not binary:
+    # The library only caches results when asked to, so the command enables the
+    # cache for its own run and restores the caller's cache afterwards
+    previous_cache = get_cache()
+    get_current_context().call_on_close(lambda: set_cache(previous_cache))
+    if no_cache:
+        set_cache(None)
+    elif previous_cache is None:
+        set_cache(ResultCache())
+    cache = get_cache()
+
+    if max_memory:
+        if not binary or streams or streamlen:
+            print_error(
+                TestError("--max-memory can only be used to test a --binary file")
+            )
+            exit(1)
+        try:
+            max_memory = parse_size(max_memory)
+        except DataParsingError as e:
+            print_error(e)
+            exit(1)
+
+        series = parse_binary(data, nbytes=preview_nbytes)
+
+    elif binary and (streams or streamlen):
+        # Streams are read from the file as they are tested
+        series = parse_binary(data, nbytes=preview_nbytes)
+
+    elif not binary:
         try:
             series = parse_text(data)
         except (DataParsingError, NonBinarySequenceError) as e:
@@ -74,24 +202,109 @@ def run(data, out, binary):
     else:
         series = parse_binary(data)
 
-    print_series(series)
+    ndjson = output_format == "ndjson"
+    if not ndjson:
+        print_series(series)
+
+    params = {
+        "binary": binary,
+        "streams": streams,
+        "streamlen": streamlen,
+        "max_memory": max_memory,
+    }
+    # Only runs which can be resumed are checkpointed, which the long chunked
+    # runs always can be
+    checkpoint = None
+    resumed_names = []
+    if resume or max_memory:
+        # Stale checkpoints are left alone when the cache is disabled
+        if cache:
+            cache.evict()
+        checkpoint = Checkpoint(run_key(file_digest(data), params))
+        if not resume:
+            checkpoint.clear()
+        elif not checkpoint.path.exists() and not ndjson:
+            print_warning("No checkpoint of a previous run was found to resume")
+        resumed_names = [name for name, _ in list_tests() if name in checkpoint]
+
+    if max_memory:
+        if ndjson:
+            randtest_results = iter_all_tests_chunked(data, max_memory, checkpoint)
+        else:
+            randtest_results = run_all_tests_chunked(data, max_memory, checkpoint)
+    elif streams or streamlen:
+        source = data if binary else None
+        if ndjson:
+            randtest_results = iter_all_tests_streams(
+                None if source else series, streams, streamlen, checkpoint, source
+            )
+        else:
+            randtest_results = (
+                (name, result, None)
+                for name, result in run_all_tests_streams(
+                    None if source else series, streams, streamlen, checkpoint, source
+                )
+            )
+    else:
+        if ndjson:
+            randtest_results = iter_all_tests(series, checkpoint)
+        else:
+            randtest_results = run_all_tests(series, checkpoint)
 
     results = {}
-    for name, result, e in run_all_tests(series):
-        if not e:
-            results[name] = result
+    # Tests are timed by the wait for each of their results, so the chunked
+    # tests which all accumulate at once, and resumed or cached tests which
+    # were loaded instead of ran, are left untimed
+    timings = {}
+    nhits = cache.nhits if cache else 0
+    start = perf_counter()
+    try:
+        for name, result, e in randtest_results:
+            if result:
+                results[name] = result
+                loaded = cache is not None and cache.nhits > nhits
+                if name not in resumed_names and not loaded:
+                    timings[name] = perf_counter() - start
+            if ndjson:
+                for record in result_records(name, result, e):
+                    echo(format_record(record))
+            nhits = cache.nhits if cache else 0
+            start = perf_counter()
+    except TestError as e:
+        print_error(e)
+        exit(1)
+    if max_memory:
+        timings = None
+
+    if ndjson and not out:
+        if checkpoint:
+            checkpoint.clear()
+        return
 
     if out:
         path = Path(out)
-        # TODO check if not pickle at end
+        # TODO check if not zip at end
     else:
         timestamp = datetime.now()
         f_timestamp = timestamp.strftime("%b%d_%H%M%S")
-        path = Path(f"results_{f_timestamp}.pickle")
+        path = Path(f"results_{f_timestamp}.zip")
 
-    store_results(series, results, path)
+    if max_memory or (binary and (streams or streamlen)):
+        # The sequence is only referenced by its path and hash
+        run_id = store_results(
+            None, results, path, source=data, timings=timings, label=label
+        )
+    else:
+        run_id = store_results(series, results, path, timings=timings, label=label)
+    if checkpoint:
+        checkpoint.clear()
 
-    if not out:
+    if ndjson:
+        return
+    elif run_id is not None:
+        console.print("")
+        console.print(f"Results added to {path} as run {run_id}")
+    elif not out:
         console.print("")
         console.print(f"Results saved to {path}")
 
@@ -116,10 +329,10 @@ def run(data, out, binary):
 def example_run(example, length, test):
     """Run randomness tests on automatically generated data."""
     generator_func = getattr(generators, example)
-    generator = generator_func()
+    chunk_bytes = min(max(ceil(length / 8), 1), generators.DEFAULT_CHUNK_BYTES)
+    chunks = generator_func(chunk_bytes=chunk_bytes)
 
-    series = pd.Series(next(generator) for _ in range(length))
-    series = series.infer_objects()
+    series = pd.Series(generators.take_bits(chunks, length))
     print_series(series)
     console.print()
 
@@ -134,12 +347,263 @@ def example_run(example, length, test):
             exit(1)
 
 
+@main.command()
+@argument("out", type=Path_())
+@option(
+    "-e",
+    "--example",
+    type=Choice(generators.__all__),
+    default="python",
+    help="Example binary output to use.",
+    metavar="<example>",
+)
+@option("-n", "--length", type=int, required=True, help="Length of binary output.")
+@option("-s", "--seed", type=int, help="Seed of the example generator.")
+@option(
+    "-o",
+    "--offset",
+    type=int,
+    default=0,
+    help="Position in the example output to start from.",
+)
+@option(
+    "-a",
+    "--ascii",
+    is_flag=True,
+    flag_value=True,
+    help="Write OUT as a newline-delimited text file.",
+)
+@option(
+    "--chunk-bytes",
+    type=int,
+    default=generators.DEFAULT_CHUNK_BYTES,
+    help="Size of chunks to generate and write at a time.",
+)
+def generate(out, example, length, seed, offset, ascii, chunk_bytes):
+    """Write automatically generated data to OUT.
+
+    OUT is written as a raw binary file, or as a newline-delimited text file if
+    --ascii is passed, either of which can be tested via the run command.
+
+    Data is generated and written in fixed-size chunks, so OUT can be far
+    larger than memory. Seeded examples are reproducible, and passing the
+    --offset of a previous file's end allows shards of one long output to be
+    generated in parallel.
+    """
+    # Checked before OUT is opened, so an invalid length never truncates it
+    if length < 0:
+        raise BadParameter("must not be negative", param_hint="'-n' / '--length'")
+    if not ascii and length % 8 != 0:
+        raise BadParameter(
+            f"cannot pack {length} bits into whole bytes, so must be a multiple "
+            "of 8 unless --ascii is passed",
+            param_hint="'-n' / '--length'",
+        )
+
+    generator_func = getattr(generators, example)
+    params = signature(generator_func).parameters
+
+    kwargs = {"chunk_bytes": chunk_bytes}
+    if seed is not None:
+        if "seed" not in params:
+            print_error(ValueError(f"The {example} example cannot be seeded"))
+            exit(1)
+        kwargs["seed"] = seed
+    if offset:
+        if "offset" not in params:
+            print_error(ValueError(f"The {example} example cannot be offset"))
+            exit(1)
+        if offset % 8 != 0:
+            print_error(ValueError("Offset must be a multiple of 8"))
+            exit(1)
+        kwargs["offset"] = offset // 8
+
+    try:
+        chunks = generator_func(**kwargs)
+        start = perf_counter()
+        with open(out, "wb") as f:
+            nbytes = write_bits(chunks, f, length, ascii=ascii)
+        elapsed = perf_counter() - start
+    except ValueError as e:
+        print_error(e)
+        exit(1)
+
+    throughput = nbytes / elapsed / 2 ** 20 if elapsed else float("inf")
+    console.print(
+        f"Wrote {length} bits to {out} in {elapsed:.2f}s ({throughput:.1f} MiB/s)"
+    )
+
+
+@main.command()
+@argument("data", type=File("rb"), default="-")
+@option(
+    "-w",
+    "--window",
+    type=int,
+    default=2 ** 20,
+    help="Length of the window to test.",
+)
+@option(
+    "-b",
+    "--blocksize",
+    type=int,
+    default=2 ** 14,
+    help="Length of blocks, which the window slides by.",
+)
+@option(
+    "-t",
+    "--test",
+    "tests",
+    type=Choice(monitor_randtests),
+    multiple=True,
+    help="Test to run, which can be passed multiple times.",
+    metavar="<test>",
+)
+@option(
+    "-a",
+    "--ascii",
+    is_flag=True,
+    flag_value=True,
+    help="Read DATA as newline-delimited 0 and 1 characters.",
+)
+@option(
+    "--siglevel",
+    type=float,
+    default=0.01,
+    help="Mark p-values below this significance level.",
+)
+@option(
+    "--chunk-bytes",
+    type=int,
+    default=generators.DEFAULT_CHUNK_BYTES,
+    help="Most bytes to read at a time.",
+)
+def monitor(data, window, blocksize, tests, ascii, siglevel, chunk_bytes):
+    """Run randomness tests over a window sliding along DATA.
+
+    DATA is a raw binary file, pipe or stdin (the default, or "-") which is
+    read until it ends, so the output of a random number generator can be
+    piped in and monitored as it is produced.
+
+    Each time a block of the data is read, the window slides forward and the
+    p-values of the last window are printed as a tab-delimited line, starting
+    with the position of the window's end. p-values below --siglevel are marked
+    with an asterisk.
+
+    Only the cheap tests whose statistics can be updated as the window slides
+    are available, and frequency_within_block uses the blocks of the window.
+    """
+    try:
+        window_monitor = WindowMonitor(window, blocksize, list(tests) or None)
+    except TestError as e:
+        print_error(e)
+        exit(1)
+
+    echo("\t".join(["end", *window_monitor.randtest_names]))
+
+    try:
+        for data_bytes in read_chunks(data, chunk_bytes):
+            if ascii:
+                steps = window_monitor.update(ascii_bits(data_bytes))
+            else:
+                steps = window_monitor.update_packed(data_bytes)
+
+            if len(steps) > 0:
+                echo(format_steps(steps, siglevel))
+    except NonBinarySequenceError as e:
+        print_error(e)
+        exit(1)
+
+
+@main.command()
+@argument("database", type=Path_(exists=True, dir_okay=False))
+@option("-t", "--test", type=test_choice, help="Only include results of this test.")
+@option("-l", "--label", help="Only include runs with this label.")
+@option("--hash", "input_hash", help="Only include runs on DATA with this hash.")
+@option("--since", help="Only include runs created since this ISO 8601 date.")
+@option("--until", help="Only include runs created before this ISO 8601 date.")
+@option("-f", "--failed", is_flag=True, help="Only include failed results.")
+@option(
+    "-g",
+    "--group-by",
+    type=Choice(group_by_columns),
+    help="Aggregate the results by test, label or hash.",
+)
+def query(database, test, label, input_hash, since, until, failed, group_by):
+    """Filter and aggregate the runs of a results DATABASE.
+
+    Matching results are printed as tab-delimited lines, starting with a
+    header. Only the indexed summary of each result is read, so querying many
+    runs stays fast.
+
+    Passing --group-by aggregates the results into a line for each test, label
+    or hash, with its number of results and failed results, and the mean and
+    smallest p-values.
+    """
+    if not is_database(database):
+        print_error(ValueError(f"{database} is not a results database"))
+        exit(1)
+
+    rows = query_results(
+        database,
+        test=test,
+        label=label,
+        input_hash=input_hash,
+        since=since,
+        until=until,
+        failed=failed,
+        group_by=group_by,
+    )
+
+    echo(rows.to_csv(sep="\t", index=False), nl=False)
+
+
+run_id_option = option(
+    "-r",
+    "--run",
+    "run_id",
+    type=int,
+    help="ID of the run to use if RESULTS is a database, defaulting to the last.",
+)
+
+
 @main.command()
 @argument("results", type=Path_(exists=True))
-def read(results):
-    """Print test results."""
-    report = load_results(results)
-    print_series(report.series)
+@option(
+    "-s",
+    "--summary",
+    is_flag=True,
+    help="Only print the summary of each test's p-value.",
+)
+@run_id_option
+def read(results, summary, run_id):
+    """Print test results.
+
+    Only the parts of RESULTS which are printed are loaded, so passing
+    --summary reads just the index of p-values at the start of RESULTS.
+    """
+    try:
+        report = load_results(results, run_id)
+    except RunNotFoundError as e:
+        print_error(e)
+        exit(1)
+
+    if summary:
+        summaries = report.summaries
+        print_summary_table(
+            {name: summary for name, summary in summaries.items() if summary},
+            [name for name, summary in summaries.items() if not summary],
+        )
+        return
+
+    if report.series is not None:
+        print_series(report.series)
+    else:
+        sequence = report.header["sequence"]
+        console.print(
+            f"Sequence of {sequence['n']} bits read from {sequence['path']} "
+            f"(BLAKE2 hash {sequence['blake2b']})"
+        )
     console.print("")
     print_results(report.results)
 
@@ -147,9 +611,14 @@ def read(results):
 @main.command()
 @argument("results", type=Path_(exists=True))
 @argument("out", type=Path_(), required=False, metavar="OUT")
-def report(results, out):
+@run_id_option
+def report(results, out, run_id):
     """Generate an informational web document from results."""
-    report = load_results(results)
+    try:
+        report = load_results(results, run_id)
+    except RunNotFoundError as e:
+        print_error(e)
+        exit(1)
 
     if out:
         path = Path(out)
@@ -0,0 +1,303 @@
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+import pandas as pd
+
+__all__ = [
+    "ResultsDatabase",
+    "is_database",
+    "query_results",
+    "group_by_columns",
+    "RunNotFoundError",
+]
+
+
+database_suffixes = [".db", ".sqlite", ".sqlite3"]
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    label TEXT,
+    n INTEGER,
+    input_hash TEXT,
+    path TEXT,
+    coinflip TEXT,
+    header TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test TEXT NOT NULL,
+    type TEXT,
+    statistic REAL,
+    p REAL,
+    passed INTEGER,
+    failures TEXT,
+    nfailures INTEGER,
+    elapsed REAL,
+    PRIMARY KEY (run_id, test)
+);
+CREATE TABLE IF NOT EXISTS payloads (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    section TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, section)
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE INDEX IF NOT EXISTS runs_label ON runs (label, created);
+CREATE INDEX IF NOT EXISTS runs_input_hash ON runs (input_hash);
+CREATE INDEX IF NOT EXISTS results_test ON results (test, passed, p);
+"""
+
+# Columns the rows of a query can be aggregated by
+group_by_columns = ["test", "label", "input_hash"]
+
+
+class RunNotFoundError(LookupError):
+    """Error for when a run is not in a results database"""
+
+    def __init__(self, run_id: Optional[int]):
+        self.run_id = run_id
+
+    def __str__(self):
+        if self.run_id is None:
+            return "Results database contains no runs"
+        else:
+            return f"Results database contains no run {self.run_id}"
+
+
+def is_database(path) -> bool:
+    """Checks if results at ``path`` are, or are to be, kept in a SQLite database"""
+    path = Path(path)
+    if path.suffix.lower() in database_suffixes:
+        return True
+
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+class ResultsDatabase:
+    """SQLite database of the results of many runs
+
+    Each run is a row of ``runs``, holding its sequence's length and hash and
+    its whole header. Every test of a run is summarised by a row of
+    ``results``, which are indexed so runs can be filtered and aggregated by
+    test, p-value and verdict. Tests with many sub-tests are summarised by
+    their smallest p-value, and fail if any sub-test failed. The pickled
+    results and packed sequence of a run are kept apart in ``payloads``, which
+    is only read when a run is loaded.
+
+    Parameters
+    ----------
+    path : path-like
+        Path of the database, which is created if it does not exist
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with closing(self.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a new connection to the database"""
+        return sqlite3.connect(str(self.path))
+
+    def insert_run(self, header: Dict[str, Any], sections: Dict[str, bytes]) -> int:
+        """Adds a run, as indexed by ``header`` and with the data of ``sections``
+
+        Parameters
+        ----------
+        header : ``Dict[str, Any]``
+            Index of the sequence and results, as written to results files
+        sections : ``Dict[str, bytes]``
+            Map of section names to the data they hold
+
+        Returns
+        -------
+        run_id : ``int``
+            ID of the added run
+        """
+        sequence = header["sequence"]
+        rows = []
+        for name, index in header["results"].items():
+            # Older headers only hold the summary, which multi-test results lack
+            verdict = index.get("verdict", index["summary"])
+            if is_real(index["p"]):
+                p = index["p"]
+            elif verdict and is_real(verdict[0]):
+                p = verdict[0]
+            else:
+                p = None
+            rows.append(
+                (
+                    name,
+                    index["type"],
+                    index["statistic"] if is_real(index["statistic"]) else None,
+                    p,
+                    verdict[1] if verdict else None,
+                    json.dumps(index["failures"]),
+                    len(index["failures"]),
+                    index["elapsed"],
+                )
+            )
+
+        # The connection's context manager commits the run all at once
+        with closing(self.connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (created, label, n, input_hash, path, coinflip, "
+                "header) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    header["created"],
+                    header["label"],
+                    sequence["n"],
+                    sequence["blake2b"],
+                    sequence["path"],
+                    header["coinflip"],
+                    json.dumps(header),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows],
+            )
+            conn.executemany(
+                "INSERT INTO payloads VALUES (?, ?, ?)",
+                [(run_id, section, data) for section, data in sections.items()],
+            )
+
+        return run_id
+
+    def latest_run_id(self) -> int:
+        """Finds the ID of the last added run"""
+        with closing(self.connect()) as conn:
+            (run_id,) = conn.execute("SELECT MAX(id) FROM runs").fetchone()
+
+        if run_id is None:
+            raise RunNotFoundError(None)
+
+        return run_id
+
+    def header(self, run_id: int) -> Dict[str, Any]:
+        """Loads the header of a run"""
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT header FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+
+        if row is None:
+            raise RunNotFoundError(run_id)
+
+        return json.loads(row[0])
+
+    def read_section(self, run_id: int, section: str) -> bytes:
+        """Loads the data of a run's section"""
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT data FROM payloads WHERE run_id = ? AND section = ?",
+                (run_id, section),
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(section)
+
+        return row[0]
+
+
+def is_real(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def query_results(
+    path,
+    test: Optional[str] = None,
+    label: Optional[str] = None,
+    input_hash: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    failed: bool = False,
+    group_by: Optional[str] = None,
+) -> pd.DataFrame:
+    """Filters and aggregates the summaries of results in a database
+
+    Only the indexed summary rows are read, never the results themselves.
+
+    Parameters
+    ----------
+    path : path-like
+        Path of the results database
+    test : ``str``, optional
+        Only include results of this test
+    label : ``str``, optional
+        Only include runs with this label
+    input_hash : ``str``, optional
+        Only include runs on the sequence with this BLAKE2 hash
+    since : ``str``, optional
+        Only include runs created at or after this ISO 8601 date or time
+    until : ``str``, optional
+        Only include runs created before this ISO 8601 date or time
+    failed : ``bool``, default ``False``
+        Only include results which failed at the significance level
+    group_by : ``str``, optional
+        Aggregate the results by one of ``group_by_columns``
+
+    Returns
+    -------
+    rows : ``DataFrame``
+        A row of each result and its run, or if ``group_by`` is passed a row of
+        each group with its number of results, failed results and mean and
+        smallest p-values
+    """
+    conditions = []
+    params = []
+    for column, value in [
+        ("results.test", test),
+        ("runs.label", label),
+        ("runs.input_hash", input_hash),
+    ]:
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        conditions.append("runs.created >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("runs.created < ?")
+        params.append(until)
+    if failed:
+        conditions.append("results.passed = 0")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if group_by is None:
+        sql = (
+            "SELECT runs.id AS run, runs.created, runs.label, runs.n, "
+            "runs.input_hash, results.test, results.statistic, results.p, "
+            "results.passed, results.nfailures, results.elapsed "
+            "FROM results JOIN runs ON runs.id = results.run_id "
+            f"{where} ORDER BY runs.created, runs.id, results.rowid"
+        )
+    else:
+        if group_by not in group_by_columns:
+            raise ValueError(
+                f"Cannot group by {group_by}, only by {', '.join(group_by_columns)}"
+            )
+        sql = (
+            f"SELECT {group_by}, COUNT(*) AS nresults, "
+            "SUM(results.passed = 0) AS nfailed, AVG(results.p) AS mean_p, "
+            "MIN(results.p) AS min_p, AVG(results.elapsed) AS mean_elapsed "
+            "FROM results JOIN runs ON runs.id = results.run_id "
+            f"{where} GROUP BY {group_by} ORDER BY {group_by}"
+        )
+
+    with closing(ResultsDatabase(path).connect()) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
@@ -0,0 +1,62 @@
+from typing import BinaryIO
+from typing import Iterable
+
+import numpy as np
+
+__all__ = ["write_bits"]
+
+
+def write_bits(
+    chunks: Iterable[np.ndarray], f: BinaryIO, nbits: int, ascii: bool = False
+) -> int:
+    """Writes the first bits of a generator of packed chunks to a file
+
+    Only one chunk is held in memory at a time, so files far larger than
+    memory can be written.
+
+    Parameters
+    ----------
+    chunks : ``Iterable[ndarray]``
+        Packed ``uint8`` chunks, i.e. a generator called with ``chunk_bytes``
+    f : ``BinaryIO``
+        File opened for writing bytes
+    nbits : ``int``
+        Number of bits to write
+    ascii : ``bool``, default ``False``
+        Write bits as newline-delimited ``0`` and ``1`` characters instead of
+        packed bytes
+
+    Returns
+    -------
+    nbytes : ``int``
+        Number of bytes written
+
+    Raises
+    ------
+    ValueError
+        If writing packed bytes and ``nbits`` is not a multiple of 8
+    """
+    if not ascii and nbits % 8 != 0:
+        raise ValueError(f"Cannot pack {nbits} bits into whole bytes")
+
+    nbytes = 0
+    remaining = nbits
+    for chunk in chunks:
+        if remaining <= 0:
+            break
+
+        if ascii:
+            bits = np.unpackbits(chunk, count=min(remaining, 8 * len(chunk)))
+            text = np.empty(2 * len(bits), dtype=np.uint8)
+            text[0::2] = bits + ord("0")
+            text[1::2] = ord("\n")
+            data = text.tobytes()
+            remaining -= len(bits)
+        else:
+            data = chunk[: remaining // 8].tobytes()
+            remaining -= 8 * len(data)
+
+        f.write(data)
+        nbytes += len(data)
+
+    return nbytes
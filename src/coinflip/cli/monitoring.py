@@ -0,0 +1,57 @@
+from typing import BinaryIO
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+
+__all__ = ["read_chunks", "ascii_bits", "format_steps"]
+
+
+def read_chunks(f: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    """Reads a file, pipe or stdin in chunks until it ends
+
+    Chunks are returned as soon as any bytes are available (up to
+    ``chunk_bytes``), so a slow stream is not waited on to fill a chunk.
+    """
+    read = getattr(f, "read1", f.read)
+    while True:
+        data = read(chunk_bytes)
+        if not data:
+            break
+
+        yield data
+
+
+whitespace = np.frombuffer(b" \t\r\n", dtype=np.uint8)
+
+
+def ascii_bits(data: bytes) -> np.ndarray:
+    """Parses ``0`` and ``1`` characters as bits, ignoring whitespace
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If ``data`` contains characters other than ``0``, ``1`` and whitespace
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    chars = chars[~np.isin(chars, whitespace)]
+    bits = chars - ord("0")
+    if np.any(bits > 1):
+        raise NonBinarySequenceError()
+
+    return bits
+
+
+def format_steps(steps: pd.DataFrame, siglevel: float) -> str:
+    """Formats the p-values of window steps as tab-delimited lines
+
+    p-values below ``siglevel`` are marked with an asterisk.
+    """
+    lines = []
+    for end, pvalues in zip(steps.index.tolist(), steps.to_numpy().tolist()):
+        f_pvalues = (f"{p:.6f}*" if p < siglevel else f"{p:.6f}" for p in pvalues)
+        lines.append("\t".join([str(end), *f_pvalues]))
+
+    return "\n".join(lines)
@@ -1,10 +1,11 @@
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
 from coinflip._randtests.common.exceptions import NonBinarySequenceError
 
-__all__ = ["DataParsingError", "parse_text", "parse_binary"]
+__all__ = ["DataParsingError", "parse_text", "parse_binary", "parse_size"]
 
 
 class DataParsingError(ValueError):
@@ -23,6 +24,53 @@ class MultipleColumnsError(DataParsingError):
         )
 
 
+@dataclass
+class SizeParsingError(DataParsingError):
+    """Error for when a size in bytes could not be parsed"""
+
+    size: str
+
+    def __str__(self):
+        return f"Could not parse {self.size} as a size, e.g. 512M or 4G"
+
+
+size_units = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30, "T": 2 ** 40}
+
+
+def parse_size(size: str) -> int:
+    """Parses a size in bytes, which can have a K, M, G or T binary suffix
+
+    Parameters
+    ----------
+    size : ``str``
+        Size such as ``"4096"``, ``"512M"`` or ``"4G"``
+
+    Returns
+    -------
+    ``int``
+        Number of bytes
+
+    Raises
+    ------
+    SizeParsingError
+        If ``size`` is not a positive number with a known suffix
+    """
+    string = size.strip().upper()
+    if string.endswith("B"):
+        string = string[:-1]
+
+    unit = string[-1:] if string[-1:] in size_units else ""
+    try:
+        nbytes = int(float(string[: len(string) - len(unit)]) * size_units[unit])
+    except (ValueError, OverflowError) as e:
+        raise SizeParsingError(size) from e
+
+    if nbytes < 1:
+        raise SizeParsingError(size)
+
+    return nbytes
+
+
 def parse_text(data_file) -> pd.Series:
     """Reads file containing data into a pandas Series
 
@@ -65,16 +113,10 @@ def parse_text(data_file) -> pd.Series:
     return series
 
 
-def parse_binary(data_file) -> pd.Series:
-    sequence = []
-    with open(data_file, "rb") as f:
-        bytes_ = f.read()
-        for byte in bytes_:
-            bitstring = format(byte, "08b")
-            bits = [int(bit) for bit in bitstring]
-
-            sequence += bits
+def parse_binary(data_file, nbytes: int = -1) -> pd.Series:
+    bytes_ = np.fromfile(data_file, dtype=np.uint8, count=nbytes)
+    bits = np.unpackbits(bytes_)
 
-    series = pd.Series(sequence)
+    series = pd.Series(bits)
 
     return series
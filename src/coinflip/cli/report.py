@@ -1,17 +1,53 @@
+import json
 import pickle
+import zipfile
+from collections.abc import Mapping
 from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from hashlib import blake2b
 from pathlib import Path
+from typing import Any
 from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
 
+import numpy as np
 import pandas as pd
 from jinja2 import Environment
 from jinja2 import PackageLoader
 from jinja2.exceptions import TemplateNotFound
 
+from coinflip import __version__
+from coinflip._randtests.common.core import infer_faces
 from coinflip._randtests.common.result import BaseTestResult
+from coinflip.cli.arrays import dump_result
+from coinflip.cli.arrays import load_result
+from coinflip.cli.database import ResultsDatabase
+from coinflip.cli.database import is_database
 from coinflip.cli.pprint import print_warning
+from coinflip.cli.runner import judge_result
+from coinflip.cli.runner import jsonable
+from coinflip.cli.runner import summarise_result
 
-__all__ = ["store_results", "load_results", "write_report_doc"]
+__all__ = [
+    "store_results",
+    "load_results",
+    "write_report_doc",
+    "ResultsFile",
+    "DatabaseRun",
+    "file_digest",
+]
+
+
+FORMAT = "coinflip-results"
+FORMAT_VERSION = 2
+
+HEADER = "header.json"
+SEQUENCE = "sequence.bin"
+SEQUENCE_PICKLE = "sequence.pickle"
 
 
 @dataclass
@@ -19,15 +55,292 @@ class Report:
     series: pd.Series
     results: Dict[str, BaseTestResult]
 
+    @property
+    def summaries(self) -> Dict[str, Optional[Tuple[float, bool]]]:
+        return {name: summarise_result(result) for name, result in self.results.items()}
+
+
+def store_results(
+    series: Optional[pd.Series],
+    results: Dict[str, BaseTestResult],
+    out: str,
+    source: Optional[Path] = None,
+    timings: Optional[Dict[str, float]] = None,
+    label: Optional[str] = None,
+) -> Optional[int]:
+    """Writes a sequence and its results to a results file or database
+
+    The results file is a zip archive. Its ``header.json`` indexes the
+    statistic, p-value and failures of every test, so summaries can be read
+    without loading any results. The packed sequence and each pickled result
+    are kept in their own sections, which are only read when needed. The
+    arrays a result holds are kept apart from its pickle in a compressed
+    ``.npz`` section, which is only read when the result is loaded.
+
+    If ``out`` is a SQLite database (i.e. ends with ``.db``, ``.sqlite`` or
+    ``.sqlite3``), the header and sections are instead added to it as a new
+    run.
+
+    Parameters
+    ----------
+    series : ``Series``
+        Sequence the results were found on
+    results : ``Dict[str, BaseTestResult]``
+        Map of test names to their results
+    out : path-like
+        Path to write the results file to, or of the database to add to
+    source : path-like, optional
+        Raw binary file the sequence was read from. If passed, only the path
+        and hash of the file are stored instead of ``series``, which can be
+        ``None``.
+    timings : ``Dict[str, float]``, optional
+        Map of test names to the seconds they took to run
+    label : ``str``, optional
+        Label of the run, e.g. the name of the device tested
+
+    Returns
+    -------
+    run_id : ``int``
+        ID of the added run if ``out`` is a database, otherwise ``None``
+    """
+    timings = timings or {}
+    header = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "coinflip": __version__,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "label": label,
+        "sequence": {
+            "n": len(series) if series is not None else None,
+            "faces": None,
+            "blake2b": None,
+            "path": None,
+            "encoding": None,
+        },
+        "results": {
+            name: index_result(result, timings.get(name))
+            for name, result in results.items()
+        },
+    }
+    sequence = header["sequence"]
+    sections = {}
+
+    if source is not None:
+        source = Path(source)
+        sequence["n"] = 8 * source.stat().st_size
+        sequence["faces"] = [1, 0]
+        sequence["blake2b"] = file_digest(source)
+        sequence["path"] = str(source.absolute())
+
+    elif series.nunique() == 2:
+        heads, tails = infer_faces(tuple(series.unique()))
+        packed = np.packbits((series == heads).to_numpy())
+
+        sequence["faces"] = [jsonable(heads), jsonable(tails)]
+        sequence["blake2b"] = blake2b(packed, digest_size=20).hexdigest()
+        sequence["encoding"] = "packed"
+        sections[SEQUENCE] = packed.tobytes()
+
+    else:
+        sequence["encoding"] = "pickle"
+        sections[SEQUENCE_PICKLE] = pickle.dumps(series)
+
+    for name, result in results.items():
+        pickled, arrays = dump_result(result)
+        sections[result_section(name)] = pickled
+        if arrays is not None:
+            sections[arrays_section(name)] = arrays
+
+    if is_database(out):
+        return ResultsDatabase(out).insert_run(header, sections)
+
+    with zipfile.ZipFile(out, "w") as zf:
+        for section, data in sections.items():
+            if section == SEQUENCE:
+                # Packed bits are incompressible for random sequences
+                zf.writestr(section, data, zipfile.ZIP_STORED)
+            elif section.endswith(".npz"):
+                # Arrays are already compressed by the .npz archive
+                zf.writestr(section, data, zipfile.ZIP_STORED)
+            else:
+                zf.writestr(section, data, zipfile.ZIP_DEFLATED)
+
+        zf.writestr(HEADER, json.dumps(header, indent=2), zipfile.ZIP_DEFLATED)
+
+    return None
+
+
+def index_result(
+    result: BaseTestResult, elapsed: Optional[float] = None
+) -> Dict[str, Any]:
+    """Summarises a result for the header of a results file"""
+    summary = summarise_result(result)
+    verdict = judge_result(result)
+
+    return {
+        "type": type(result).__name__,
+        "statistic": jsonable(getattr(result, "statistic", None)),
+        "p": jsonable(getattr(result, "p", None)),
+        "failures": list(result.failures),
+        "summary": [jsonable(x) for x in summary] if summary else None,
+        "verdict": [jsonable(x) for x in verdict] if verdict else None,
+        "elapsed": elapsed,
+    }
+
+
+def result_section(name: str) -> str:
+    return f"results/{name}.pickle"
+
+
+def arrays_section(name: str) -> str:
+    return f"results/{name}.npz"
+
+
+def file_digest(path: Path, chunk_bytes: int = 2 ** 20) -> str:
+    """Finds the BLAKE2 hash of a file, reading it a chunk at a time"""
+    hasher = blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
 
-def store_results(series: pd.Series, results: Dict[str, BaseTestResult], out: str):
-    report = Report(series, results)
 
-    pickle.dump(report, open(out, "wb"))
+class ResultsFile:
+    """Lazily loaded results file, as written by ``store_results()``
 
+    Only the header is read when opened. The sequence and each result are read
+    from their sections when first accessed.
 
-def load_results(results_path: Path) -> Report:
-    report = pickle.load(open(results_path, "rb"))
+    Parameters
+    ----------
+    path : path-like
+        Path of the results file
+
+    Attributes
+    ----------
+    header : ``Dict[str, Any]``
+        Index of the sequence and the results
+    results : ``Mapping[str, BaseTestResult]``
+        Map of test names to their results, which are loaded on access
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.header = json.loads(self._read(HEADER))
+        self.results = LazyResults(self)
+        self._series = None
+
+    def _read(self, section: str) -> bytes:
+        with zipfile.ZipFile(self.path) as zf:
+            return zf.read(section)
+
+    @property
+    def series(self) -> Optional[pd.Series]:
+        """Sequence the results were found on, or ``None`` if it was not stored"""
+        sequence = self.header["sequence"]
+        if self._series is None:
+            if sequence["encoding"] == "packed":
+                packed = np.frombuffer(self._read(SEQUENCE), dtype=np.uint8)
+                bits = np.unpackbits(packed)[: sequence["n"]]
+                heads, tails = sequence["faces"]
+                self._series = pd.Series(np.where(bits == 1, heads, tails))
+            elif sequence["encoding"] == "pickle":
+                self._series = pickle.loads(self._read(SEQUENCE_PICKLE))
+
+        return self._series
+
+    @property
+    def summaries(self) -> Dict[str, Optional[Tuple[float, bool]]]:
+        """Map of test names to their p-values and verdicts, from the header"""
+        return {
+            name: tuple(index["summary"]) if index["summary"] else None
+            for name, index in self.header["results"].items()
+        }
+
+    def names(self) -> List[str]:
+        return list(self.header["results"].keys())
+
+
+class DatabaseRun(ResultsFile):
+    """Lazily loaded run of a results database, as added by ``store_results()``
+
+    Only the run's header is read when opened, like a ``ResultsFile``.
+
+    Parameters
+    ----------
+    path : path-like
+        Path of the results database
+    run_id : ``int``, optional
+        ID of the run, defaulting to the latest run
+
+    Raises
+    ------
+    RunNotFoundError
+        If the database does not contain the run
+    """
+
+    def __init__(self, path: Path, run_id: Optional[int] = None):
+        self.path = Path(path)
+        self.database = ResultsDatabase(path)
+        self.run_id = run_id if run_id is not None else self.database.latest_run_id()
+        self.header = self.database.header(self.run_id)
+        self.results = LazyResults(self)
+        self._series = None
+
+    def _read(self, section: str) -> bytes:
+        return self.database.read_section(self.run_id, section)
+
+
+class LazyResults(Mapping):
+    """Results of a results file, each loaded on first access"""
+
+    def __init__(self, results_file: ResultsFile):
+        self._results_file = results_file
+        self._loaded = {}
+
+    def __getitem__(self, name: str) -> BaseTestResult:
+        if name not in self._results_file.header["results"]:
+            raise KeyError(name)
+        if name not in self._loaded:
+            pickled = self._results_file._read(result_section(name))
+            self._loaded[name] = load_result(
+                pickled, lambda: self._results_file._read(arrays_section(name))
+            )
+
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._results_file.names())
+
+    def __len__(self) -> int:
+        return len(self._results_file.header["results"])
+
+
+def load_results(results_path: Path, run_id: Optional[int] = None):
+    """Opens a results file or database, or a report pickled by older versions
+
+    Parameters
+    ----------
+    results_path : path-like
+        Path of the results
+    run_id : ``int``, optional
+        ID of the run to open if ``results_path`` is a database, defaulting to
+        the latest run
+
+    Returns
+    -------
+    report : ``ResultsFile``, ``DatabaseRun`` or ``Report``
+        Sequence and results, where those of a results file or database are
+        lazily loaded
+    """
+    if is_database(results_path):
+        return DatabaseRun(results_path, run_id)
+    elif zipfile.is_zipfile(results_path):
+        return ResultsFile(results_path)
+
+    with open(results_path, "rb") as f:
+        report = pickle.load(f)
 
     return report
 
@@ -36,18 +349,20 @@ templates_loader = PackageLoader("coinflip")
 templates_env = Environment(loader=templates_loader)
 
 
-def write_report_doc(report: Report, out: Path):
+def write_report_doc(report, out: Path):
     doc = templates_env.get_template("index.html")
 
     result_markups = []
-    for randtest, result in report.results.items():
+    for randtest in report.results.keys():
         template_file = f"randtests/{randtest}.html"
         try:
             template = templates_env.get_template(template_file)
-            markup = template.render(result=result)
-            result_markups.append(markup)
         except TemplateNotFound:
             print_warning(f"{template_file} not found")
+            continue
+
+        markup = template.render(result=report.results[randtest])
+        result_markups.append(markup)
 
     with open(out, "w") as f:
         report_html = doc.render(result_markups=result_markups)
@@ -1,11 +1,21 @@
 """Methods used to interact with the _randtests subpackage."""
+import json
+import os
 from functools import wraps
+from itertools import islice
+from math import isfinite
 from shutil import get_terminal_size
+from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Iterator
+from typing import List
+from typing import Optional
 from typing import Tuple
+from warnings import catch_warnings
+from warnings import simplefilter
 
+import numpy as np
 import pandas as pd
 from rich import box
 from rich.progress import BarColumn
@@ -17,11 +27,26 @@ from rich.table import Table
 from rich.text import Text
 
 from coinflip import _randtests
+from coinflip._randtests.chunked import SPECTRAL_MEMORY_PER_BIT
+from coinflip._randtests.chunked import chunk_bytes_within
+from coinflip._randtests.chunked import run_chunked
+from coinflip._randtests.chunked import spectral_truncation_msg
+from coinflip._randtests.common.checkpoint import Checkpoint
+from coinflip._randtests.common.core import CliContext
+from coinflip._randtests.common.core import advance_task
+from coinflip._randtests.common.core import check_recommendations
 from coinflip._randtests.common.exceptions import NonBinarySequenceError
 from coinflip._randtests.common.exceptions import TestError
 from coinflip._randtests.common.result import BaseTestResult
 from coinflip._randtests.common.result import MultiTestResult
 from coinflip._randtests.common.result import TestResult
+from coinflip._randtests.common.typing import Face
+from coinflip._randtests.streams import StreamsAssessment
+from coinflip._randtests.streams import StreamsTestResult
+from coinflip._randtests.streams import map_streams
+from coinflip._randtests.streams import split_packed_streams
+from coinflip._randtests.streams import split_streams
+from coinflip._randtests.streams import stream_dimensions
 from coinflip.cli import console
 from coinflip.cli.pprint import print_error
 from coinflip.cli.pprint import print_warning
@@ -31,7 +56,18 @@ __all__ = [
     "TestNotFoundError",
     "run_test",
     "run_all_tests",
+    "run_all_tests_streams",
+    "run_all_tests_chunked",
+    "run_all_tests_ndjson",
+    "iter_all_tests",
+    "iter_all_tests_streams",
+    "iter_all_tests_chunked",
+    "result_records",
+    "format_record",
     "print_results",
+    "print_summary_table",
+    "summarise_result",
+    "judge_result",
 ]
 
 
@@ -76,11 +112,14 @@ f_randtest_abbreviations = {
 
 
 def binary_check(func):
-    """Decorator to check if series comprises of binary values"""
+    """Decorator to check if series comprises of binary values
+
+    A ``None`` series, of a test reading its input from a file, is not checked.
+    """
 
     @wraps(func)
     def wrapper(series, *args, **kwargs):
-        if series.nunique() != 2:
+        if series is not None and series.nunique() != 2:
             raise NonBinarySequenceError()
 
         return func(series, *args, **kwargs)
@@ -180,9 +219,19 @@ def run_test(series: pd.Series, randtest_name, **kwargs) -> TestResult:
 
 
 @binary_check
-def run_all_tests(series: pd.Series) -> Iterator[Tuple[str, TestResult, Exception]]:
+def run_all_tests(
+    series: pd.Series, checkpoint: Optional[Checkpoint] = None
+) -> Iterator[Tuple[str, TestResult, Exception]]:
     """Run all available statistical test on RNG output
 
+    Parameters
+    ----------
+    series : ``Series``
+        Output of the RNG being tested
+    checkpoint : ``Checkpoint``, optional
+        Checkpoint the outcome of each test is put in once completed, where
+        tests which already have an outcome are not ran again
+
     Yields
     ------
     randtest_name : ``str``
@@ -210,8 +259,17 @@ def run_all_tests(series: pd.Series) -> Iterator[Tuple[str, TestResult, Exceptio
         for name, func, task in zip(names, funcs, tasks):
             progress.start_task(task)
 
+            outcome = checkpoint.get(name) if checkpoint else None
             try:
-                result = func(series, ctx=(progress, task))
+                if outcome:
+                    result, e = outcome
+                    progress.update(task, total=1, completed=1)
+                    if e:
+                        raise e
+                else:
+                    result = func(series, ctx=(progress, task))
+                    if checkpoint:
+                        checkpoint.put(name, result)
 
                 color = "yellow" if result.failures else "green"
 
@@ -224,6 +282,8 @@ def run_all_tests(series: pd.Series) -> Iterator[Tuple[str, TestResult, Exceptio
 
             except TestError as e:
                 progress.update(task, completed=True)
+                if checkpoint and not outcome:
+                    checkpoint.put(name, None, e)
 
                 print_randtest_name(name, "red")
                 print_error(e)
@@ -237,6 +297,443 @@ def run_all_tests(series: pd.Series) -> Iterator[Tuple[str, TestResult, Exceptio
     print_results_summary(results)
 
 
+@binary_check
+def run_all_tests_streams(
+    series: Optional[pd.Series],
+    nstreams: Optional[int] = None,
+    streamlen: Optional[int] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    path=None,
+) -> Iterator[Tuple[str, BaseTestResult]]:
+    """Run all available statistical tests across bitstreams of RNG output
+
+    Tests which already have an outcome in the passed checkpoint are not ran
+    again, and the outcome of every other test is put in it once completed.
+
+    If ``path`` is passed, the streams are instead read from the raw binary
+    file a stream at a time, and ``series`` can be ``None``.
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``StreamsTestResult``
+        Data container of the test's p-values across the streams, or ``None``
+        if the test could not be ran on any stream
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If series contains a sequence made of non-binary values
+    TestInputError
+        If the series cannot be split into the passed streams
+    """
+    heads, tails, nstreams, streams = split_input(series, nstreams, streamlen, path)
+
+    with Progress(*columns, console=console, transient=True) as progress:
+        task = progress.add_task("Streams", total=nstreams)
+
+        results = {}
+        randtest_results = multistream_outcomes(
+            streams, heads, tails, checkpoint, ctx=(progress, task)
+        )
+        for name, result, e in randtest_results:
+            if result:
+                color = "green" if result.passed else "yellow"
+
+                print_randtest_name(name, color)
+                console.print(result)
+            else:
+                print_randtest_name(name, "red")
+                print_error(e)
+
+            yield name, result
+
+            results[name] = result
+
+            console.print("")
+
+    print_results_summary(results)
+
+
+def run_all_tests_chunked(
+    path, max_memory: int, checkpoint: Optional[Checkpoint] = None
+) -> Iterator[Tuple[str, TestResult, Exception]]:
+    """Run all available statistical tests on a binary file, a chunk at a time
+
+    The file is memory-mapped and read in chunks small enough to test within
+    ``max_memory`` bytes, so files larger than memory can be tested. The
+    spectral test needs the whole sequence at once, so it is only ran on as
+    much of the file as fits within ``max_memory``.
+
+    Parameters
+    ----------
+    path : path-like
+        Raw binary file of RNG output
+    max_memory : ``int``
+        Rough limit in bytes on the memory used to test the file
+    checkpoint : ``Checkpoint``, optional
+        Checkpoint to resume from and write progress to, as in ``run_chunked()``
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``TestResult`` or ``MultiTestResult``
+        Data containers of the test's result(s)
+    exception : ``TestError``
+        The exception raised when running ``randtest_name``, otherwise ``None``.
+    """
+    packed = map_binary(path)
+    n = 8 * len(packed)
+
+    chunk_bytes = chunk_bytes_within(max_memory)
+    max_spectral_n = max_memory // SPECTRAL_MEMORY_PER_BIT
+
+    with Progress(*columns, console=console, transient=True) as progress:
+        task = progress.add_task("Chunks")
+
+        results = {}
+        randtest_results = run_chunked(
+            packed, chunk_bytes, max_spectral_n, (progress, task), checkpoint
+        )
+        for name, result, e in randtest_results:
+            if result:
+                color = "yellow" if result.failures else "green"
+
+                print_randtest_name(name, color)
+                if name == "spectral" and max_spectral_n < n:
+                    print_warning(spectral_truncation_msg(n, max_spectral_n))
+                console.print(result)
+            else:
+                print_randtest_name(name, "red")
+                print_error(e)
+
+            yield name, result, e
+
+            results[name] = result
+
+            console.print("")
+
+    print_results_summary(results)
+
+
+def map_binary(path) -> np.ndarray:
+    """Memory-maps a raw binary file as an array of bytes"""
+    if os.path.getsize(path) > 0:
+        return np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        # Empty files cannot be memory-mapped
+        return np.zeros(0, dtype=np.uint8)
+
+
+@binary_check
+def iter_all_tests(
+    series: pd.Series, checkpoint: Optional[Checkpoint] = None
+) -> Iterator[Tuple[str, Optional[TestResult], Optional[TestError]]]:
+    """Run all available statistical tests on RNG output, without printing
+
+    Tests which already have an outcome in the passed checkpoint are not ran
+    again, and the outcome of every other test is put in it once completed.
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``TestResult`` or ``MultiTestResult``
+        Data containers of the test's result(s), or ``None`` if the test
+        could not be ran
+    exception : ``TestError``
+        The exception raised when running ``randtest_name``, otherwise ``None``
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If series contains a sequence made of non-binary values
+    """
+    for name, func in list_tests():
+        outcome = checkpoint.get(name) if checkpoint else None
+        if outcome:
+            yield (name, *outcome)
+            continue
+
+        try:
+            with catch_warnings():
+                # Failures are kept in the results instead
+                simplefilter("ignore")
+                result = func(series)
+        except TestError as e:
+            if checkpoint:
+                checkpoint.put(name, None, e)
+
+            yield name, None, e
+        else:
+            if checkpoint:
+                checkpoint.put(name, result)
+
+            yield name, result, None
+
+
+@binary_check
+def iter_all_tests_streams(
+    series: Optional[pd.Series],
+    nstreams: Optional[int] = None,
+    streamlen: Optional[int] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    path=None,
+) -> Iterator[Tuple[str, Optional[BaseTestResult], Optional[TestError]]]:
+    """Run all available statistical tests across bitstreams, without printing
+
+    See ``run_all_tests_streams()`` for how a checkpoint and ``path`` are used.
+
+    Yields
+    ------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``StreamsTestResult``
+        Data container of the test's p-values across the streams, or ``None``
+        if the test could not be ran on any stream
+    exception : ``TestError``
+        Error for when the test could not be ran on any stream, otherwise
+        ``None``
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If series contains a sequence made of non-binary values
+    TestInputError
+        If the series cannot be split into the passed streams
+    """
+    heads, tails, _, streams = split_input(series, nstreams, streamlen, path)
+
+    yield from quietly(multistream_outcomes(streams, heads, tails, checkpoint))
+
+
+def split_input(
+    series: Optional[pd.Series],
+    nstreams: Optional[int],
+    streamlen: Optional[int],
+    path=None,
+) -> Tuple[Face, Face, int, Iterator[np.ndarray]]:
+    """Splits RNG output into bitstreams, reading them from ``path`` if passed"""
+    if path is None:
+        heads, tails, streams = split_streams(series, nstreams, streamlen)
+        n = len(series)
+    else:
+        packed = map_binary(path)
+        heads, tails = 1, 0
+        streams = split_packed_streams(packed, nstreams, streamlen)
+        n = 8 * len(packed)
+    nstreams, _ = stream_dimensions(n, nstreams, streamlen)
+
+    return heads, tails, nstreams, streams
+
+
+def multistream_outcomes(
+    streams: Iterator[np.ndarray],
+    heads: Face,
+    tails: Face,
+    checkpoint: Optional[Checkpoint] = None,
+    ctx: Optional[CliContext] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[BaseTestResult], Optional[TestError]]]:
+    """Runs every test across streams which has no outcome in ``checkpoint``
+
+    The outcomes of each batch of streams are put in the checkpoint as soon as
+    the batch completes, so a resumed run skips the streams already tested.
+    """
+    completed = {}
+    if checkpoint:
+        for name in _randtests.__all__:
+            outcome = checkpoint.get(name)
+            if outcome:
+                completed[name] = outcome
+
+    remaining = [name for name in _randtests.__all__ if name not in completed]
+    assessment = StreamsAssessment(remaining)
+    if remaining:
+        nbatches = 0
+        if checkpoint:
+            while True:
+                batch = checkpoint.get_state(f"streams{nbatches}")
+                if batch is None:
+                    break
+                for outcomes in batch:
+                    assessment.add(outcomes)
+                    advance_task(ctx)
+                nbatches += 1
+
+        streams = islice(streams, assessment.nstreams, None)
+        for batch in map_streams(streams, remaining, workers):
+            if checkpoint:
+                checkpoint.put_state(f"streams{nbatches}", batch)
+            nbatches += 1
+            for outcomes in batch:
+                assessment.add(outcomes)
+                advance_task(ctx)
+
+        check_recommendations(None, assessment.recommendations())
+
+    for name in _randtests.__all__:
+        if name in completed:
+            yield (name, *completed[name])
+            continue
+
+        result = assessment.result(name, heads, tails)
+        if result:
+            e = None
+        else:
+            e = TestError("Test could not be ran on any stream")
+        if checkpoint:
+            checkpoint.put(name, result, e)
+
+        yield name, result, e
+
+
+def iter_all_tests_chunked(
+    path, max_memory: int, checkpoint: Optional[Checkpoint] = None
+) -> Iterator[Tuple[str, Optional[TestResult], Optional[TestError]]]:
+    """Run all available statistical tests on a binary file in chunks, without printing
+
+    See ``run_all_tests_chunked()`` for how the file is tested.
+    """
+    chunk_bytes = chunk_bytes_within(max_memory)
+    max_spectral_n = max_memory // SPECTRAL_MEMORY_PER_BIT
+    randtest_results = run_chunked(
+        map_binary(path), chunk_bytes, max_spectral_n, checkpoint=checkpoint
+    )
+
+    yield from quietly(randtest_results)
+
+
+def quietly(items: Iterator) -> Iterator:
+    """Iterates over ``items``, ignoring the warnings raised finding each item"""
+    while True:
+        # Only the generator is silenced, not the code consuming it
+        with catch_warnings():
+            simplefilter("ignore")
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+
+        yield item
+
+
+def run_all_tests_ndjson(
+    series: pd.Series, checkpoint: Optional[Checkpoint] = None
+) -> Iterator[str]:
+    """Run all available statistical tests, yielding a JSON line of each result
+
+    Nothing is printed, and each result is yielded as soon as its test
+    completes. See ``result_records()`` for the lines yielded, and
+    ``iter_all_tests()`` for how a checkpoint is used.
+
+    Yields
+    ------
+    line : ``str``
+        Compact JSON object of a test's result, of one of its sub-tests' results,
+        or of the error raised when running it
+
+    Raises
+    ------
+    NonBinarySequenceError
+        If series contains a sequence made of non-binary values
+    """
+    for name, result, e in iter_all_tests(series, checkpoint):
+        for record in result_records(name, result, e):
+            yield format_record(record)
+
+
+def result_records(
+    randtest_name: str,
+    result: Optional[BaseTestResult],
+    e: Optional[Exception] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Represents a test's result as JSON-serialisable records
+
+    A test with sub-tests first has a record of each sub-test, with its
+    ``subtest`` feature, ``statistic``, ``p`` and whether it ``passed``. Every
+    test then has a record with its summarised ``p`` and whether it
+    ``passed``, or ``None`` for both if it cannot be summarised, along with its
+    ``statistic`` and ``failures``. A test which could not be ran only has a
+    record of its ``error``.
+
+    Parameters
+    ----------
+    randtest_name : ``str``
+        Name of statistical test
+    result : ``BaseTestResult``
+        Data container of the test's result, or ``None`` if it could not be ran
+    e : ``Exception``, optional
+        The exception raised when running the test
+
+    Yields
+    ------
+    record : ``Dict[str, Any]``
+        Record of the test, each with the ``test`` name
+    """
+    if result is None:
+        yield {"test": randtest_name, "error": str(e)}
+        return
+
+    if isinstance(result, MultiTestResult):
+        for feature, sub in result.results.items():
+            yield {
+                "test": randtest_name,
+                "subtest": jsonable_feature(feature),
+                "statistic": jsonable(sub.statistic),
+                "p": jsonable(sub.p),
+                "passed": bool(sub.p >= SIGLEVEL),
+            }
+    elif isinstance(result, StreamsTestResult):
+        for feature, sub in result.results.items():
+            yield {
+                "test": randtest_name,
+                "subtest": jsonable_feature(feature),
+                "p": jsonable(sub.uniformity_p),
+                "proportion": jsonable(sub.proportion),
+                "passed": bool(sub.passed),
+                "dropped": sub.ndropped,
+            }
+
+    summary = summarise_result(result)
+    p, passed = summary if summary else (None, None)
+
+    yield {
+        "test": randtest_name,
+        "statistic": jsonable(getattr(result, "statistic", None)),
+        "p": jsonable(p),
+        "passed": None if passed is None else bool(passed),
+        "failures": list(result.failures),
+    }
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    """Formats a record as a compact JSON line"""
+    return json.dumps(record, separators=(",", ":"))
+
+
+def jsonable(value):
+    """Converts numpy scalars to their Python equivalents, and NaNs to ``None``"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not isfinite(value):
+        return None
+
+    return value
+
+
+def jsonable_feature(feature):
+    """Converts the feature of a sub-test to its JSON equivalent"""
+    if isinstance(feature, tuple):
+        return [jsonable_feature(x) for x in feature]
+    elif feature is None or isinstance(feature, (bool, int, float, str, np.generic)):
+        return jsonable(feature)
+    else:
+        return str(feature)
+
+
 def print_results(results: Dict[str, BaseTestResult]):
     for name, result in results.items():
         color = "yellow" if result.failures else "green"
@@ -248,31 +745,102 @@ def print_results(results: Dict[str, BaseTestResult]):
     print_results_summary(results)
 
 
+def summarise_result(result: BaseTestResult) -> Optional[Tuple[float, bool]]:
+    """Finds the p-value and verdict a result is summarised by
+
+    Returns
+    -------
+    summary : ``Tuple[float, bool]``
+        p-value of the result and whether it passed, or ``None`` if the result
+        holds multiple p-values and so cannot be summarised
+    """
+    if isinstance(result, StreamsTestResult):
+        # sts summarises streams by their P-value_T and proportion passed
+        p = min(sub.uniformity_p for sub in result.results.values())
+
+        return p, result.passed
+
+    elif isinstance(result, TestResult):
+        return result.p, result.p >= SIGLEVEL
+
+    else:
+        return None
+
+
+def judge_result(result: BaseTestResult) -> Optional[Tuple[float, bool]]:
+    """Finds the p-value and verdict a result is filtered and aggregated by
+
+    Results holding multiple p-values are judged by their smallest p-value,
+    failing if any of their sub-tests failed.
+
+    Returns
+    -------
+    verdict : ``Tuple[float, bool]``
+        p-value of the result and whether it passed, or ``None`` if the result
+        holds no p-values
+    """
+    summary = summarise_result(result)
+    if summary is not None or not isinstance(result, MultiTestResult):
+        return summary
+
+    pvalues = [sub.p for sub in result.results.values()]
+    if not pvalues:
+        return None
+    finite_pvalues = [p for p in pvalues if isfinite(p)]
+    p = min(finite_pvalues) if finite_pvalues else float("nan")
+
+    return p, all(p >= SIGLEVEL for p in pvalues)
+
+
 def print_results_summary(results: Dict[str, BaseTestResult]):
+    summaries = {}
+    unsummarisable_names = []
+    for name, result in results.items():
+        if not result:
+            summaries[name] = None
+        else:
+            summary = summarise_result(result)
+            if summary:
+                summaries[name] = summary
+            else:
+                unsummarisable_names.append(name)
+
+    print_summary_table(summaries, unsummarisable_names)
+
+
+def print_summary_table(
+    summaries: Dict[str, Optional[Tuple[float, bool]]],
+    unsummarisable_names: List[str],
+):
+    """Pretty print the p-value and verdict of each test
+
+    Parameters
+    ----------
+    summaries : ``Dict[str, Tuple[float, bool]]``
+        Map of test names to their p-values and whether they passed, or to
+        ``None`` if the test could not be ran
+    unsummarisable_names : ``List[str]``
+        Names of tests whose results hold multiple p-values
+    """
     size = get_terminal_size()
     ncols = min(size.columns, 80)
 
     rule = Rule("Test Results Summary", style="bright_blue")
     console.print(rule, width=ncols)
 
-    unsummarisable_fnames = []
-
     table = Table(box=box.DOUBLE, caption=f"using a significance level of {SIGLEVEL}")
     table.add_column("Statistical Test", justify="eft")
     table.add_column("p-value", justify="left")
     table.add_column("Verdict", justify="left")
-    for name, result in results.items():
+    for name, summary in summaries.items():
         f_name = f_randtest_names[name]
 
-        if isinstance(result, MultiTestResult):
-            unsummarisable_fnames.append(f_name)
-            continue
+        if summary:
+            p, success = summary
 
-        if result:
-            f_pvalue = str(round(result.p, 3))
+            f_pvalue = str(round(p, 3))
             f_pvalue += "0" * (5 - len(f_pvalue))  # zero pad
 
-            success = result.p >= SIGLEVEL
             verdict = "PASS" if success else "FAIL"
             colour = "green" if success else "red"
             f_verdict = Text(verdict, style=colour)
@@ -282,9 +850,11 @@ def print_results_summary(results: Dict[str, BaseTestResult]):
 
         table.add_row(f_name, f_pvalue, f_verdict)
 
-    if unsummarisable_fnames:
+    if unsummarisable_names:
         warn_msg = "Multiple test results are currently not summarisable:\n"
-        warn_msg += "\n".join(f"  • {f_name}" for f_name in unsummarisable_fnames)
+        warn_msg += "\n".join(
+            f"  • {f_randtest_names[name]}" for name in unsummarisable_names
+        )
         print_warning(warn_msg)
 
         console.print("")
@@ -1,26 +1,151 @@
 """Generators of binary sequences
 
-Methods infinitely generate ``0`` and ``1`` integers to represent a binary sequence."""
+Methods infinitely generate ``0`` and ``1`` integers to represent a binary sequence.
+
+Passing ``chunk_bytes`` to a method instead generates the sequence in bulk, as
+``uint8`` arrays of ``chunk_bytes`` bytes which each pack 8 bits (most
+significant bit first, as in ``numpy.packbits``). Reproducible methods take an
+``offset`` in bytes to start their stream from, so a long sequence can be
+generated in separate shards."""
+import os
+import random
+from itertools import count
+from math import ceil
 from math import sqrt
-from random import getrandbits
+from random import Random
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+import numpy as np
+
+__all__ = ["python", "urandom", "pcg64", "philox", "primes"]
 
-__all__ = ["python", "primes"]
+DEFAULT_CHUNK_BYTES = 2 ** 16
 
 
-def python():
+def python(
+    chunk_bytes: Optional[int] = None, seed: Optional[int] = None, offset: int = 0
+):
     """Generates random bits using python's ``random`` module
 
+    Parameters
+    ----------
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+    seed : ``int``, optional
+        Seed of a generator private to the stream. If not passed, the global
+        generator of ``random`` is used, so ``random.seed()`` applies.
+    offset : ``int``, default ``0``
+        Number of bytes at the start of the stream to skip
+
     Yields
     ------
     bit : ``0`` or `1`
-        Random bit
+        Random bit, or a ``uint8`` array of packed bits if ``chunk_bytes`` is
+        passed
 
     See Also
     --------
     random.getrandbits : Method used to generate bits
     """
-    while True:
-        yield getrandbits(1)
+    rng = random if seed is None else Random(seed)
+
+    def draw(nwords: int) -> bytes:
+        return rng.getrandbits(32 * nwords).to_bytes(4 * nwords, "little")
+
+    stream = ByteStream(draw, 4)
+    stream.skip(offset)
+
+    return generate(stream, chunk_bytes)
+
+
+def urandom(chunk_bytes: Optional[int] = None):
+    """Generates random bits using the operating system's randomness source
+
+    Parameters
+    ----------
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+
+    Yields
+    ------
+    bit : ``0`` or `1`
+        Random bit, or a ``uint8`` array of packed bits if ``chunk_bytes`` is
+        passed
+
+    See Also
+    --------
+    os.urandom : Method used to generate bits
+    """
+    return generate(os.urandom, chunk_bytes)
+
+
+def pcg64(
+    chunk_bytes: Optional[int] = None, seed: Optional[int] = None, offset: int = 0
+):
+    """Generates random bits using numpy's PCG64 bit generator
+
+    The bit generator is advanced to ``offset`` instead of generating the
+    skipped bytes, so shards of one stream can be generated independently.
+
+    Parameters
+    ----------
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+    seed : ``int``, optional
+        Seed of the bit generator
+    offset : ``int``, default ``0``
+        Number of bytes at the start of the stream to skip
+
+    Yields
+    ------
+    bit : ``0`` or `1`
+        Random bit, or a ``uint8`` array of packed bits if ``chunk_bytes`` is
+        passed
+
+    See Also
+    --------
+    numpy.random.PCG64 : Bit generator used to generate bits
+    """
+    # PCG64 advances one 64-bit output at a time
+    stream = bitgen_stream(np.random.PCG64(seed), offset, 1)
+
+    return generate(stream, chunk_bytes)
+
+
+def philox(
+    chunk_bytes: Optional[int] = None, seed: Optional[int] = None, offset: int = 0
+):
+    """Generates random bits using numpy's Philox bit generator
+
+    The bit generator is advanced to ``offset`` instead of generating the
+    skipped bytes, so shards of one stream can be generated independently.
+
+    Parameters
+    ----------
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+    seed : ``int``, optional
+        Seed of the bit generator
+    offset : ``int``, default ``0``
+        Number of bytes at the start of the stream to skip
+
+    Yields
+    ------
+    bit : ``0`` or `1`
+        Random bit, or a ``uint8`` array of packed bits if ``chunk_bytes`` is
+        passed
+
+    See Also
+    --------
+    numpy.random.Philox : Bit generator used to generate bits
+    """
+    # Philox advances its counter one block of four 64-bit outputs at a time
+    stream = bitgen_stream(np.random.Philox(seed), offset, 4)
+
+    return generate(stream, chunk_bytes)
 
 
 def numbers(start=1):
@@ -42,24 +167,224 @@ def numbers(start=1):
         n += 1
 
 
-def primes():
+def primes(chunk_bytes: Optional[int] = None, offset: int = 0):
     """Generates bits representing if natural numbers are prime
 
+    The bits are found by a segmented sieve of Eratosthenes, so memory use is
+    bounded by the size of a segment rather than by how many bits have been
+    generated.
+
+    Parameters
+    ----------
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+    offset : ``int``, default ``0``
+        Number of bytes at the start of the stream to skip, i.e. the stream
+        starts from the number ``8 * offset + 1``
+
     Yields
     ------
     bit: ``0`` or ``1``
         Whether next number is prime: ``0`` represents number is a composite (i.e.
-        not a prime), ``1`` represents number is a prime.
+        not a prime), ``1`` represents number is a prime. A ``uint8`` array of
+        packed bits is yielded instead if ``chunk_bytes`` is passed.
+    """
+    start = 8 * offset + 1
+
+    if chunk_bytes is None:
+        return unpack_bools(prime_segments(PRIMES_SEGMENT_SIZE, start))
+
+    check_chunk_bytes(chunk_bytes)
+
+    return map(np.packbits, prime_segments(8 * chunk_bytes, start))
+
+
+PRIMES_SEGMENT_SIZE = 2 ** 20
+
+
+def prime_segments(segment_size: int, start: int = 1) -> Iterator[np.ndarray]:
+    """Generates the prime indicators of natural numbers in segments
+
+    Parameters
+    ----------
+    segment_size : ``int``
+        Amount of numbers in each segment
+    start : ``int``, default ``1``
+        Natural number to start sieving from
+
+    Yields
+    ------
+    segment : ``ndarray``
+        Boolean array of whether each number in the next ``segment_size``
+        numbers is prime
+    """
+    for start in count(start, segment_size):
+        stop = start + segment_size
+        segment = np.ones(segment_size, dtype=bool)
+        if start == 1:
+            segment[0] = False  # 1 is not prime
+
+        for prime in small_primes(int(sqrt(stop)) + 1).tolist():
+            multiple = max(prime * prime, -(-start // prime) * prime)
+            segment[multiple - start :: prime] = False
+
+        yield segment
+
+
+def small_primes(limit: int) -> np.ndarray:
+    """Finds all primes up to and including ``limit``"""
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for n in range(2, int(sqrt(limit)) + 1):
+        if sieve[n]:
+            sieve[n * n :: n] = False
+
+    return np.flatnonzero(sieve)
+
+
+# ------------------------------------------------------------------------------
+# Chunk helpers
+
+
+class ByteStream:
+    """Stream of random bytes drawn from a source of random words
+
+    Bytes left over from a drawn word are kept for the next call, so the
+    stream does not depend on how many bytes are requested at a time.
+
+    Parameters
+    ----------
+    draw : ``Callable[[int], bytes]``
+        Method which returns the bytes of the passed number of random words
+    word_bytes : ``int``
+        Number of bytes in each word
+    """
+
+    def __init__(self, draw: Callable[[int], bytes], word_bytes: int):
+        self._draw = draw
+        self._word_bytes = word_bytes
+        self._buffer = b""
+
+    def __call__(self, nbytes: int) -> bytes:
+        nmissing = nbytes - len(self._buffer)
+        if nmissing > 0:
+            self._buffer += self._draw(ceil(nmissing / self._word_bytes))
+
+        bytes_ = self._buffer[:nbytes]
+        self._buffer = self._buffer[nbytes:]
+
+        return bytes_
+
+    def skip(self, nbytes: int):
+        """Discards the next bytes of the stream"""
+        while nbytes > 0:
+            nbytes -= len(self(min(nbytes, DEFAULT_CHUNK_BYTES)))
+
+
+def bitgen_stream(
+    bitgen: np.random.BitGenerator, offset: int, words_per_advance: int
+) -> ByteStream:
+    """Streams the raw output of a numpy bit generator, starting from ``offset``
+
+    Parameters
+    ----------
+    bitgen : ``BitGenerator``
+        Freshly initialised bit generator with 64-bit outputs
+    offset : ``int``
+        Number of bytes at the start of the stream to skip
+    words_per_advance : ``int``
+        Number of outputs skipped by each step of ``bitgen.advance()``
+
+    Returns
+    -------
+    stream : ``ByteStream``
+        Stream of the bit generator's bytes
     """
-    yield 0  # n = 1
-    yield 1  # n = 2
-
-    for n in numbers(3):
-        if n % 2 == 0:
-            yield 0
-        else:
-            for divisor in range(3, int(sqrt(n)) + 1, 2):
-                if n % divisor == 0:
-                    yield 0
-            else:
-                yield 1
+    steps, remainder = divmod(offset, 8 * words_per_advance)
+    if steps > 0:
+        bitgen.advance(steps)
+
+    def draw(nwords: int) -> bytes:
+        return bitgen.random_raw(nwords).astype("<u8").tobytes()
+
+    stream = ByteStream(draw, 8)
+    stream.skip(remainder)
+
+    return stream
+
+
+def check_chunk_bytes(chunk_bytes: int):
+    if chunk_bytes < 1:
+        raise ValueError("chunk_bytes must be a positive integer")
+
+
+def generate(randbytes: Callable[[int], bytes], chunk_bytes: Optional[int]):
+    """Generates single bits or packed chunks from a source of random bytes
+
+    Parameters
+    ----------
+    randbytes : ``Callable[[int], bytes]``
+        Method which returns the passed number of random bytes
+    chunk_bytes : ``int``, optional
+        Generate packed chunks of this many bytes instead of single bits
+
+    Returns
+    -------
+    generator : ``Iterator``
+        Infinite generator of bits, or of packed chunks if ``chunk_bytes`` is
+        passed
+    """
+    if chunk_bytes is None:
+        return unpack(byte_chunks(randbytes, DEFAULT_CHUNK_BYTES))
+
+    check_chunk_bytes(chunk_bytes)
+
+    return byte_chunks(randbytes, chunk_bytes)
+
+
+def byte_chunks(
+    randbytes: Callable[[int], bytes], chunk_bytes: int
+) -> Iterator[np.ndarray]:
+    while True:
+        yield np.frombuffer(randbytes(chunk_bytes), dtype=np.uint8)
+
+
+def unpack(chunks: Iterable[np.ndarray]) -> Iterator[int]:
+    for chunk in chunks:
+        yield from np.unpackbits(chunk).tolist()
+
+
+def unpack_bools(segments: Iterable[np.ndarray]) -> Iterator[int]:
+    for segment in segments:
+        yield from segment.astype(np.uint8).tolist()
+
+
+def take_bits(chunks: Iterable[np.ndarray], n: int) -> np.ndarray:
+    """Unpacks the first bits of a generator of packed chunks
+
+    Parameters
+    ----------
+    chunks : ``Iterable[ndarray]``
+        Packed ``uint8`` chunks, i.e. a generator called with ``chunk_bytes``
+    n : ``int``
+        Number of bits to take
+
+    Returns
+    -------
+    bits : ``ndarray``
+        ``uint8`` array of the first ``n`` bits
+    """
+    nbytes = ceil(n / 8)
+
+    taken = []
+    ntaken = 0
+    if nbytes > 0:
+        for chunk in chunks:
+            taken.append(chunk[: nbytes - ntaken])
+            ntaken += len(taken[-1])
+            if ntaken >= nbytes:
+                break
+
+    bytes_ = np.concatenate(taken) if taken else np.zeros(0, dtype=np.uint8)
+
+    return np.unpackbits(bytes_, count=n)
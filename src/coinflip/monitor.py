@@ -0,0 +1,11 @@
+"""Randomness tests ran over a window sliding along a sequence
+
+A ``WindowMonitor`` reads a sequence chunk by chunk, like an accumulator, but
+tests only the last ``window`` values of it. The window slides forward a block
+at a time, and the p-values of every step are returned as they are found, so
+a source which degrades part way through a stream can be noticed.
+"""
+from coinflip._randtests.monitor import WindowMonitor
+from coinflip._randtests.monitor import monitor_randtests
+
+__all__ = ["WindowMonitor", "monitor_randtests"]
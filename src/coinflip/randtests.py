@@ -30,11 +30,16 @@ non-idiomatic programming conventions used in ``sts``.
    Number Generators for Cryptographic Applications", *Special Publication
    800-22 Revision 1a*, April 2010.
 """
+from typing import Dict
+from typing import Iterable
 from typing import Optional
 from typing import Tuple
 
 from coinflip import _randtests
+from coinflip._randtests import streams
+from coinflip._randtests import sweep
 from coinflip._randtests.common import exceptions
+from coinflip._randtests.cusum import bidirectional_cusum as _bidirectional_cusum
 
 __all__ = [
     "monobit",
@@ -50,8 +55,11 @@ __all__ = [
     "serial",
     "approximate_entropy",
     "cusum",
+    "bidirectional_cusum",
     "random_excursions",
     "random_excursions_variant",
+    "pattern_sweep",
+    "multistream",
     "exceptions",
 ]
 
@@ -65,13 +73,17 @@ def monobit(sequence):
     Parameters
     ----------
     sequence : array-like with two distinct values
-        Sequence containing 2 distinct elements
+        Sequence containing 2 distinct elements, or a batch of sequences as a 2D
+        array of shape ``(nsequences, n)`` or a list of equal-length packed
+        ``bytes``
 
     Returns
     -------
     result : ``MonobitTestResult``
         Dataclass that contains the test's statistic and p-value as well as
         other relevant information gathered.
+        Batches of sequences instead return a ``BatchTestResult``, which
+        contains the statistic and p-value of every sequence.
     """
     return _randtests.monobit(sequence)
 
@@ -86,7 +98,9 @@ def frequency_within_block(sequence, blocksize: Optional[int] = None):
     Parameters
     ----------
     sequence : array-like with two distinct values
-        Sequence containing 2 distinct elements
+        Sequence containing 2 distinct elements, or a batch of sequences as a 2D
+        array of shape ``(nsequences, n)`` or a list of equal-length packed
+        ``bytes``
     blocksize : ``int``
         Size of the blocks that partition the given sequence
 
@@ -95,6 +109,8 @@ def frequency_within_block(sequence, blocksize: Optional[int] = None):
     result : ``FrequencyWithinBlockTestResult``
         Dataclass that contains the test's statistic and p-value as well as
         other relevant information gathered.
+        Batches of sequences instead return a ``BatchTestResult``, which
+        contains the statistic and p-value of every sequence.
     """
     return _randtests.frequency_within_block(sequence, blocksize=blocksize)
 
@@ -108,13 +124,17 @@ def runs(sequence):
     Parameters
     ----------
     sequence : array-like with two distinct values
-        Sequence containing 2 distinct elements
+        Sequence containing 2 distinct elements, or a batch of sequences as a 2D
+        array of shape ``(nsequences, n)`` or a list of equal-length packed
+        ``bytes``
 
     Returns
     -------
     result : ``RunsTestResult``
         Dataclass that contains the test's statistic and p-value as well as
         other relevant information gathered.
+        Batches of sequences instead return a ``BatchTestResult``, which
+        contains the statistic and p-value of every sequence.
     """
     return _randtests.runs(sequence)
 
@@ -174,13 +194,17 @@ def spectral(sequence):
     Parameters
     ----------
     sequence : array-like with two distinct values
-        Sequence containing 2 distinct elements
+        Sequence containing 2 distinct elements, or a batch of sequences as a 2D
+        array of shape ``(nsequences, n)`` or a list of equal-length packed
+        ``bytes``
 
     Returns
     -------
     result : ``SpectralTestResult``
         Dataclass that contains the test's statistic and p-value as well as
         other relevant information gathered.
+        Batches of sequences instead return a ``BatchTestResult``, which
+        contains the statistic and p-value of every sequence.
 
     Raises
     ------
@@ -364,7 +388,9 @@ def cusum(sequence, reverse: bool = False):
     Parameters
     ----------
     sequence : array-like with two distinct values
-        Sequence containing 2 distinct elements
+        Sequence containing 2 distinct elements, or a batch of sequences as a 2D
+        array of shape ``(nsequences, n)`` or a list of equal-length packed
+        ``bytes``
     reverse : ``bool``
         Cumulate sums from the end of the sequence first.
 
@@ -373,21 +399,47 @@ def cusum(sequence, reverse: bool = False):
     results : ``CusumTestResult``
         Dataclass that contains the test's statistic and p-value as well as
         other relevant information gathered.
+        Batches of sequences instead return a ``BatchTestResult``, which
+        contains the statistic and p-value of every sequence.
     """
     return _randtests.cusum(sequence, reverse=reverse)
 
 
-def random_excursions(sequence):
+def bidirectional_cusum(sequence):
+    """Furthest detours in a random walk from both ends are compared to expected results
+
+    The sequence is treated as a random walk, where the furthest detours from
+    the axis are identified when cumulating sums from the start and from the end
+    of the sequence. Both are found from a single walk, and referenced to a
+    hypothetically truly random sequence.
+
+    Parameters
+    ----------
+    sequence : array-like with two distinct values
+        Sequence containing 2 distinct elements
+
+    Returns
+    -------
+    results : ``BidirectionalCusumMultiTestResult``
+        Dataclass that contains the statistics and p-values of the forward and
+        reverse sub-tests.
+    """
+    return _bidirectional_cusum(sequence)
+
+
+def random_excursions(sequence, states: Optional[Iterable[int]] = None):
     """Frequency of states per cycle in a random walk is compared to expected results
 
     The sequence is treated as a random walk, where the frequency of states -4
-    to 4 in each cycle is found. This is referenced to a hypothetically truly
-    random sequence.
+    to 4 (or the passed ``states``) in each cycle is found. This is referenced
+    to a hypothetically truly random sequence.
 
     Parameters
     ----------
     sequence : array-like with two distinct values
         Sequence containing 2 distinct elements
+    states : ``Iterable[int]``
+        Non-zero states of the random walk to test
 
     Returns
     -------
@@ -395,7 +447,7 @@ def random_excursions(sequence):
         Dataclass that contains the statistics and p-values of all sub-tests, as
         well as other relevant information gathered.
     """
-    return _randtests.random_excursions(sequence)
+    return _randtests.random_excursions(sequence, states=states)
 
 
 def random_excursions_variant(sequence):
@@ -416,3 +468,72 @@ def random_excursions_variant(sequence):
         well as other relevant information gathered.
     """
     return _randtests.random_excursions_variant(sequence)
+
+
+def pattern_sweep(sequence, blocksizes: Optional[Iterable[int]] = None):
+    """Serial and approximate entropy tests across a range of pattern sizes
+
+    The cyclic counts of overlapping patterns are found once for the largest
+    pattern size, and the counts for every smaller size are derived from them.
+    The serial and approximate entropy tests are then applied for each size,
+    so sweeping over many sizes costs about as much as a single test run.
+
+    Parameters
+    ----------
+    sequence : array-like with two distinct values
+        Sequence containing 2 distinct elements
+    blocksizes : ``Iterable[int]``
+        Sizes of the patterns to test
+
+    Returns
+    -------
+    results : ``PatternSweepTestResult``
+        Dataclass that contains the results of both tests for every pattern
+        size, which can be viewed as a ``DataFrame`` via its ``table`` property.
+    """
+    return sweep.pattern_sweep(sequence, blocksizes=blocksizes)
+
+
+def multistream(
+    sequence,
+    nstreams: Optional[int] = None,
+    streamlen: Optional[int] = None,
+    randtests: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Optional[streams.StreamsTestResult]]:
+    """Tests are ran across many bitstreams and their p-values assessed
+
+    The sequence is split into bitstreams of equal length, which every test is
+    ran on in parallel processes. As in ``sts``, the p-values of each test (and
+    of each of its sub-tests) are then assessed by the proportion of streams
+    which passed, compared to its confidence interval, and by a chi-square test
+    of their uniformity (P-value_T).
+
+    Parameters
+    ----------
+    sequence : array-like with two distinct values
+        Sequence containing 2 distinct elements
+    nstreams : ``int``, optional
+        Number of streams to split the sequence into
+    streamlen : ``int``, optional
+        Length of each stream, defaulting to the sequence evenly divided into
+        ``nstreams``
+    randtests : ``Iterable[str]``, optional
+        Names of the tests to run, defaulting to every test
+    workers : ``int``, optional
+        Number of processes to test streams in, defaulting to the number of
+        processors
+
+    Returns
+    -------
+    results : ``Dict[str, StreamsTestResult]``
+        Dataclasses of each test's assessment, which contain the p-values of
+        every stream, or ``None`` if the test could not be ran on any stream.
+    """
+    heads, tails, bitstreams = streams.split_streams(sequence, nstreams, streamlen)
+
+    return dict(
+        streams.multistream(
+            bitstreams, randtests, heads=heads, tails=tails, workers=workers
+        )
+    )
@@ -2,6 +2,7 @@ import pickle
 from numbers import Real
 from typing import List
 
+from hypothesis import given
 from hypothesis import strategies as st
 from hypothesis.stateful import RuleBasedStateMachine
 from hypothesis.stateful import initialize
@@ -64,3 +65,21 @@ def test_del():
     bins[6] += 100
     del bins[6]
     assert bins[3] == 100
+
+
+finite_floats = st.floats(allow_nan=False, allow_infinity=False)
+
+
+@given(
+    intervals=st.lists(finite_floats, min_size=1, unique=True),
+    values=st.lists(finite_floats),
+)
+def test_add_many(intervals, values):
+    bins = Bins(intervals)
+    bins.add_many(values)
+
+    bins_expect = Bins(intervals)
+    for value in values:
+        bins_expect[value] += 1
+
+    assert bins == bins_expect
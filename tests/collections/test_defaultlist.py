@@ -1,5 +1,6 @@
 from string import ascii_lowercase
 
+import numpy as np
 from defaultlist import defaultlist as ref_defaultlist
 from hypothesis import assume
 from hypothesis import strategies as st
@@ -73,6 +74,70 @@ class DefaultListStateMachine(RuleBasedStateMachine):
 TestDefaultListStateMachine = DefaultListStateMachine.TestCase
 
 
+int64s = st.integers(min_value=-(2 ** 63), max_value=2 ** 63 - 1)
+
+
+class TypedDefaultListStateMachine(RuleBasedStateMachine):
+    @initialize()
+    def init_lists(self):
+        self.ref_dlist = ref_defaultlist(int)
+        self.dlist = defaultlist(int, dtype=np.int64)
+
+    @property
+    def n(self):
+        return len(self.ref_dlist)
+
+    @rule(x=int64s)
+    def append(self, x):
+        self.ref_dlist.append(x)
+        self.dlist.append(x)
+
+        assert self.dlist == self.ref_dlist
+
+    @rule(ints=st.lists(int64s))
+    def concat(self, ints):
+        self.ref_dlist += ints
+        self.dlist += ints
+
+        assert self.dlist == self.ref_dlist
+
+    @rule(i=st.integers(min_value=0, max_value=100), x=int64s)
+    def set_past_end(self, i, x):
+        self.ref_dlist[i] = x
+        self.dlist[i] = x
+
+        assert self.dlist == self.ref_dlist
+
+    @rule(data=st.data(), x=int64s)
+    def insert(self, data, x):
+        i = data.draw(st.integers(min_value=0, max_value=self.n))
+
+        self.ref_dlist.insert(i, x)
+        self.dlist.insert(i, x)
+
+        assert self.dlist == self.ref_dlist
+
+    @rule(data=st.data())
+    def del_(self, data):
+        assume(self.n > 0)
+        i = data.draw(st.integers(min_value=0, max_value=self.n - 1))
+
+        del self.ref_dlist[i]
+        del self.dlist[i]
+
+        assert self.dlist == self.ref_dlist
+
+    @rule()
+    def to_numpy(self):
+        array = self.dlist.to_numpy()
+
+        assert array.dtype == np.int64
+        assert list(array) == list(self.ref_dlist)
+
+
+TestTypedDefaultListStateMachine = TypedDefaultListStateMachine.TestCase
+
+
 @fixture
 def dlist():
     return defaultlist()
@@ -188,3 +253,13 @@ def test_slice_get(dlist):
     dlist[:] = ascii_lowercase[:3]
 
     assert dlist[:5] == ["a", "b", "c", 0, 0]
+
+
+def test_typed_slice_get():
+    dlist = defaultlist(int, dtype=np.int64)
+    dlist[:] = range(3)
+
+    sliced_dlist = dlist[:5]
+
+    assert sliced_dlist == [0, 1, 2, 0, 0]
+    assert sliced_dlist.dtype == np.int64
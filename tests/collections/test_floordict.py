@@ -0,0 +1,42 @@
+import pickle
+
+from hypothesis import given
+from hypothesis import strategies as st
+from pytest import raises
+
+from coinflip.collections import FloorDict
+
+finite_floats = st.floats(allow_nan=False, allow_infinity=False)
+
+
+@given(
+    keys=st.lists(finite_floats, min_size=1, unique=True),
+    lookups=st.lists(finite_floats),
+)
+def test_floor(keys, lookups):
+    fdict = FloorDict({k: i for i, k in enumerate(keys)})
+    lookups = [x for x in lookups if x >= min(keys)]
+
+    values = [fdict[x] for x in lookups]
+
+    for x, value in zip(lookups, values):
+        assert keys[value] == max(k for k in keys if k <= x)
+    assert fdict.lookup_many(lookups) == values
+
+
+def test_key_too_small():
+    fdict = FloorDict({10: "a", 100: "b"})
+
+    with raises(KeyError):
+        fdict[9]
+    with raises(KeyError):
+        fdict.lookup_many([50, 9])
+
+
+def test_pickle():
+    fdict = FloorDict({10: "a", 100: "b"})
+
+    pickled_fdict = pickle.loads(pickle.dumps(fdict))
+
+    assert pickled_fdict[99] == "a"
+    assert pickled_fdict.lookup_many([10, 1000]) == ["a", "b"]
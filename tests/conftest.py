@@ -1,4 +1,6 @@
+import os
 from datetime import timedelta
+from tempfile import mkdtemp
 
 from hypothesis import settings
 from pytest import mark
@@ -21,6 +23,10 @@ def pytest_addoption(parser):
 def pytest_configure(config):
     config.addinivalue_line("markers", "slow: mark test as slow to run")
 
+    # Results cached and checkpointed by runs are kept out of the user's cache
+    # directory
+    os.environ["COINFLIP_CACHE_DIR"] = mkdtemp()
+
     if not config.getoption("--run-slow"):
         settings.load_profile("fast")
 
@@ -0,0 +1,246 @@
+import numpy as np
+from hypothesis import given
+from hypothesis import strategies as st
+from pytest import approx
+from pytest import mark
+from pytest import raises
+
+from coinflip import accumulators
+from coinflip import randtests
+from coinflip._randtests.common.core import MinimumInputError
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.result import MultiTestResult
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+from ..strategies import mixedbits
+
+accumulator_examples = [
+    (accumulators.MonobitAccumulator, randtests.monobit, {}),
+    (
+        accumulators.FrequencyWithinBlockAccumulator,
+        randtests.frequency_within_block,
+        {"blocksize": 8},
+    ),
+    (
+        accumulators.FrequencyWithinBlockAccumulator,
+        randtests.frequency_within_block,
+        {"blocksize": 20},
+    ),
+    (accumulators.RunsAccumulator, randtests.runs, {}),
+    (accumulators.LongestRunsAccumulator, randtests.longest_runs, {}),
+    (accumulators.CusumAccumulator, randtests.cusum, {}),
+    (accumulators.CusumAccumulator, randtests.cusum, {"reverse": True}),
+    (accumulators.BidirectionalCusumAccumulator, randtests.bidirectional_cusum, {}),
+    (accumulators.RandomExcursionsAccumulator, randtests.random_excursions, {}),
+    (
+        accumulators.RandomExcursionsAccumulator,
+        randtests.random_excursions,
+        {"states": [-2, 3]},
+    ),
+    (
+        accumulators.RandomExcursionsVariantAccumulator,
+        randtests.random_excursions_variant,
+        {},
+    ),
+    (
+        accumulators.OverlappingTemplateMatchingAccumulator,
+        randtests.overlapping_template_matching,
+        {"blocksize": 10},
+    ),
+    (
+        accumulators.OverlappingTemplateMatchingAccumulator,
+        randtests.overlapping_template_matching,
+        {"blocksize": 64, "template_size": 4},
+    ),
+    (
+        accumulators.NonOverlappingTemplateMatchingAccumulator,
+        randtests.non_overlapping_template_matching,
+        {"blocksize": 20},
+    ),
+    (
+        accumulators.NonOverlappingTemplateMatchingAccumulator,
+        randtests.non_overlapping_template_matching,
+        {"blocksize": 30, "template_size": 4},
+    ),
+    (
+        accumulators.BinaryMatrixRankAccumulator,
+        randtests.binary_matrix_rank,
+        {"matrix_dimen": (3, 3)},
+    ),
+    (
+        accumulators.BinaryMatrixRankAccumulator,
+        randtests.binary_matrix_rank,
+        {"matrix_dimen": (4, 6)},
+    ),
+    (
+        accumulators.LinearComplexityAccumulator,
+        randtests.linear_complexity,
+        {"blocksize": 8},
+    ),
+    (
+        accumulators.LinearComplexityAccumulator,
+        randtests.linear_complexity,
+        {"blocksize": 13},
+    ),
+]
+
+# Results which hold arrays, or whose statistic is summed in a different order
+approx_accumulator_examples = [
+    (accumulators.SerialAccumulator, randtests.serial, {}),
+    (accumulators.SerialAccumulator, randtests.serial, {"blocksize": 5}),
+    (accumulators.ApproximateEntropyAccumulator, randtests.approximate_entropy, {}),
+    (
+        accumulators.ApproximateEntropyAccumulator,
+        randtests.approximate_entropy,
+        {"blocksize": 5},
+    ),
+    (
+        accumulators.MaurersUniversalAccumulator,
+        randtests.maurers_universal,
+        {"blocksize": 2, "init_nblocks": 4},
+    ),
+    (
+        accumulators.MaurersUniversalAccumulator,
+        randtests.maurers_universal,
+        {"blocksize": 6, "init_nblocks": 10},
+    ),
+]
+
+
+def assert_results_match(result, expected):
+    assert type(result) is type(expected)
+    assert result.failures == expected.failures
+    if isinstance(expected, MultiTestResult):
+        assert result.results == expected.results
+    else:
+        assert result.statistic == approx(expected.statistic)
+        assert result.p == approx(expected.p)
+
+
+@mark.parametrize(["accumulator_cls", "randtest", "kwargs"], accumulator_examples)
+@given(bits=mixedbits(min_size=128), data=st.data())
+def test_accumulator(accumulator_cls, randtest, kwargs, bits, data):
+    splits = data.draw(st.lists(st.integers(0, len(bits)), max_size=8))
+
+    accumulator = accumulator_cls(**kwargs)
+    for chunk in np.split(np.array(bits), sorted(splits)):
+        accumulator.update(chunk)
+
+    assert accumulator.result() == randtest(bits, **kwargs)
+
+
+@mark.parametrize(["accumulator_cls", "randtest", "kwargs"], accumulator_examples)
+def test_accumulator_packed(accumulator_cls, randtest, kwargs):
+    chunks = pcg64(chunk_bytes=1000, seed=0)
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 80000)
+
+    accumulator = accumulator_cls(**kwargs)
+    for _ in range(10):
+        accumulator.update_packed(next(chunks))
+
+    assert accumulator.result() == randtest(bits, **kwargs)
+
+
+@mark.parametrize(["accumulator_cls", "randtest", "kwargs"], accumulator_examples)
+def test_accumulator_snapshot(accumulator_cls, randtest, kwargs):
+    chunks = pcg64(chunk_bytes=1000, seed=0)
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 80000)
+    buffers = [next(chunks) for _ in range(10)]
+
+    accumulator = accumulator_cls(**kwargs)
+    for buffer in buffers[:5]:
+        accumulator.update_packed(buffer)
+    snapshot = accumulator.snapshot()
+    accumulator.update_packed(buffers[5])  # progress lost to an interruption
+
+    accumulator = accumulators.Accumulator.restore(snapshot)
+    for buffer in buffers[5:]:
+        accumulator.update_packed(buffer)
+
+    assert accumulator.result() == randtest(bits, **kwargs)
+
+
+def test_frequency_within_block_state_size():
+    chunks = pcg64(chunk_bytes=1000, seed=0)
+    accumulator = accumulators.FrequencyWithinBlockAccumulator()
+
+    for _ in range(100):
+        accumulator.update_packed(next(chunks))
+    snapshot = accumulator.snapshot()
+    for _ in range(900):
+        accumulator.update_packed(next(chunks))
+
+    # The state kept between chunks does not grow with the sequence
+    assert len(accumulator.snapshot()) == len(snapshot)
+
+
+@mark.parametrize(
+    ["accumulator_cls", "randtest", "kwargs"], approx_accumulator_examples
+)
+@given(bits=mixedbits(min_size=128), data=st.data())
+def test_accumulator_approx(accumulator_cls, randtest, kwargs, bits, data):
+    splits = data.draw(st.lists(st.integers(0, len(bits)), max_size=8))
+
+    accumulator = accumulator_cls(**kwargs)
+    for chunk in np.split(np.array(bits), sorted(splits)):
+        accumulator.update(chunk)
+
+    assert_results_match(accumulator.result(), randtest(bits, **kwargs))
+
+
+@mark.parametrize(
+    ["accumulator_cls", "randtest", "kwargs"], approx_accumulator_examples
+)
+def test_accumulator_approx_packed(accumulator_cls, randtest, kwargs):
+    chunks = pcg64(chunk_bytes=1000, seed=0)
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 80000)
+
+    accumulator = accumulator_cls(**kwargs)
+    for _ in range(10):
+        accumulator.update_packed(next(chunks))
+
+    assert_results_match(accumulator.result(), randtest(bits, **kwargs))
+
+
+def test_universal_defaults():
+    chunks = pcg64(chunk_bytes=10000, seed=0)
+    bits = take_bits(pcg64(chunk_bytes=10000, seed=0), 400000)
+
+    accumulator = accumulators.MaurersUniversalAccumulator()
+    for _ in range(5):
+        accumulator.update_packed(next(chunks))
+
+    assert_results_match(accumulator.result(), randtests.maurers_universal(bits))
+
+
+def test_faces():
+    accumulator = accumulators.RunsAccumulator(heads="T", tails="H")
+    accumulator.update(["H", "T", "T"])
+    accumulator.update(["T", "H"] * 100)
+
+    sequence = ["H", "T", "T"] + ["T", "H"] * 100
+    assert accumulator.result() == randtests.runs(sequence)
+
+
+def test_non_binary_chunk():
+    accumulator = accumulators.MonobitAccumulator()
+
+    with raises(NonBinarySequenceError):
+        accumulator.update([0, 1, 2])
+
+
+def test_single_face():
+    accumulator = accumulators.MonobitAccumulator()
+    accumulator.update([1] * 100)
+
+    with raises(NonBinarySequenceError):
+        accumulator.result()
+
+
+def test_min_n():
+    accumulator = accumulators.FrequencyWithinBlockAccumulator()
+    accumulator.update([0, 1])
+
+    with raises(MinimumInputError):
+        accumulator.result()
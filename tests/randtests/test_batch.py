@@ -0,0 +1,70 @@
+import numpy as np
+from pytest import approx
+from pytest import mark
+from pytest import raises
+
+from coinflip import randtests
+from coinflip._randtests.common.core import MinimumInputError
+from coinflip._randtests.common.exceptions import NonBinarySequenceError
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+nsequences = 20
+n = 1001
+sequences = take_bits(pcg64(chunk_bytes=2 ** 10, seed=0), nsequences * n)
+sequences = sequences.reshape(nsequences, n)
+
+
+@mark.parametrize(
+    ["randtest", "kwargs"],
+    [
+        ("monobit", {}),
+        ("frequency_within_block", {"blocksize": 100}),
+        ("runs", {}),
+        ("cusum", {}),
+        ("cusum", {"reverse": True}),
+        ("spectral", {}),
+    ],
+)
+def test_batch(randtest, kwargs):
+    randtest_method = getattr(randtests, randtest)
+
+    result = randtest_method(sequences, **kwargs)
+
+    results_expect = [randtest_method(sequence, **kwargs) for sequence in sequences]
+    assert result.statistics == approx([r.statistic for r in results_expect])
+    assert result.pvalues == approx([r.p for r in results_expect])
+    assert list(result.table.columns) == ["statistic", "p"]
+
+
+def test_batch_faces():
+    faces = np.where(sequences == 1, "H", "T")
+
+    result = randtests.monobit(faces)
+
+    assert (result.heads, result.tails) == ("T", "H")
+    assert result.pvalues == approx(randtests.monobit(sequences).pvalues)
+
+
+def test_batch_packed():
+    packed = [np.packbits(sequence[:1000]).tobytes() for sequence in sequences]
+
+    result = randtests.runs(packed)
+
+    assert result.pvalues == approx(randtests.runs(sequences[:, :1000]).pvalues)
+
+
+def test_batch_packed_unequal():
+    with raises(TestInputError):
+        randtests.monobit([b"\x0f", b"\x0f\xf0"])
+
+
+def test_batch_non_binary():
+    with raises(NonBinarySequenceError):
+        randtests.monobit(np.array([[0, 1, 2], [0, 1, 1]]))
+
+
+def test_batch_min_n():
+    with raises(MinimumInputError):
+        randtests.monobit(np.array([[0], [1]]))
@@ -0,0 +1,42 @@
+from warnings import catch_warnings
+from warnings import simplefilter
+
+import numpy as np
+from pytest import mark
+from pytest import warns
+
+from coinflip import _randtests
+from coinflip._randtests.chunked import run_chunked
+from coinflip._randtests.common.exceptions import TestError
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+from .test_accumulators import assert_results_match
+
+
+@mark.parametrize("chunk_bytes", [997, 10000])
+def test_run_chunked(chunk_bytes):
+    bits = take_bits(pcg64(chunk_bytes=10000, seed=0), 80000)
+    buffer = np.packbits(bits).tobytes()
+
+    with catch_warnings():
+        simplefilter("ignore")
+        for name, result, e in run_chunked(buffer, chunk_bytes):
+            randtest = getattr(_randtests, name)
+            try:
+                expected = randtest(bits)
+            except TestError as expected_e:
+                assert type(e) is type(expected_e)
+            else:
+                assert e is None
+                assert_results_match(result, expected)
+
+
+def test_spectral_truncation():
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 8000)
+    buffer = np.packbits(bits).tobytes()
+
+    with warns(UserWarning, match="first 2000 bits"):
+        results = {name: result for name, result, _ in run_chunked(buffer, 100, 2000)}
+
+    assert results["spectral"] == _randtests.spectral(bits[:2000])
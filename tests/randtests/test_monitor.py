@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from hypothesis import given
+from hypothesis import strategies as st
+from pytest import raises
+
+from coinflip import randtests
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+from coinflip.monitor import WindowMonitor
+
+n = 4000
+window = 800
+blocksize = 40
+
+
+@lru_cache()
+def example_bits() -> np.ndarray:
+    return take_bits(pcg64(chunk_bytes=500, seed=0), n)
+
+
+@lru_cache()
+def expected_steps() -> pd.DataFrame:
+    bits = example_bits()
+
+    rows = {}
+    for end in range(window, n + 1, blocksize):
+        window_bits = bits[end - window : end]
+        rows[end] = {
+            "monobit": randtests.monobit(window_bits).p,
+            "frequency_within_block": randtests.frequency_within_block(
+                window_bits, blocksize=blocksize
+            ).p,
+            "runs": randtests.runs(window_bits).p,
+            "cusum": randtests.cusum(window_bits).p,
+        }
+
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+@given(splits=st.lists(st.integers(0, n), max_size=8))
+def test_window_monitor(splits):
+    window_monitor = WindowMonitor(window, blocksize)
+    steps = pd.concat(
+        [
+            window_monitor.update(chunk)
+            for chunk in np.split(example_bits(), sorted(splits))
+        ]
+    )
+
+    expect = expected_steps()
+    assert steps.index.tolist() == expect.index.tolist()
+    assert np.allclose(steps.to_numpy(), expect[steps.columns].to_numpy())
+
+
+def test_window_monitor_packed():
+    chunks = pcg64(chunk_bytes=50, seed=0)
+
+    window_monitor = WindowMonitor(window, blocksize)
+    steps = pd.concat([window_monitor.update_packed(next(chunks)) for _ in range(10)])
+
+    expect = expected_steps()
+    assert steps.index.tolist() == expect.index.tolist()
+    assert np.allclose(steps.to_numpy(), expect[steps.columns].to_numpy())
+
+
+def test_window_not_multiple():
+    with raises(TestInputError):
+        WindowMonitor(window=100, blocksize=30)
+
+
+def test_unmonitorable_test():
+    with raises(TestInputError):
+        WindowMonitor(window=100, blocksize=10, randtest_names=["spectral"])
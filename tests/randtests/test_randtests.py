@@ -3,6 +3,7 @@ from pytest import mark
 from coinflip import randtests
 
 from .examples import *
+from .examples import e_expansion
 
 
 @mark.parametrize(example_fields, examples)
@@ -34,3 +35,31 @@ def test_sub_examples(randtest, key, bits, statistic_expect, p_expect, kwargs):
 
     assert_statistic(result.statistic, statistic_expect)
     assert_p(result.p, p_expect)
+
+
+cusum_examples = [
+    example
+    for example in examples
+    if getattr(example, "values", example)[0] == "cusum"  # i.e. unwrap ParameterSet
+]
+
+
+@mark.parametrize(example_fields, cusum_examples)
+def test_bidirectional_cusum(randtest, bits, statistic_expect, p_expect, kwargs):
+    meta_result = randtests.bidirectional_cusum(bits)
+    mode = "reverse" if kwargs.get("reverse") else "forward"
+    result = meta_result.results[mode]
+
+    assert_statistic(result.statistic, statistic_expect)
+    assert_p(result.p, p_expect)
+
+
+def test_random_excursions_states():
+    bits = list(e_expansion(n=10000))
+
+    results = randtests.random_excursions(bits)
+    narrow_results = randtests.random_excursions(bits, states=[-1, 1, 2])
+
+    assert list(narrow_results.results.keys()) == [-1, 1, 2]
+    for state, result in narrow_results.results.items():
+        assert_p(result.p, results.results[state].p)
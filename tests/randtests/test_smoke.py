@@ -3,9 +3,7 @@ from pytest import mark
 from coinflip import generators
 from coinflip.cli.runner import list_tests
 
-# TODO make this deterministic
-RNG = generators.python()
-bits = [next(RNG) for _ in range(1000000)]
+bits = generators.take_bits(generators.pcg64(chunk_bytes=2 ** 16, seed=0), 1000000)
 
 randtests = [(func,) for _, func in list_tests()]
 
@@ -0,0 +1,121 @@
+import numpy as np
+from pytest import approx
+from pytest import mark
+from pytest import raises
+
+from coinflip import randtests
+from coinflip._randtests.common.exceptions import TestInputError
+from coinflip._randtests.streams import SecondLevelResult
+from coinflip._randtests.streams import map_streams
+from coinflip._randtests.streams import multistream
+from coinflip._randtests.streams import split_packed_streams
+from coinflip._randtests.streams import split_streams
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+bits = take_bits(pcg64(chunk_bytes=2 ** 10, seed=0), 20 * 1000)
+
+
+def test_uniform_pvalues():
+    pvalues = np.linspace(0.005, 0.995, 100)
+
+    result = SecondLevelResult(pvalues, 0.01)
+
+    assert list(result.pvalue_counts) == [10] * 10
+    assert result.uniformity_p == approx(1)
+    assert result.proportion == 0.99
+    assert result.passed
+
+
+def test_failing_proportion():
+    pvalues = np.repeat([0.001, 0.5], [5, 95])
+
+    result = SecondLevelResult(pvalues, 0.01)
+
+    assert result.proportion == 0.95
+    assert result.interval[0] == approx(0.99 - 3 * np.sqrt(0.99 * 0.01 / 100))
+    assert not result.passed
+
+
+def test_nonfinite_pvalues_dropped():
+    pvalues = np.append(np.linspace(0.005, 0.995, 100), [np.nan, np.inf])
+
+    result = SecondLevelResult(pvalues, 0.01)
+
+    assert result.ndropped == 2
+    assert result.nstreams == 100
+    assert list(result.pvalue_counts) == [10] * 10
+    assert result.uniformity_p == approx(1)
+    assert result.passed
+
+
+@mark.parametrize(
+    ["nstreams", "streamlen", "dimensions"],
+    [(20, None, (20, 1000)), (None, 999, (20, 999)), (3, 5, (3, 5))],
+)
+def test_split_streams(nstreams, streamlen, dimensions):
+    heads, tails, streams = split_streams(bits, nstreams, streamlen)
+    streams = list(streams)
+
+    assert (heads, tails) == (1, 0)
+    assert (len(streams), len(streams[0])) == dimensions
+    assert all(len(stream) == len(streams[0]) for stream in streams)
+
+
+@mark.parametrize(["nstreams", "streamlen"], [(None, None), (0, None), (21, 1000)])
+def test_split_streams_invalid(nstreams, streamlen):
+    with raises(TestInputError):
+        split_streams(bits, nstreams, streamlen)
+
+
+@mark.parametrize(["nstreams", "streamlen"], [(20, None), (None, 999), (3, 13)])
+def test_split_packed_streams(nstreams, streamlen):
+    packed = np.packbits(bits)
+
+    streams = split_packed_streams(packed, nstreams, streamlen)
+
+    _, _, streams_expect = split_streams(bits, nstreams, streamlen)
+    for stream, stream_expect in zip(streams, streams_expect):
+        assert np.array_equal(stream, stream_expect)
+
+
+def test_map_streams_batches():
+    nread = 0
+
+    def streams():
+        nonlocal nread
+        for stream in split_streams(bits, 20)[2]:
+            nread += 1
+            yield stream
+
+    batches = map_streams(streams(), ["monobit"], workers=1)
+    batch = next(batches)
+
+    assert len(batch) == nread == 4
+    assert sum(len(batch) for batch in batches) == 16
+
+
+def test_multistream():
+    _, _, streams = split_streams(bits, nstreams=20)
+
+    (name, result), = multistream(streams, ["monobit"], workers=1)
+
+    pvalues_expect = [
+        randtests.monobit(stream).p for stream in split_streams(bits, 20)[2]
+    ]
+    assert name == "monobit"
+    assert result.nstreams == 20
+    assert result.results[None].pvalues == approx(pvalues_expect)
+
+
+def test_multistream_public():
+    results = randtests.multistream(
+        bits, nstreams=20, randtests=["runs", "cusum"], workers=2
+    )
+
+    _, _, streams = split_streams(bits, nstreams=20)
+    results_expect = dict(multistream(streams, ["runs", "cusum"], workers=1))
+    for name, result in results.items():
+        assert result.nerrors == 0
+        pvalues_expect = results_expect[name].results[None].pvalues
+        assert result.results[None].pvalues == approx(pvalues_expect)
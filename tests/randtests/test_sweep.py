@@ -0,0 +1,42 @@
+from math import isclose
+from math import isnan
+
+from hypothesis import given
+
+from coinflip import randtests
+
+from ..strategies import mixedbits
+
+
+@given(mixedbits(min_size=64))
+def test_pattern_sweep(bits):
+    blocksizes = [2, 3, 4, 5]
+    sweep_result = randtests.pattern_sweep(bits, blocksizes=blocksizes)
+
+    for blocksize in blocksizes:
+        serial_result = randtests.serial(bits, blocksize=blocksize)
+        serial_sweep_result = sweep_result.serial_results[blocksize]
+        for p, p_expect in zip(serial_sweep_result.pvalues, serial_result.pvalues):
+            assert_p_equal(p, p_expect)
+
+        entropy_result = randtests.approximate_entropy(bits, blocksize=blocksize)
+        entropy_sweep_result = sweep_result.approximate_entropy_results[blocksize]
+        assert_p_equal(entropy_sweep_result.p, entropy_result.p)
+
+    assert list(sweep_result.table.index) == blocksizes
+
+
+def assert_p_equal(p, p_expect):
+    if isnan(p_expect):
+        assert isnan(p)
+    else:
+        assert isclose(p, p_expect, abs_tol=1e-9)
+
+
+def test_pattern_sweep_warns_once(recwarn):
+    bits = [0, 1, 1, 0] * 16
+
+    sweep_result = randtests.pattern_sweep(bits, blocksizes=[2, 3, 4, 5])
+
+    assert len(recwarn) == 1
+    assert sweep_result.serial_results[5].failures == ["blocksize < ⌊log2(n) - 2⌋"]
@@ -0,0 +1,149 @@
+import json
+import os
+from zipfile import ZipFile
+
+import numpy as np
+from click.testing import CliRunner
+from pytest import fixture
+
+from coinflip import randtests
+from coinflip.cache import ResultCache
+from coinflip.cache import get_cache
+from coinflip.cache import result_key
+from coinflip.cache import set_cache
+from coinflip.cli import commands
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+from .test_cli import assert_success
+
+
+@fixture
+def cache(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    set_cache(cache)
+    yield cache
+    set_cache(None)
+
+
+@fixture
+def bits():
+    return take_bits(pcg64(chunk_bytes=1000, seed=0), 8000)
+
+
+def test_cached_result(cache, bits):
+    result = randtests.monobit(bits)
+    assert cache.size > 0
+
+    key = result_key(bits, 1, 0, "monobit", {})
+    assert cache.get(key) == result
+
+    # The cached result is returned instead of running the test again
+    other = randtests.monobit(np.roll(bits, 1))
+    cache.put(key, other)
+    assert randtests.monobit(bits) == other
+
+
+def test_params_key(cache, bits):
+    default_key = result_key(bits, 1, 0, "serial", {})
+
+    assert result_key(bits, 1, 0, "serial", {"blocksize": None}) == default_key
+    assert result_key(bits, 1, 0, "serial", {"blocksize": 4}) != default_key
+    assert result_key(bits, 1, 0, "runs", {}) != default_key
+    assert result_key(bits[::-1], 1, 0, "serial", {}) != default_key
+    assert result_key(bits, 0, 1, "serial", {}) != default_key
+
+
+def test_lru_eviction(tmp_path, bits):
+    cache = ResultCache(tmp_path)
+    result = randtests.monobit(bits)
+
+    for i, key in enumerate("abc"):
+        cache.put(key, result)
+        os.utime(cache.path / f"{key}.pickle", (i, i))
+
+    # Reading marks a result as recently used
+    assert cache.get("a") == result
+
+    cache.max_size = 2 * cache.size // 3
+    cache.evict()
+
+    assert cache.get("a") == result
+    assert cache.get("b") is None
+    assert cache.get("c") == result
+
+
+def test_unpicklable_result(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("key", lambda: None)
+
+    assert cache.get("key") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_run_no_cache(cache, tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    args = ["-b", "--no-cache", str(data), str(tmp_path / "results.pickle")]
+    result = runner.invoke(commands.run, args)
+    assert_success(result)
+
+    assert get_cache() is cache
+    assert cache.size == 0
+
+
+def test_run_no_cache_no_eviction(monkeypatch, tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    evicted = []
+    monkeypatch.setattr(ResultCache, "evict", lambda cache: evicted.append(cache))
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    args = ["-b", "--no-cache", "--resume", "--format", "ndjson", str(data)]
+    result = runner.invoke(commands.run, args)
+    assert_success(result)
+
+    assert evicted == []
+
+
+def test_uncached_by_default():
+    assert get_cache() is None
+
+
+def test_run_caches(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    out = tmp_path / "results.zip"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    for _ in range(2):
+        result = runner.invoke(commands.run, ["-b", str(data), str(out)])
+        assert_success(result)
+
+    # The command's cache is only used for its own run
+    assert get_cache() is None
+    assert ResultCache().size > 0
+    # Results loaded from the cache are not timed as if they were ran
+    with ZipFile(out) as zf:
+        header = json.loads(zf.read("header.json"))
+    assert all(index["elapsed"] is None for index in header["results"].values())
+
+
+def test_running_size(tmp_path, bits):
+    cache = ResultCache(tmp_path, max_size=10 ** 9)
+    result = randtests.monobit(bits)
+
+    for key in "abc":
+        cache.put(key, result)
+
+    assert cache._size == cache.size
+    cache.max_size = 2 * cache.size // 3
+    cache.put("d", result)
+
+    assert cache._size == cache.size <= cache.max_size
+    assert cache.get("d") == result
@@ -0,0 +1,196 @@
+import json
+import os
+from warnings import catch_warnings
+from warnings import simplefilter
+
+import numpy as np
+from click.testing import CliRunner
+from pytest import fixture
+from pytest import raises
+
+from coinflip import randtests
+from coinflip._randtests.chunked import run_chunked
+from coinflip._randtests.streams import split_streams
+from coinflip.cache import ResultCache
+from coinflip.checkpoint import Checkpoint
+from coinflip.checkpoint import run_key
+from coinflip.cli import commands
+from coinflip.cli.report import file_digest
+from coinflip.cli.runner import multistream_outcomes
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+from .randtests.test_accumulators import assert_results_match
+from .test_cli import assert_success
+
+
+@fixture
+def checkpoint(tmp_path):
+    return Checkpoint("key", tmp_path / "checkpoints")
+
+
+def test_checkpoint(checkpoint):
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 8000)
+    result = randtests.monobit(bits)
+    e = ValueError("oops")
+
+    assert checkpoint.get("monobit") is None
+    checkpoint.put("monobit", result)
+    checkpoint.put("runs", None, e)
+    checkpoint.put_state("chunks", (8, {}))
+
+    assert "monobit" in checkpoint
+    assert checkpoint.get("monobit") == (result, None)
+    assert str(checkpoint.get("runs")[1]) == "oops"
+    assert checkpoint.get_state("chunks") == (8, {})
+
+    checkpoint.clear()
+    assert "monobit" not in checkpoint
+    assert checkpoint.get_state("chunks") is None
+
+
+def test_run_key():
+    params = {"binary": True, "streams": None}
+
+    assert run_key("abc", params) == run_key("abc", {"binary": True})
+    assert run_key("abc", params) != run_key("abd", params)
+    assert run_key("abc", params) != run_key("abc", {"binary": False})
+
+
+class Interruption(Exception):
+    pass
+
+
+def test_run_chunked_resume(checkpoint):
+    bits = take_bits(pcg64(chunk_bytes=10000, seed=0), 80000)
+    buffer = np.packbits(bits).tobytes()
+
+    with catch_warnings():
+        simplefilter("ignore")
+        expected = {name: result for name, result, _ in run_chunked(buffer, 997)}
+
+        # Interrupted after snapshotting the accumulators for a few chunks
+        put_state = checkpoint.put_state
+        nsnapshots = 0
+
+        def interrupting_put_state(name, state):
+            nonlocal nsnapshots
+            put_state(name, state)
+            nsnapshots += 1
+            if nsnapshots == 3:
+                raise Interruption()
+
+        checkpoint.put_state = interrupting_put_state
+        with raises(Interruption):
+            list(run_chunked(buffer, 997, checkpoint=checkpoint, snapshot_interval=0))
+        checkpoint.put_state = put_state
+        assert checkpoint.get_state("chunks")[0] == 3 * 997
+
+        # Interrupted after finding a couple of the results
+        randtest_results = run_chunked(buffer, 997, checkpoint=checkpoint)
+        for _ in range(2):
+            next(randtest_results)
+        assert "frequency_within_block" in checkpoint
+        assert "runs" not in checkpoint
+
+        for name, result, e in run_chunked(buffer, 997, checkpoint=checkpoint):
+            if expected[name] is None:
+                assert result is None
+            else:
+                assert_results_match(result, expected[name])
+
+
+def test_multistream_resume(checkpoint):
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 8000)
+
+    def outcomes(checkpoint=None):
+        _, _, streams = split_streams(bits, nstreams=20)
+        return multistream_outcomes(streams, 1, 0, checkpoint, workers=1)
+
+    with catch_warnings():
+        simplefilter("ignore")
+        expected = {name: result for name, result, _ in outcomes()}
+
+        # Interrupted after putting the outcomes of a couple of stream batches
+        put_state = checkpoint.put_state
+        nbatches = 0
+        interrupt = True
+
+        def counting_put_state(name, state):
+            nonlocal nbatches
+            put_state(name, state)
+            nbatches += 1
+            if interrupt and nbatches == 2:
+                raise Interruption()
+
+        checkpoint.put_state = counting_put_state
+        with raises(Interruption):
+            list(outcomes(checkpoint))
+        assert checkpoint.get_state("streams1") is not None
+
+        # Only the batches of streams not yet tested are ran again
+        nbatches = 0
+        interrupt = False
+        for name, result, e in outcomes(checkpoint):
+            if expected[name] is None:
+                assert result is None
+            else:
+                assert result.nstreams == 20
+                for feature, sub in result.results.items():
+                    expect_pvalues = expected[name].results[feature].pvalues
+                    assert np.array_equal(sub.pvalues, expect_pvalues)
+        assert nbatches == 3
+
+
+def test_run_resume(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+
+    # Outcomes of a previous run are only used when resuming
+    params = {"binary": True, "streams": None, "streamlen": None, "max_memory": None}
+    checkpoint = Checkpoint(run_key(file_digest(data), params))
+    fake_result = randtests.monobit([0, 1] * 100)
+
+    args = ["-b", "--format", "ndjson", str(data)]
+    checkpoint.put("monobit", fake_result)
+
+    # Runs which are not resumed neither use nor write checkpoints
+    result = runner.invoke(commands.run, args)
+    assert_success(result)
+    monobit = json.loads(result.output.splitlines()[0])
+    assert monobit["p"] != fake_result.p
+    assert [path.name for path in checkpoint.path.iterdir()] == [
+        "monobit.outcome.pickle"
+    ]
+
+    # Checkpoints are removed once a resumed run completes
+    result = runner.invoke(commands.run, ["--resume", *args])
+    assert_success(result)
+    monobit = json.loads(result.output.splitlines()[0])
+    assert monobit["p"] == fake_result.p
+    assert not checkpoint.path.exists()
+
+
+def test_checkpoint_eviction(tmp_path):
+    cache = ResultCache(tmp_path)
+    checkpoint = Checkpoint("key", tmp_path / "checkpoints")
+    result = randtests.monobit(take_bits(pcg64(chunk_bytes=1000, seed=0), 8000))
+
+    checkpoint.put("monobit", result)
+    checkpoint.put("runs", result)
+    os.utime(checkpoint.path, (0, 0))
+    for file in checkpoint.path.iterdir():
+        os.utime(file, (0, 0))
+    cache.put("a", result)
+
+    # Checkpoints count towards the size of the cache, and are evicted whole
+    files = [cache.path / "a.pickle", *checkpoint.path.iterdir()]
+    assert cache.size == sum(file.stat().st_size for file in files)
+    cache.max_size = cache.size // 2
+    cache.evict()
+
+    assert not checkpoint.path.exists()
+    assert cache.get("a") == result
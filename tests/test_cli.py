@@ -1,6 +1,8 @@
+import json
 import webbrowser
 from tempfile import NamedTemporaryFile
 
+import pandas as pd
 from click.testing import CliRunner
 from hypothesis import HealthCheck
 from hypothesis import settings
@@ -8,8 +10,13 @@ from hypothesis.stateful import Bundle
 from hypothesis.stateful import RuleBasedStateMachine
 from hypothesis.stateful import rule
 
+from coinflip import _randtests
+from coinflip import randtests
 from coinflip.cli import commands
 from coinflip.cli import console
+from coinflip.cli.runner import run_all_tests_ndjson
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
 
 from .strategies import mixedbits
 
@@ -75,6 +82,122 @@ TestCliStateMachine.settings = settings(
 )
 
 
+def test_generate_shards(tmp_path):
+    runner = CliRunner()
+    whole = tmp_path / "whole.bin"
+    shards = [tmp_path / "shard1.bin", tmp_path / "shard2.bin"]
+
+    args = ["-e", "pcg64", "-s", "42", "--chunk-bytes", "3"]
+    result = runner.invoke(commands.generate, [*args, "-n", "800", str(whole)])
+    assert_success(result)
+    for i, shard in enumerate(shards):
+        shard_args = ["-n", "400", "-o", str(400 * i), str(shard)]
+        result = runner.invoke(commands.generate, [*args, *shard_args])
+        assert_success(result)
+
+    assert whole.read_bytes() == b"".join(shard.read_bytes() for shard in shards)
+
+
+def test_generate_invalid_length(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "data.bin"
+    out.write_bytes(b"existing")
+
+    result = runner.invoke(commands.generate, ["-n", "12", str(out)])
+
+    assert result.exit_code == 2
+    assert out.read_bytes() == b"existing"
+
+
+def test_generate_ascii(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "primes.txt"
+
+    args = ["-a", "-e", "primes", "-n", "8", str(out)]
+    result = runner.invoke(commands.generate, args)
+    assert_success(result)
+
+    assert out.read_text() == "0\n1\n1\n0\n1\n0\n1\n0\n"
+
+
+def test_run_streams(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    out = tmp_path / "results.pickle"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    result = runner.invoke(commands.run, ["-b", "-m", "4", str(data), str(out)])
+    assert_success(result)
+    result = runner.invoke(commands.read, [str(out)])
+    assert_success(result)
+
+
+def test_run_max_memory(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    out = tmp_path / "results.pickle"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    args = ["-b", "--max-memory", "64K", str(data), str(out)]
+    result = runner.invoke(commands.run, args)
+    assert_success(result)
+    result = runner.invoke(commands.read, [str(out)])
+    assert_success(result)
+
+    result = runner.invoke(commands.run, ["--max-memory", "64K", str(data)])
+    assert result.exit_code == 1
+    result = runner.invoke(commands.run, ["-b", "--max-memory", "lots", str(data)])
+    assert result.exit_code == 1
+
+
+def test_run_ndjson(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    result = runner.invoke(commands.run, ["-b", "--format", "ndjson", str(data)])
+    assert_success(result)
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    test_records = [record for record in records if "subtest" not in record]
+    assert [record["test"] for record in test_records] == list(_randtests.__all__)
+    monobit = test_records[0]
+    assert monobit["passed"] == (monobit["p"] >= 0.01)
+    serial_records = [record for record in records if record["test"] == "serial"]
+    assert all("subtest" in record for record in serial_records[:-1])
+    assert "subtest" not in serial_records[-1]
+
+
+def test_run_all_tests_ndjson():
+    series = pd.Series(take_bits(pcg64(chunk_bytes=500, seed=0), 4000))
+
+    lines = list(run_all_tests_ndjson(series))
+
+    assert json.loads(lines[0]) == {
+        "test": "monobit",
+        "statistic": randtests.monobit(series).statistic,
+        "p": randtests.monobit(series).p,
+        "passed": True,
+        "failures": [],
+    }
+
+
+def test_monitor_stdin():
+    runner = CliRunner()
+
+    args = ["-a", "-w", "4", "-b", "2", "-t", "monobit", "--siglevel", "0.05"]
+    result = runner.invoke(commands.monitor, args, input="0\n1\n1\n0\n1\n1\n1\n1\n")
+    assert_success(result)
+
+    lines = result.output.splitlines()
+    assert lines[0] == "end\tmonobit"
+    assert [line.split("\t")[0] for line in lines[1:]] == ["4", "6", "8"]
+    assert lines[-1].endswith("*")
+
+
 def noop(*args, **kwargs):
     return None
 
@@ -0,0 +1,100 @@
+import random
+from itertools import islice
+
+import numpy as np
+from pytest import mark
+from pytest import raises
+
+from coinflip import generators
+
+generator_funcs = [(getattr(generators, name),) for name in generators.__all__]
+
+
+@mark.parametrize(["generator_func"], generator_funcs)
+def test_bits(generator_func):
+    bits = list(islice(generator_func(), 100))
+
+    assert set(bits) <= {0, 1}
+
+
+@mark.parametrize(["generator_func"], generator_funcs)
+def test_chunks(generator_func):
+    chunks = list(islice(generator_func(chunk_bytes=16), 3))
+
+    for chunk in chunks:
+        assert chunk.dtype == np.uint8
+        assert len(chunk) == 16
+
+
+@mark.parametrize(["generator_func"], generator_funcs)
+def test_invalid_chunk_bytes(generator_func):
+    with raises(ValueError):
+        generator_func(chunk_bytes=0)
+
+
+@mark.parametrize(
+    "generator_func", [generators.python, generators.pcg64, generators.philox]
+)
+def test_seed(generator_func):
+    bits1 = generators.take_bits(generator_func(chunk_bytes=8, seed=42), 100)
+    bits2 = generators.take_bits(generator_func(chunk_bytes=8, seed=42), 100)
+
+    assert np.array_equal(bits1, bits2)
+
+
+@mark.parametrize("n", [0, 1, 7, 8, 9, 100])
+def test_take_bits(n):
+    chunks = iter([np.array([0b10110000], dtype=np.uint8)] * 100)
+
+    bits = generators.take_bits(chunks, n)
+
+    assert len(bits) == n
+    assert list(bits[:4]) == [1, 0, 1, 1][:n]
+
+
+def isprime(n):
+    return n > 1 and all(n % d != 0 for d in range(2, int(n ** 0.5) + 1))
+
+
+def test_primes():
+    bits = list(islice(generators.primes(), 1000))
+
+    assert bits == [int(isprime(n)) for n in range(1, 1001)]
+
+
+def test_primes_chunks():
+    bits = generators.take_bits(generators.primes(chunk_bytes=3), 1000)
+
+    assert list(bits) == [int(isprime(n)) for n in range(1, 1001)]
+
+
+@mark.parametrize(
+    ["generator_func", "kwargs"],
+    [
+        (generators.python, {"seed": 42}),
+        (generators.pcg64, {"seed": 42}),
+        (generators.philox, {"seed": 42}),
+        (generators.primes, {}),
+    ],
+)
+@mark.parametrize("offset", [1, 8, 33])
+def test_offset(generator_func, kwargs, offset):
+    bits = generators.take_bits(generator_func(chunk_bytes=7, **kwargs), 800)
+
+    offset_chunks = generator_func(chunk_bytes=5, offset=offset, **kwargs)
+    offset_bits = generators.take_bits(offset_chunks, 800 - 8 * offset)
+
+    assert np.array_equal(offset_bits, bits[8 * offset :])
+
+
+def test_python_global_seed():
+    random.seed(42)
+    bits = list(islice(generators.python(), 100))
+    random.seed(42)
+
+    assert list(islice(generators.python(), 100)) == bits
+
+    # Seeded streams are independent of the global generator
+    seeded_bits = list(islice(generators.python(seed=1), 100))
+    random.seed(0)
+    assert list(islice(generators.python(seed=1), 100)) == seeded_bits
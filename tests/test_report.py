@@ -0,0 +1,210 @@
+import json
+import pickle
+import zipfile
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from coinflip import randtests
+from coinflip.cli import commands
+from coinflip.cli.database import query_results
+from coinflip.cli.report import DatabaseRun
+from coinflip.cli.report import Report
+from coinflip.cli.report import ResultsFile
+from coinflip.cli.report import file_digest
+from coinflip.cli.report import load_results
+from coinflip.cli.report import store_results
+from coinflip.generators import pcg64
+from coinflip.generators import take_bits
+
+from .test_cli import assert_success
+
+
+def example_results(series):
+    return {
+        "monobit": randtests.monobit(series),
+        "serial": randtests.serial(series),
+    }
+
+
+def test_results_file(tmp_path):
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 4001)
+    series = pd.Series(np.where(bits == 1, "H", "T"))
+    results = example_results(series)
+    path = tmp_path / "results.zip"
+
+    store_results(series, results, path)
+    results_file = load_results(path)
+
+    assert isinstance(results_file, ResultsFile)
+    header = results_file.header
+    assert header["sequence"]["n"] == 4001
+    assert header["sequence"]["faces"] == ["T", "H"]
+    assert header["results"]["monobit"]["p"] == results["monobit"].p
+    assert header["results"]["serial"]["summary"] is None
+    assert results_file.summaries["monobit"] == (results["monobit"].p, True)
+
+    # Results are only loaded when accessed
+    assert results_file.results._loaded == {}
+    assert results_file.results["monobit"] == results["monobit"]
+    assert list(results_file.results._loaded) == ["monobit"]
+    assert list(results_file.results) == ["monobit", "serial"]
+
+    assert results_file.series.equals(series)
+
+
+def test_results_file_arrays(tmp_path):
+    series = pd.Series(take_bits(pcg64(chunk_bytes=1000, seed=0), 4000))
+    results = {
+        "frequency_within_block": randtests.frequency_within_block(
+            series, blocksize=40
+        ),
+        "serial": randtests.serial(series),
+    }
+    path = tmp_path / "results.zip"
+
+    store_results(series, results, path)
+    results_file = load_results(path)
+
+    # Arrays are kept apart from the pickled results
+    with zipfile.ZipFile(path) as zf:
+        assert "results/serial.npz" in zf.namelist()
+        assert zf.getinfo("results/serial.pickle").file_size < 2000
+    count_nblocks = results_file.results["frequency_within_block"].count_nblocks
+    assert count_nblocks == results["frequency_within_block"].count_nblocks
+    assert isinstance(count_nblocks, list)
+    serial = results_file.results["serial"]
+    assert serial.results == results["serial"].results
+    for window_size, counts in results["serial"].permutation_counts.items():
+        loaded_counts = serial.permutation_counts[window_size]
+        assert loaded_counts.dtype == counts.dtype
+        assert (loaded_counts == counts).all()
+
+
+def test_results_file_source(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(np.packbits(take_bits(pcg64(chunk_bytes=500), 4000)).tobytes())
+    path = tmp_path / "results.zip"
+
+    store_results(None, {}, path, source=data)
+    results_file = load_results(path)
+
+    with zipfile.ZipFile(path) as zf:
+        assert zf.namelist() == ["header.json"]
+        sequence = json.loads(zf.read("header.json"))["sequence"]
+    assert sequence["n"] == 4000
+    assert sequence["blake2b"] == file_digest(data)
+    assert results_file.series is None
+
+
+def test_load_pickled_report(tmp_path):
+    series = pd.Series(take_bits(pcg64(chunk_bytes=500, seed=0), 4000))
+    report = Report(series, example_results(series))
+    path = tmp_path / "results.pickle"
+    with open(path, "wb") as f:
+        pickle.dump(report, f)
+
+    loaded = load_results(path)
+
+    assert isinstance(loaded, Report)
+    assert loaded.series.equals(series)
+    assert loaded.summaries["monobit"] == (report.results["monobit"].p, True)
+
+
+def test_read_summary(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    out = tmp_path / "results.zip"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    result = runner.invoke(commands.run, ["-b", str(data), str(out)])
+    assert_success(result)
+
+    result = runner.invoke(commands.read, ["--summary", str(out)])
+    assert_success(result)
+
+
+def test_results_database(tmp_path):
+    database = tmp_path / "results.db"
+    for seed in range(2):
+        bits = take_bits(pcg64(chunk_bytes=1000, seed=seed), 4000)
+        series = pd.Series(bits)
+        results = example_results(series)
+        run_id = store_results(
+            series, results, database, timings={"monobit": 0.5}, label=f"dev{seed}"
+        )
+        assert run_id == seed + 1
+
+    run = load_results(database, run_id=1)
+
+    assert isinstance(run, DatabaseRun)
+    assert run.header["label"] == "dev0"
+    assert run.results._loaded == {}
+    bits = take_bits(pcg64(chunk_bytes=1000, seed=0), 4000)
+    assert (run.series.to_numpy() == bits).all()
+    assert load_results(database).header["label"] == "dev1"
+    assert load_results(database).results["monobit"] == results["monobit"]
+
+    rows = query_results(database, test="monobit")
+    assert list(rows["label"]) == ["dev0", "dev1"]
+    assert list(rows["elapsed"]) == [0.5, 0.5]
+    assert rows["p"][1] == results["monobit"].p
+
+    rows = query_results(database, label="dev1", group_by="test")
+    assert list(rows["test"]) == ["monobit", "serial"]
+    assert list(rows["nresults"]) == [1, 1]
+    assert query_results(database, failed=True).empty
+
+
+def test_results_database_multitest(tmp_path):
+    database = tmp_path / "results.db"
+    series = pd.Series(take_bits(pcg64(chunk_bytes=1000, seed=0), 4000))
+    serial = randtests.serial(series)
+    failing_serial = replace(
+        serial,
+        results={
+            feature: replace(sub, p=0.001 if i == 0 else sub.p)
+            for i, (feature, sub) in enumerate(serial.results.items())
+        },
+    )
+    store_results(series, {"serial": serial}, database, label="pass")
+    store_results(series, {"serial": failing_serial}, database, label="fail")
+
+    # Tests with many sub-tests are judged by their smallest p-value
+    rows = query_results(database, test="serial")
+    assert rows["p"][0] == min(sub.p for sub in serial.results.values())
+    assert list(rows["passed"]) == [1, 0]
+
+    rows = query_results(database, failed=True)
+    assert list(rows["label"]) == ["fail"]
+    rows = query_results(database, group_by="test")
+    assert list(rows["nfailed"]) == [1]
+
+
+def test_query(tmp_path):
+    runner = CliRunner()
+    data = tmp_path / "data.bin"
+    database = tmp_path / "results.db"
+
+    result = runner.invoke(commands.generate, ["-s", "42", "-n", "4000", str(data)])
+    assert_success(result)
+    for label in ["dev0", "dev1"]:
+        args = ["-b", "-l", label, str(data), str(database)]
+        result = runner.invoke(commands.run, args)
+        assert_success(result)
+
+    args = [str(database), "-t", "monobit", "-g", "label"]
+    result = runner.invoke(commands.query, args)
+    assert_success(result)
+
+    lines = result.output.splitlines()
+    assert lines[0].split("\t")[:3] == ["label", "nresults", "nfailed"]
+    assert [line.split("\t")[0] for line in lines[1:]] == ["dev0", "dev1"]
+
+    result = runner.invoke(commands.read, ["-r", "2", str(database)])
+    assert_success(result)
+    result = runner.invoke(commands.read, ["-r", "3", str(database)])
+    assert result.exit_code == 1
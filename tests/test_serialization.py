@@ -3,8 +3,10 @@ import pickle
 from hypothesis import given
 from hypothesis import strategies as st
 from pytest import mark
+from sortedcontainers import SortedDict
 
 from coinflip._randtests.common.typing import *
+from coinflip._randtests.cusum import BidirectionalCusumMultiTestResult
 from coinflip._randtests.cusum import CusumTestResult
 from coinflip._randtests.entropy import ApproximateEntropyTestResult
 from coinflip._randtests.excursions import RandomExcursionsMultiTestResult
@@ -33,6 +35,41 @@ def test_bins_pickle():
     assert bins2 == bins
 
 
+def test_bins_unpickle_old_format():
+    # Older versions kept the counts of bins in a sorted dict
+    old_bins = Bins.__new__(Bins)
+    old_bins.__dict__ = {"_sdict": SortedDict({-3: 1, 0: 0, 3: 2})}
+    pickled_bins = pickle.dumps(old_bins)
+
+    bins = pickle.loads(pickled_bins)
+
+    assert dict(bins) == {-3: 1, 0: 0, 3: 2}
+    bins[4] += 1
+    bins.add_many([-10, 1])
+    assert dict(bins) == {-3: 2, 0: 1, 3: 3}
+
+
+def test_frequency_within_block_unpickle_old_format():
+    # Older versions kept the count of every block
+    old_result = FrequencyWithinBlockTestResult.__new__(FrequencyWithinBlockTestResult)
+    old_result.__dict__ = {
+        "heads": 1,
+        "tails": 0,
+        "failures": [],
+        "statistic": 1.0,
+        "p": 0.6,
+        "blocksize": 4,
+        "nblocks": 4,
+        "counts": [2, 1, 2, 4],
+    }
+    pickled_result = pickle.dumps(old_result)
+
+    result = pickle.loads(pickled_result)
+
+    assert result.count_nblocks == [0, 1, 2, 0, 1]
+    assert not hasattr(result, "counts")
+
+
 # TODO expand this
 st.register_type_strategy(
     Face,
@@ -55,6 +92,7 @@ st.register_type_strategy(
         SerialMultiTestResult,
         ApproximateEntropyTestResult,
         CusumTestResult,
+        BidirectionalCusumMultiTestResult,
         RandomExcursionsMultiTestResult,
         RandomExcursionsVariantMultiTestResult,
     ],